@@ -0,0 +1,218 @@
+import argparse
+import fnmatch
+import os
+import selectors
+import time
+
+import serial
+from serial.tools import list_ports
+
+from DecodificadorTramas import DecodificadorTramas, texto_trama
+
+# Gateway multi-puerto: un solo proceso y un solo selector para todos los Arduinos.
+# Requiere POSIX (Linux/macOS): el selector espera sobre los descriptores de los puertos.
+PATRONES_PUERTOS = ['/dev/ttyUSB*', '/dev/ttyACM*']  # Puertos que se agregan automáticamente
+BAUD_RATE = 9600
+INTERVALO_ESCANEO = 2.0   # Segundos entre búsquedas de puertos nuevos o desconectados
+INTERVALO_REPORTE = 10.0  # Segundos entre reportes de contadores por puerto
+
+
+class EstadisticasPuerto:
+    """Contadores de un puerto; se conservan aunque el puerto se desconecte"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.tramas = 0
+        self.malformadas = 0     # Tramas descartadas por el decodificador (truncadas, basura)
+        self.errores = 0
+        self.conexiones = 0
+        self.tramas_reporte = 0  # Tramas al momento del último reporte
+
+
+class PuertoGateway:
+    """Puerto serial abierto por el gateway, con su decodificador de tramas"""
+
+    def __init__(self, nombre, identidad, baud_rate=BAUD_RATE):
+        self.nombre = nombre
+        self.identidad = identidad
+        self.ser = serial.Serial(nombre, baud_rate, timeout=0)  # No bloqueante
+        self.decodificador = DecodificadorTramas()
+
+    def fileno(self):
+        return self.ser.fileno()
+
+    def leer(self):
+        """Drena los bytes disponibles y devuelve las tramas válidas completas"""
+        datos = self.ser.read(self.ser.in_waiting or 1)
+        if not datos:
+            # El selector marcó el puerto como legible pero no hay bytes: se desconectó
+            raise serial.SerialException(f"{self.nombre} desconectado")
+        return len(datos), self.decodificador.alimentar(datos)
+
+    def cerrar(self):
+        try:
+            self.ser.close()
+        except (OSError, serial.SerialException):
+            pass
+
+
+def identidad_dispositivo(info):
+    """Identidad estable del dispositivo: número de serie USB, o VID:PID@ubicación, o la ruta"""
+    if info is None:
+        return None
+    if info.serial_number:
+        return info.serial_number
+    if info.vid is not None:
+        return f"{info.vid:04x}:{info.pid:04x}@{info.location or info.device}"
+    return None
+
+
+class ArduinoGateway:
+    """Multiplexa muchos puertos seriales en un solo bucle de eventos"""
+
+    def __init__(self, patrones=PATRONES_PUERTOS, puertos_fijos=(), baud_rate=BAUD_RATE, on_trama=None):
+        self.patrones = patrones
+        self.puertos_fijos = list(puertos_fijos)  # Rutas explícitas (ej. /dev/pts/3 de socat)
+        self.baud_rate = baud_rate
+        self.on_trama = on_trama or self.imprimir_trama
+        self.selector = selectors.DefaultSelector()
+        self.abiertos = {}      # nombre -> PuertoGateway
+        self.estadisticas = {}  # nombre -> EstadisticasPuerto
+        self.inicio_reporte = time.monotonic()
+
+    @staticmethod
+    def imprimir_trama(puerto, identidad, trama):
+        """on_trama por defecto; trama es un memoryview sobre el buffer del decodificador"""
+        print(f"[{puerto} | {identidad}] {texto_trama(trama)}")
+
+    def puertos_disponibles(self):
+        """Devuelve {ruta: info} de los puertos que el gateway debería tener abiertos"""
+        disponibles = {}
+        for info in list_ports.comports():
+            if any(fnmatch.fnmatch(info.device, patron) for patron in self.patrones):
+                disponibles[info.device] = info
+        for ruta in self.puertos_fijos:
+            if os.path.exists(ruta):
+                disponibles.setdefault(ruta, None)
+        return disponibles
+
+    def escanear(self):
+        """Abre los puertos que aparecieron y cierra los que desaparecieron"""
+        disponibles = self.puertos_disponibles()
+
+        for nombre in list(self.abiertos):
+            if nombre not in disponibles:
+                self.quitar(nombre, "ya no está disponible")
+
+        for nombre, info in disponibles.items():
+            if nombre in self.abiertos:
+                continue
+            estadisticas = self.estadisticas.setdefault(nombre, EstadisticasPuerto())
+            try:
+                puerto = PuertoGateway(nombre, identidad_dispositivo(info) or nombre, self.baud_rate)
+            except (OSError, serial.SerialException) as e:
+                estadisticas.errores += 1
+                print(f"⚠️ No se pudo abrir {nombre}: {e}")
+                continue
+            self.abiertos[nombre] = puerto
+            self.selector.register(puerto, selectors.EVENT_READ, puerto)
+            estadisticas.conexiones += 1
+            print(f"🔌 Agregado {nombre} ({puerto.identidad})")
+
+    def quitar(self, nombre, motivo):
+        """Deja de escuchar un puerto y lo cierra"""
+        puerto = self.abiertos.pop(nombre)
+        try:
+            self.selector.unregister(puerto)
+        except (KeyError, ValueError):
+            pass
+        puerto.cerrar()
+        print(f"❎ Quitado {nombre}: {motivo}")
+
+    def atender(self, puerto):
+        """Procesa las tramas recibidas por un puerto legible"""
+        estadisticas = self.estadisticas[puerto.nombre]
+        malformadas = puerto.decodificador.tramas_malformadas
+        try:
+            leidos, tramas = puerto.leer()
+        except (OSError, serial.SerialException) as e:
+            estadisticas.errores += 1
+            self.quitar(puerto.nombre, str(e))
+            return
+
+        estadisticas.bytes += leidos
+        estadisticas.malformadas += puerto.decodificador.tramas_malformadas - malformadas
+        for trama in tramas:
+            estadisticas.tramas += 1
+            self.on_trama(puerto.nombre, puerto.identidad, trama)
+
+    def reportar(self):
+        """Imprime tramas/s, bytes y errores de cada puerto conocido"""
+        ahora = time.monotonic()
+        transcurrido = ahora - self.inicio_reporte
+        print(f"📊 {len(self.abiertos)} puertos abiertos")
+        for nombre, e in sorted(self.estadisticas.items()):
+            tasa = (e.tramas - e.tramas_reporte) / transcurrido if transcurrido > 0 else 0.0
+            estado = "abierto" if nombre in self.abiertos else "cerrado"
+            print(f"   {nombre} [{estado}]: {tasa:.1f} tramas/s, tramas={e.tramas}, "
+                  f"malformadas={e.malformadas}, bytes={e.bytes}, errores={e.errores}, conexiones={e.conexiones}")
+            e.tramas_reporte = e.tramas
+        self.inicio_reporte = ahora
+
+    def run(self):
+        """Bucle de eventos: lecturas, escaneo periódico de puertos y reportes"""
+        siguiente_escaneo = time.monotonic()
+        siguiente_reporte = time.monotonic() + INTERVALO_REPORTE
+        while True:
+            ahora = time.monotonic()
+            if ahora >= siguiente_escaneo:
+                self.escanear()
+                siguiente_escaneo = ahora + INTERVALO_ESCANEO
+            if ahora >= siguiente_reporte:
+                self.reportar()
+                siguiente_reporte = ahora + INTERVALO_REPORTE
+
+            espera = max(0.0, min(siguiente_escaneo, siguiente_reporte) - time.monotonic())
+            if not self.abiertos:
+                time.sleep(espera)  # select() sin descriptores no está soportado en todas las plataformas
+                continue
+            for clave, _ in self.selector.select(espera):
+                self.atender(clave.data)
+
+    def cerrar(self):
+        for nombre in list(self.abiertos):
+            self.quitar(nombre, "gateway detenido")
+        self.selector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway serial multi-puerto para Arduinos")
+    parser.add_argument("--patrones", nargs="*", default=PATRONES_PUERTOS,
+                        help="Patrones de puertos a agregar automáticamente")
+    parser.add_argument("--puertos", nargs="*", default=[], help="Rutas de puertos fijos (ej. /dev/pts/3)")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Velocidad en baudios")
+    parser.add_argument("--guardar", help="Retiene las tramas en memoria y las guarda en este .npy al salir")
+    args = parser.parse_args()
+
+    on_trama = None
+    if args.guardar:
+        from TramaSensores import LoteTramas
+        lote = LoteTramas()
+        on_trama = lambda puerto, identidad, trama: lote.agregar_csv(trama, time.time(), identidad)
+
+    gateway = ArduinoGateway(args.patrones, args.puertos, args.baud, on_trama)
+    print(f"Gateway escuchando {args.patrones + args.puertos}...")
+    try:
+        gateway.run()
+    except KeyboardInterrupt:
+        print("\nPrograma terminado.")
+    finally:
+        gateway.reportar()
+        gateway.cerrar()
+        if args.guardar:
+            lote.guardar(args.guardar)
+            print(f"💾 {len(lote)} tramas ({lote.memoria()} bytes) guardadas en {args.guardar}; "
+                  f"dispositivos: {lote.dispositivos}")
+
+if __name__ == "__main__":
+    main()
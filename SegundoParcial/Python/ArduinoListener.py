@@ -1,18 +1,49 @@
+import selectors
 import serial
 
+from DecodificadorTramas import DecodificadorTramas, texto_trama
+
 SERIAL_PORT = 'COM3'
 BAUD_RATE = 9600
 
+def bloques_recibidos(ser):
+    """Genera los bytes recibidos; bloquea sin consumir CPU hasta que llegan datos"""
+    try:
+        fd = ser.fileno()  # Solo en POSIX (Linux/macOS)
+    except (AttributeError, NotImplementedError):
+        fd = None
+
+    if fd is None:
+        # Windows: read(1) sin timeout espera dentro del driver; luego se drena lo demás
+        ser.timeout = None
+        while True:
+            primero = ser.read(1)
+            yield primero + ser.read(ser.in_waiting)
+
+    # POSIX: el selector despierta solo cuando el descriptor tiene bytes
+    ser.timeout = 0
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            selector.select()
+            datos = ser.read(ser.in_waiting or 1)  # Drena todo lo disponible en una sola lectura
+            if datos:
+                yield datos
+
 def main():
+    decodificador = DecodificadorTramas()
     try:
         with serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1) as ser:
             print(f"Escuchando en {SERIAL_PORT}...")
-            while True:
-                if ser.in_waiting > 0:
-                    data = ser.readline().decode().strip()
-                    print(f"Datos recibidos: {data}")
+            for bloque in bloques_recibidos(ser):
+                # Las tramas truncadas o con basura se descartan y se cuentan
+                for trama in decodificador.alimentar(bloque):
+                    print(f"Datos recibidos: {texto_trama(trama)}")
+                    # Sin vistas vivas el siguiente alimentar() compacta el mismo buffer
+                    trama.release()
     except KeyboardInterrupt:
         print("\nPrograma terminado.")
+        print(f"Estadísticas: {decodificador.estadisticas()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,104 @@
+import re
+
+# Decodificador incremental de tramas seriales del simulador/Arduino:
+#   sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
+# Los bytes se acumulan en un solo bytearray reutilizable y las tramas se entregan
+# como memoryview sobre ese buffer (sin copiar). Las líneas que no cumplen el formato
+# (truncadas, basura por baud incorrecto, mensajes de otro tipo) se descartan y cuentan.
+
+CAMPOS_TRAMA = 8
+LONGITUD_MAXIMA = 128  # Bytes máximos de una trama; más largo se considera basura
+
+# Formato estricto de la trama (se valida sobre el buffer, sin copiar la línea)
+PATRON_TRAMA = re.compile(
+    rb'[01],[01],-?\d{1,3}(?:\.\d+)?,\d{1,3}(?:\.\d+)?,[01],[01]{10},[01],[A-Za-z0-9]{0,16}\r?'
+)
+
+
+class DecodificadorTramas:
+    """Separa y valida tramas de un flujo de bytes, con resincronización"""
+
+    def __init__(self, patron=PATRON_TRAMA, longitud_maxima=LONGITUD_MAXIMA):
+        self.patron = patron
+        self.longitud_maxima = longitud_maxima
+        self.buffer = bytearray()
+        self.inicio = 0            # Primer byte aún no procesado del buffer
+        self.descartando = False   # Dentro de una línea demasiado larga: se ignora hasta el próximo '\n'
+
+        self.tramas_validas = 0
+        self.tramas_malformadas = 0
+        self.bytes_descartados = 0
+        self.resincronizaciones = 0
+
+    def alimentar(self, datos):
+        """Agrega bytes recibidos y devuelve las tramas válidas completas como memoryview
+
+        Las vistas apuntan al buffer interno: son válidas hasta que se copien o hasta
+        que el consumidor las libere. Si el consumidor conserva vistas, el siguiente
+        alimentar() usa un buffer nuevo en lugar de compactar el actual.
+        """
+        self._compactar(datos)
+        buffer = self.buffer
+        tramas = []
+
+        vista = memoryview(buffer)
+        while True:
+            fin = buffer.find(b'\n', self.inicio)
+            if fin == -1:
+                break
+            inicio, self.inicio = self.inicio, fin + 1
+
+            if self.descartando:
+                # Cola de una línea demasiado larga: se descarta y se retoma en la siguiente
+                self.descartando = False
+                self.bytes_descartados += fin + 1 - inicio
+                continue
+            if fin == inicio or (fin - inicio == 1 and buffer[inicio] == 0x0D):
+                continue  # Línea vacía
+
+            if fin - inicio <= self.longitud_maxima and self.patron.fullmatch(buffer, inicio, fin):
+                if buffer[fin - 1] == 0x0D:
+                    fin -= 1  # Sin '\r' final
+                tramas.append(vista[inicio:fin])
+                self.tramas_validas += 1
+            else:
+                self.tramas_malformadas += 1
+                self.bytes_descartados += fin + 1 - inicio
+
+        # Línea incompleta demasiado larga: no puede ser una trama, se descarta para resincronizar
+        pendiente = len(buffer) - self.inicio
+        if pendiente > self.longitud_maxima:
+            if not self.descartando:
+                self.tramas_malformadas += 1
+                self.resincronizaciones += 1
+            self.descartando = True
+            self.bytes_descartados += pendiente
+            self.inicio = len(buffer)
+
+        vista.release()  # Las tramas entregadas conservan su propia referencia al buffer
+        return tramas
+
+    def _compactar(self, datos):
+        """Elimina lo ya procesado y agrega los datos nuevos, reutilizando el buffer si se puede"""
+        try:
+            if self.inicio:
+                del self.buffer[:self.inicio]
+            self.buffer += datos
+        except BufferError:
+            # El consumidor conserva vistas de tramas anteriores: se usa un buffer nuevo
+            self.buffer = self.buffer[self.inicio:] + datos
+        self.inicio = 0
+
+    def estadisticas(self):
+        """Devuelve los contadores del decodificador"""
+        return {
+            'tramas_validas': self.tramas_validas,
+            'tramas_malformadas': self.tramas_malformadas,
+            'bytes_descartados': self.bytes_descartados,
+            'resincronizaciones': self.resincronizaciones,
+        }
+
+
+def texto_trama(vista):
+    """Convierte una trama (memoryview) a str para mostrarla"""
+    return str(vista, 'ascii')
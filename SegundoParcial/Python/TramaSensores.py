@@ -0,0 +1,191 @@
+import numpy as np
+
+# Representación tipada de la trama serial:
+#   sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
+# - TramaSensores: una trama con __slots__ y los 10 LEDs como máscara entera de 10 bits
+#   (bit 0 = LED 1, es decir, el primer carácter de "1000000000").
+# - LoteTramas: muchas tramas en un arreglo estructurado de NumPy (~40 bytes por trama),
+#   para que un gateway retenga millones de lecturas en memoria.
+
+CAMPOS_TRAMA = 8
+LONGITUD_RFID = 16  # Igual que el límite de PATRON_TRAMA en DecodificadorTramas
+
+DTYPE_TRAMA = np.dtype([
+    ('ts', '<f8'),            # Timestamp epoch en segundos (0 si no se conoce)
+    ('dispositivo', '<u2'),   # Índice en LoteTramas.dispositivos
+    ('sonico', 'u1'),
+    ('fotoresistencia', 'u1'),
+    ('temperatura', '<f4'),
+    ('humedad', '<f4'),
+    ('led_ultra', 'u1'),
+    ('leds', '<u2'),          # Máscara de 10 bits
+    ('buzzer', 'u1'),
+    ('rfid', f'S{LONGITUD_RFID}'),
+])
+
+
+def leds_a_mascara(leds_binario):
+    """'1010000000' -> 0b0000000101 (el primer carácter es el bit 0)"""
+    return int(leds_binario[::-1], 2)
+
+
+def mascara_a_leds(mascara):
+    """0b0000000101 -> '1010000000'"""
+    return format(mascara, '010b')[::-1]
+
+
+def rfid_a_bytes(rfid):
+    """RFID (str o bytes) listo para el campo del dtype; ValueError si no cabe en LONGITUD_RFID"""
+    if isinstance(rfid, str):
+        rfid = rfid.encode('ascii')
+    if len(rfid) > LONGITUD_RFID:
+        # NumPy lo truncaría sin avisar y el lote guardaría otro ID
+        raise ValueError(f"RFID de {len(rfid)} caracteres (máximo {LONGITUD_RFID})")
+    return rfid
+
+
+def separar_campos(trama):
+    """Divide una trama (str, bytes o memoryview) en sus 8 campos; ValueError si no cumple"""
+    if not isinstance(trama, str):
+        trama = bytes(trama)
+    campos = trama.strip().split(',' if isinstance(trama, str) else b',')
+    if len(campos) != CAMPOS_TRAMA:
+        raise ValueError(f"Se esperaban {CAMPOS_TRAMA} campos, llegaron {len(campos)}")
+    return campos
+
+
+class TramaSensores:
+    """Una lectura del dispositivo con campos tipados"""
+
+    __slots__ = ('sonico', 'fotoresistencia', 'temperatura', 'humedad',
+                 'led_ultra', 'leds', 'buzzer', 'rfid')
+
+    def __init__(self, sonico, fotoresistencia, temperatura, humedad, led_ultra, leds, buzzer, rfid):
+        self.sonico = sonico
+        self.fotoresistencia = fotoresistencia
+        self.temperatura = temperatura
+        self.humedad = humedad
+        self.led_ultra = led_ultra
+        self.leds = leds  # Máscara entera de 10 bits
+        self.buzzer = buzzer
+        self.rfid = rfid
+
+    @classmethod
+    def desde_csv(cls, trama):
+        """Crea la trama a partir del CSV (str, bytes o memoryview del decodificador)"""
+        s, f, t, h, l, b, z, r = separar_campos(trama)
+        return cls(
+            int(s), int(f), float(t), float(h), int(l),
+            leds_a_mascara(b), int(z),
+            r if isinstance(r, str) else r.decode('ascii')
+        )
+
+    def led(self, numero):
+        """Estado (0/1) del LED indicado, numerados del 1 al 10 como en la GUI"""
+        return (self.leds >> (numero - 1)) & 1
+
+    @property
+    def leds_binario(self):
+        return mascara_a_leds(self.leds)
+
+    def a_csv(self):
+        """Serializa en el mismo formato que envía el simulador"""
+        return (
+            f"{self.sonico},{self.fotoresistencia},"
+            f"{self.temperatura:.2f},{self.humedad:.2f},"
+            f"{self.led_ultra},{self.leds_binario},"
+            f"{self.buzzer},{self.rfid}"
+        )
+
+    def __eq__(self, otra):
+        if not isinstance(otra, TramaSensores):
+            return NotImplemented
+        return all(getattr(self, c) == getattr(otra, c) for c in self.__slots__)
+
+    def __repr__(self):
+        return f"TramaSensores({self.a_csv()!r})"
+
+
+class LoteTramas:
+    """Tramas en un arreglo estructurado de NumPy que crece por duplicación"""
+
+    def __init__(self, capacidad=1024):
+        self._datos = np.zeros(capacidad, dtype=DTYPE_TRAMA)
+        self.n = 0
+        self.dispositivos = []  # Identidad de cada índice del campo 'dispositivo'
+        self._indices = {}
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def datos(self):
+        """Vista del arreglo estructurado con las tramas almacenadas (sin copiar)"""
+        return self._datos[:self.n]
+
+    def indice_dispositivo(self, identidad):
+        """Devuelve el índice de la identidad, registrándola si es nueva"""
+        indice = self._indices.get(identidad)
+        if indice is None:
+            indice = self._indices[identidad] = len(self.dispositivos)
+            self.dispositivos.append(identidad)
+        return indice
+
+    def _reservar(self):
+        if self.n == len(self._datos):
+            nuevo = np.zeros(max(1, 2 * len(self._datos)), dtype=DTYPE_TRAMA)
+            nuevo[:self.n] = self._datos
+            self._datos = nuevo
+
+    def agregar(self, trama, ts=0.0, dispositivo=None):
+        """Agrega una TramaSensores; dispositivo es la identidad (ej. puerto o número de serie)"""
+        rfid = rfid_a_bytes(trama.rfid)
+        self._reservar()
+        self._datos[self.n] = (
+            ts, 0 if dispositivo is None else self.indice_dispositivo(dispositivo),
+            trama.sonico, trama.fotoresistencia, trama.temperatura, trama.humedad,
+            trama.led_ultra, trama.leds, trama.buzzer, rfid
+        )
+        self.n += 1
+
+    def agregar_csv(self, trama, ts=0.0, dispositivo=None):
+        """Agrega directamente una trama CSV (str, bytes o memoryview) sin crear TramaSensores"""
+        s, f, t, h, l, b, z, r = separar_campos(trama)
+        r = rfid_a_bytes(r)
+        self._reservar()
+        self._datos[self.n] = (
+            ts, 0 if dispositivo is None else self.indice_dispositivo(dispositivo),
+            int(s), int(f), float(t), float(h), int(l), leds_a_mascara(b), int(z), r
+        )
+        self.n += 1
+
+    @classmethod
+    def desde_lineas(cls, lineas):
+        """Crea un lote a partir de tramas CSV; las líneas que no cumplen el formato se omiten"""
+        lote = cls()
+        for linea in lineas:
+            try:
+                lote.agregar_csv(linea)
+            except ValueError:
+                continue
+        return lote
+
+    def __getitem__(self, i):
+        """Devuelve la trama i como TramaSensores"""
+        if not -self.n <= i < self.n:
+            raise IndexError(i)
+        fila = self._datos[i % self.n]
+        return TramaSensores(
+            int(fila['sonico']), int(fila['fotoresistencia']),
+            round(float(fila['temperatura']), 2), round(float(fila['humedad']), 2),  # float32 -> 2 decimales
+            int(fila['led_ultra']), int(fila['leds']), int(fila['buzzer']),
+            fila['rfid'].decode('ascii')
+        )
+
+    def memoria(self):
+        """Bytes ocupados por las tramas almacenadas"""
+        return self.datos.nbytes
+
+    def guardar(self, ruta):
+        """Guarda las tramas en formato .npy (las identidades se pierden; solo los índices)"""
+        np.save(ruta, self.datos)
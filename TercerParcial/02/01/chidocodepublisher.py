@@ -1,14 +1,31 @@
-import random
-import time
+import os
+import sys
 
 from paho.mqtt import client as mqtt_client
 
-broker = 'broker.emqx.io'
-port = 1883
+PYTHON_MTU = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                                           'proyectoDemoday', 'pythonMTU'))
+sys.path.append(PYTHON_MTU)
+try:
+    from ventanaPublicacion import VentanaPublicacion, formatear_metricas
+    from poolConexiones import identidad_cliente
+except ModuleNotFoundError as e:
+    if e.name not in ('ventanaPublicacion', 'poolConexiones'):
+        raise
+    raise ImportError(f"{e.name}.py not found in {PYTHON_MTU}; these clients need the proyectoDemoday folder") from e
+
+broker = os.environ.get('MQTT_BROKER', 'broker.emqx.io')
+port = int(os.environ.get('MQTT_PORT', 1883))
+# Credentials only from the environment, never sent to the public default broker.
+# For brokerLocal: MQTT_BROKER=127.0.0.1 MQTT_USER=mtuuser MQTT_PASS=amerike, or run it with --anonimo
+username = os.environ.get('MQTT_USER')
+password = os.environ.get('MQTT_PASS')
 topic = "amerike/cyber/mqtt/#"
+qos = 1
+in_flight = 20  # QoS 1 messages allowed without PUBACK
 
 #comentario
-client_id = f'publish-{random.randint(0,1000)}'
+client_id = identidad_cliente('publish')  # stable across restarts, unique on this host
 
 
 
@@ -20,18 +37,24 @@ def connect_mqtt():
             print("Failed to command, return code %d\n", rc)
         
     client = mqtt_client.Client(client_id)
+    if username:
+        client.username_pw_set(username, password)
     client.on_connect = on_connect
     client.connect(broker, port)
     return client
 
 def publish(client):
+    def on_acked(mid, topic, latency):
+        print(f"Acked message {mid} on ´{topic}´ in {latency * 1000:.2f} ms")
+
+    # No sleep between messages: the window blocks only when `in_flight` messages await PUBACK
+    window = VentanaPublicacion(client, in_flight, qos, on_acked)
     msg_count = 1
     while True:
-        time.sleep(1)
         msg = f"messages: (msg_count)"
-        result = client.publish(topic, msg)
+        result = window.publicar(topic, msg)
 
-        status = result[0]
+        status = result.rc
         if status == 0:
             print(f"Send ´{msg}´ to topic ´{topic}´")
         else:
@@ -40,6 +63,10 @@ def publish(client):
         if msg_count > 5:
             break
 
+    if not window.esperar_vacia(timeout=10):
+        print(f"Unacked messages: {window.sin_confirmar(0)}")
+    print(formatear_metricas(window.metricas()))
+
 def run():
     client = connect_mqtt()
     client.loop_start()
@@ -1,14 +1,29 @@
-import random
+import os
+import sys
 import time
 
 from paho.mqtt import client as mqtt_client
 
-broker = 'broker.emqx.io'
-port = 1883
+PYTHON_MTU = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                                           'proyectoDemoday', 'pythonMTU'))
+sys.path.append(PYTHON_MTU)
+try:
+    from poolConexiones import identidad_cliente
+except ModuleNotFoundError as e:
+    if e.name not in ('poolConexiones',):
+        raise
+    raise ImportError(f"{e.name}.py not found in {PYTHON_MTU}; these clients need the proyectoDemoday folder") from e
+
+broker = os.environ.get('MQTT_BROKER', 'broker.emqx.io')
+port = int(os.environ.get('MQTT_PORT', 1883))
+# Credentials only from the environment, never sent to the public default broker.
+# For brokerLocal: MQTT_BROKER=127.0.0.1 MQTT_USER=mtuuser MQTT_PASS=amerike, or run it with --anonimo
+username = os.environ.get('MQTT_USER')
+password = os.environ.get('MQTT_PASS')
 topic = "amerike/cyber/mqtt/#"
 
 #comentario
-client_id = f'publish-{random.randint(0,1000)}'
+client_id = identidad_cliente('subscribe')  # stable across restarts, unique on this host
 
 
 
@@ -20,6 +35,8 @@ def connect_mqtt():
             print("Failed to command, return code %d\n", rc)
         
     client = mqtt_client.Client(client_id)
+    if username:
+        client.username_pw_set(username, password)
     client.on_connect = on_connect
     client.connect(broker, port)
     return client
@@ -0,0 +1,161 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+# Almacén en memoria de series de tiempo por topic (sede/piso/sensor).
+# Cada topic guarda sus últimas N muestras en buffers circulares preasignados de NumPy
+# y mantiene min/max/media/desviación de forma incremental en cada inserción, así que
+# consultar "la temperatura de CDMX P1 en los últimos 5 minutos" es O(1) y no toca la BD.
+
+CAPACIDAD = 4096         # Muestras máximas por topic
+VENTANA = 300.0          # Segundos de historia que cuentan para las estadísticas (None = sin límite)
+TIPOS_NUMERICOS = frozenset({'TEMP', 'HUM'})  # Prefijos cuyo valor es una medición
+
+
+def valor_de_payload(payload):
+    """Extrae el número de 'TEMP:24.5', 'HUM:60' o '24.5'; None para otros tipos (ej. RFID)"""
+    texto = payload.decode(errors='replace') if isinstance(payload, (bytes, bytearray)) else payload
+    tipo, separador, valor = texto.partition(':')
+    if not separador:
+        valor = tipo
+    elif tipo not in TIPOS_NUMERICOS:
+        return None  # 'RFID:12345' es un UID, no una medición
+    try:
+        numero = float(valor)
+    except ValueError:
+        return None
+    return numero if math.isfinite(numero) else None
+
+
+class SerieCircular:
+    """Últimas muestras de un sensor con estadísticas móviles incrementales"""
+
+    def __init__(self, capacidad=CAPACIDAD, ventana=VENTANA):
+        self.capacidad = capacidad
+        self.ventana = ventana
+        self.valores = np.empty(capacidad, dtype=np.float64)
+        self.tiempos = np.empty(capacidad, dtype=np.float64)
+        self.total = 0       # Muestras insertadas desde el inicio (número de secuencia)
+        self.n = 0           # Muestras dentro de la ventana
+        self.referencia = 0.0  # Desplazamiento para que las sumas no pierdan precisión
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.expulsiones = 0
+        self._minimos = deque()  # Secuencias con valores crecientes (el frente es el mínimo)
+        self._maximos = deque()  # Secuencias con valores decrecientes (el frente es el máximo)
+
+    def insertar(self, valor, ts=None):
+        """Agrega una muestra y actualiza las estadísticas en O(1) amortizado"""
+        ts = time.time() if ts is None else ts
+        if self.total == 0:
+            self.referencia = valor
+        if self.n == self.capacidad:
+            self._expulsar()
+        self._expulsar_antiguas(ts)
+
+        secuencia = self.total
+        posicion = secuencia % self.capacidad
+        self.valores[posicion] = valor
+        self.tiempos[posicion] = ts
+        self.total += 1
+        self.n += 1
+
+        d = valor - self.referencia
+        self.suma += d
+        self.suma_cuadrados += d * d
+
+        while self._minimos and self.valores[self._minimos[-1] % self.capacidad] >= valor:
+            self._minimos.pop()
+        self._minimos.append(secuencia)
+        while self._maximos and self.valores[self._maximos[-1] % self.capacidad] <= valor:
+            self._maximos.pop()
+        self._maximos.append(secuencia)
+
+    def _expulsar(self):
+        """Saca la muestra más antigua de la ventana"""
+        secuencia = self.total - self.n
+        d = float(self.valores[secuencia % self.capacidad]) - self.referencia
+        self.suma -= d
+        self.suma_cuadrados -= d * d
+        self.n -= 1
+        if self._minimos[0] == secuencia:
+            self._minimos.popleft()
+        if self._maximos[0] == secuencia:
+            self._maximos.popleft()
+
+        # Recalcula las sumas de vez en cuando para que el error de redondeo no se acumule
+        self.expulsiones += 1
+        if self.expulsiones % self.capacidad == 0:
+            self._recalcular()
+
+    def _expulsar_antiguas(self, ahora):
+        """Saca las muestras que quedaron fuera de la ventana de tiempo"""
+        if self.ventana is None:
+            return
+        limite = ahora - self.ventana
+        while self.n and self.tiempos[(self.total - self.n) % self.capacidad] < limite:
+            self._expulsar()
+
+    def _recalcular(self):
+        d = self.muestras() - self.referencia
+        self.suma = float(d.sum())
+        self.suma_cuadrados = float((d * d).sum())
+
+    def muestras(self):
+        """Copia de los valores dentro de la ventana, del más antiguo al más reciente"""
+        indices = np.arange(self.total - self.n, self.total) % self.capacidad
+        return self.valores[indices]
+
+    def estadisticas(self, ahora=None):
+        """Devuelve n, ultimo, min, max, media y desviación de la ventana actual"""
+        self._expulsar_antiguas(time.time() if ahora is None else ahora)
+        if self.n == 0:
+            return {'n': 0}
+        media = self.suma / self.n
+        varianza = max(0.0, self.suma_cuadrados / self.n - media * media)
+        return {
+            'n': self.n,
+            'ultimo': float(self.valores[(self.total - 1) % self.capacidad]),
+            'min': float(self.valores[self._minimos[0] % self.capacidad]),
+            'max': float(self.valores[self._maximos[0] % self.capacidad]),
+            'media': float(media + self.referencia),
+            'desviacion': float(varianza ** 0.5),
+        }
+
+
+class AlmacenSeries:
+    """Una SerieCircular por topic, creada al recibir la primera muestra"""
+
+    def __init__(self, capacidad=CAPACIDAD, ventana=VENTANA):
+        self.capacidad = capacidad
+        self.ventana = ventana
+        self.series = {}
+
+    def insertar(self, topic, valor, ts=None):
+        serie = self.series.get(topic)
+        if serie is None:
+            serie = self.series[topic] = SerieCircular(self.capacidad, self.ventana)
+        serie.insertar(valor, ts)
+
+    def insertar_mensaje(self, topic, payload, ts=None):
+        """Inserta el valor numérico de un mensaje MQTT; devuelve False si no era numérico"""
+        valor = valor_de_payload(payload)
+        if valor is None:
+            return False
+        self.insertar(topic, valor, ts)
+        return True
+
+    def consultar(self, topic, ahora=None):
+        """Estadísticas móviles del topic ({'n': 0} si no hay muestras)"""
+        serie = self.series.get(topic)
+        return serie.estadisticas(ahora) if serie else {'n': 0}
+
+
+def formatear_estadisticas(stats):
+    """Texto corto de las estadísticas para imprimir en los subscribers"""
+    if not stats['n']:
+        return "sin muestras"
+    return (f"n={stats['n']} min={stats['min']:.2f} max={stats['max']:.2f} "
+            f"media={stats['media']:.2f} σ={stats['desviacion']:.2f}")
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from paho.mqtt import client as mqtt_client
+
+from brokerLocal import BrokerLocal
+from compresionDiccionario import Compresor
+from enrutadorTopics import EnrutadorTopics
+from loteLecturas import AcumuladorLote, codecs_disponibles, expandir
+from ventanaPublicacion import VentanaPublicacion
+
+# Benchmark de un mensaje por lectura contra lotes (loteLecturas.py) con cada codec.
+# Se publican las mismas lecturas TEMP/HUM/RFID de varios dispositivos y un subscriber
+# las expande; por modo se mide lecturas/s de extremo a extremo, mensajes y bytes en la
+# red por lectura, y el CPU de codificar + expandir por lectura. Los lotes JSON también se
+# miden comprimidos con el último diccionario (compresionDiccionario.py).
+#   python benchmarkLote.py --lecturas 30000 --dispositivos 50 --por-lote 100
+
+LECTURAS = 20000
+DISPOSITIVOS = 20
+POR_LOTE = 100
+EN_VUELO = 100
+ESPERA_MAXIMA = 30.0
+username = 'mtuuser'
+password = 'amerike'
+
+TRAMAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'SERVIDORES', 'SerialToMqtt',
+                      'received_serial_data.txt')
+
+
+def lecturas_grabadas(cantidad, dispositivos):
+    """[(topic, mensaje)] con los valores de received_serial_data.txt repartidos entre dispositivos"""
+    valores = []
+    if os.path.exists(TRAMAS):
+        with open(TRAMAS) as f:
+            for linea in f:
+                partes = linea.rpartition(': ')[2].strip().split(',')
+                if len(partes) == 8:
+                    valores.append((f"TEMP:{partes[2]}", f"HUM:{partes[3]}", f"RFID:{partes[7]}"))
+    valores = valores or [('TEMP:22.50', 'HUM:45.00', 'RFID:ID0001ABC')]
+    enrutadores = [EnrutadorTopics('bench', f"d{i}", autorizados=None) for i in range(dispositivos)]
+    lecturas = []
+    i = 0
+    while len(lecturas) < cantidad:
+        enrutador = enrutadores[i % dispositivos]
+        for mensaje in valores[(i // dispositivos) % len(valores)]:
+            lecturas.append((enrutador.topic(mensaje), mensaje))
+        i += 1
+    return lecturas[:cantidad]
+
+
+def conectar(client_id, on_message=None):
+    client = mqtt_client.Client(client_id)
+    client.username_pw_set(username, password)
+    conectado = threading.Event()
+    client.on_connect = lambda client, userdata, flags, rc: conectado.set()
+    client.on_message = on_message
+    return client, conectado
+
+
+def ejecutar_modo(broker, port, lecturas, codec, por_lote, qos, compresor=None):
+    """codec None = un mensaje por lectura"""
+    recibidas = [0]
+    cpu_expandir = [0.0]
+    fin = [0.0]
+    completo = threading.Event()
+
+    def on_message(client, userdata, msg):
+        inicio = time.perf_counter()
+        eventos = expandir(msg)
+        cpu_expandir[0] += time.perf_counter() - inicio
+        recibidas[0] += len(eventos)
+        if recibidas[0] >= len(lecturas):
+            fin[0] = time.perf_counter()
+            completo.set()
+
+    sub, sub_conectado = conectar(f'bench-lote-sub-{os.getpid()}', on_message)
+    sub.connect(broker, port)
+    sub.loop_start()
+    sub_conectado.wait(10)
+    sub.subscribe('bench/#', qos)
+    time.sleep(0.2)
+
+    pub, pub_conectado = conectar(f'bench-lote-pub-{os.getpid()}')
+    pub.connect(broker, port)
+    pub.loop_start()
+    pub_conectado.wait(10)
+    ventana = VentanaPublicacion(pub, EN_VUELO, qos)
+
+    topic_lote = EnrutadorTopics('bench', 'lotes').lote
+    acumulador = AcumuladorLote(codec, maximo=por_lote, intervalo=float('inf'), compresor=compresor) if codec else None
+    cpu_codificar = 0.0
+    bytes_red = 0
+    mensajes = 0
+    inicio = time.perf_counter()
+    for topic, mensaje in lecturas:
+        if acumulador is None:
+            ventana.publicar(topic, mensaje)
+            bytes_red += len(topic) + len(mensaje)
+            mensajes += 1
+            continue
+        t = time.perf_counter()
+        payload = acumulador.agregar(topic, mensaje)
+        cpu_codificar += time.perf_counter() - t
+        if payload is not None:
+            ventana.publicar(topic_lote, payload)
+            bytes_red += len(topic_lote) + len(payload)
+            mensajes += 1
+    if acumulador is not None:
+        t = time.perf_counter()
+        payload = acumulador.vaciar()
+        cpu_codificar += time.perf_counter() - t
+        if payload is not None:
+            ventana.publicar(topic_lote, payload)
+            bytes_red += len(topic_lote) + len(payload)
+            mensajes += 1
+    ventana.esperar_vacia(ESPERA_MAXIMA)
+    completo.wait(ESPERA_MAXIMA)
+
+    for client in (pub, sub):
+        client.disconnect()
+        client.loop_stop()
+
+    n = len(lecturas)
+    transcurrido = (fin[0] or time.perf_counter()) - inicio
+    return {
+        'modo': (f"lote-{codec}" + (f"+{compresor.nombre}" if compresor else '')) if codec else 'individual',
+        'lecturas': n,
+        'recibidas': recibidas[0],
+        'mensajes': mensajes,
+        'lecturas_por_s': recibidas[0] / transcurrido,
+        # Topic + payload + ~4 bytes de encabezado fijo/longitudes MQTT por mensaje
+        'bytes_por_lectura': (bytes_red + 4 * mensajes) / n,
+        'cpu_us_por_lectura': (cpu_codificar + cpu_expandir[0]) / n * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de lotes de lecturas contra un mensaje por lectura")
+    parser.add_argument("--broker", help="Host de un broker externo (por defecto se levanta brokerLocal)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--lecturas", type=int, default=LECTURAS)
+    parser.add_argument("--dispositivos", type=int, default=DISPOSITIVOS)
+    parser.add_argument("--por-lote", type=int, default=POR_LOTE, help="Lecturas por lote")
+    parser.add_argument("--qos", type=int, default=0)
+    parser.add_argument("--salida", help="Guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    broker_local = None
+    broker, port = args.broker, args.port
+    if broker is None:
+        broker_local = BrokerLocal(puerto=0).iniciar_en_hilo()
+        broker, port = '127.0.0.1', broker_local.puerto
+
+    lecturas = lecturas_grabadas(args.lecturas, args.dispositivos)
+    resultados = []
+    try:
+        modos = [(None, None)] + [(codec, None) for codec in codecs_disponibles()] + [('json', Compresor.cargar())]
+        for codec, compresor in modos:
+            r = ejecutar_modo(broker, port, lecturas, codec, args.por_lote, args.qos, compresor)
+            resultados.append(r)
+            print(f"⏱️ {r['modo']:20} {r['lecturas_por_s']:9.0f} lecturas/s, {r['mensajes']:6} mensajes, "
+                  f"{r['bytes_por_lectura']:5.1f} B/lectura, CPU {r['cpu_us_por_lectura']:.2f} µs/lectura, "
+                  f"recibidas {r['recibidas']}/{r['lecturas']}")
+    finally:
+        if broker_local:
+            broker_local.detener()
+
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"💾 Resultados guardados en {args.salida}")
+
+if __name__ == '__main__':
+    main()
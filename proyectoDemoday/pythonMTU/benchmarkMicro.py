@@ -0,0 +1,171 @@
+import argparse
+import contextlib
+import gc
+import itertools
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+# Micro-benchmarks de las funciones que corren por cada trama/mensaje.
+# Para cada caso reporta:
+#   ns/op      tiempo por llamada (mínimo de varias repeticiones, sin el costo de la llamada vacía)
+#   B/op       memoria pico que asigna una llamada (tracemalloc), aunque se libere al terminar
+# Python no expone un contador de asignaciones como Go; B/op es su aproximación.
+# Se miden las funciones puras que usan los scripts (EnrutadorTopics, expandir, AlmacenSeries),
+# no los scripts: importarlos ejecuta su código de módulo (identidad_cliente, candados en /tmp).
+#
+#   python benchmarkMicro.py --guardar base.json       # línea base
+#   python benchmarkMicro.py --comparar base.json      # marca regresiones contra la base
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(AQUI, '..', 'simuladorArduino'))
+sys.path.append(os.path.join(AQUI, '..', '..', 'SegundoParcial', 'Python'))
+
+REPETICIONES = 5
+LLAMADAS_MEMORIA = 200
+VALORES_DISTINTOS = 10000  # Lecturas distintas que rotan los casos 'variado'
+TOLERANCIA = 0.10  # Más lento que la base por encima de esto se marca como regresión
+
+TRAMA = "0,1,22.50,45.00,0,1000000000,0,ID0001ABC"
+
+
+class SalidaNula:
+    """stdout que descarta todo, para medir on_message sin el costo de la terminal"""
+
+    def write(self, texto):
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def casos():
+    """[(nombre, función sin argumentos)] de los caminos por mensaje"""
+    from estadoDispositivo import EstadoDispositivo
+    from simuladorGUI import EnhancedSensorUI
+    from DecodificadorTramas import DecodificadorTramas
+    from TramaSensores import LoteTramas, TramaSensores, separar_campos
+    from almacenSeries import AlmacenSeries
+    from enrutadorTopics import TablaTopics
+    from loteLecturas import expandir
+
+    # La GUI sin ventana: solo se necesita la instantánea que leen los métodos
+    gui = EnhancedSensorUI.__new__(EnhancedSensorUI)
+    gui.estado = EstadoDispositivo(leds=(1, 0, 1, 0, 0, 0, 0, 0, 0, 1))
+
+    decodificador = DecodificadorTramas()
+    linea = (TRAMA + "\n").encode()
+    lote = LoteTramas()
+    msg_temp = SimpleNamespace(topic='amerikeCDMX/P1/temp', payload=b'TEMP:24.50')
+    msg_rfid = SimpleNamespace(topic='amerike/sensor/rfid', payload=b'RFID:12345')
+    # La misma tabla que publisherPruebas.get_topic_from_data
+    enrutador = TablaTopics(plantilla='amerike/sensor/{sufijo}', autorizados=None).para('amerikeCDMX', 'P1')
+    almacen = AlmacenSeries(ventana=300)
+
+    def recibir(msg):
+        """Lo que hace on_message de los subscribers por mensaje, sin imprimir"""
+        for topic, payload, ts in expandir(msg):
+            if almacen.insertar_mensaje(topic, payload, ts):
+                almacen.consultar(topic)
+    # Lecturas reales: el valor cambia en cada mensaje, así que no sirve medir solo una constante
+    temps = itertools.cycle([f"TEMP:{20 + i / 100:.2f}" for i in range(VALORES_DISTINTOS)])
+    rfids = itertools.cycle([f"RFID:ID{i:04d}ABC" for i in range(VALORES_DISTINTOS)])
+
+    return [
+        ('EnhancedSensorUI.generate_data_string', gui.generate_data_string),
+        ('EnhancedSensorUI.get_leds_binary', gui.get_leds_binary),
+        ('EstadoDispositivo.reemplazar', lambda: gui.estado.reemplazar(temperatura=23.0)),
+        ('EnrutadorTopics.topic[TEMP]', lambda: enrutador.topic('TEMP:24.5')),
+        ('EnrutadorTopics.topic[otros]', lambda: enrutador.topic('LUZ:1')),
+        ('EnrutadorTopics.topic[TEMP variado]', lambda: enrutador.topic(next(temps))),
+        ('EnrutadorTopics.topic[RFID variado]', lambda: enrutador.topic(next(rfids))),
+        ('csv.separar_campos', lambda: separar_campos(TRAMA)),
+        ('csv.TramaSensores.desde_csv', lambda: TramaSensores.desde_csv(TRAMA)),
+        ('csv.LoteTramas.agregar_csv', lambda: lote.agregar_csv(TRAMA)),
+        ('csv.DecodificadorTramas.alimentar', lambda: decodificador.alimentar(linea)),
+        ('recibir[TEMP]', lambda: recibir(msg_temp)),
+        ('recibir[RFID]', lambda: recibir(msg_rfid)),
+    ]
+
+
+def medir_tiempo(funcion):
+    """ns por llamada: mínimo de REPETICIONES corridas de autorange"""
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    return min(temporizador.repeat(REPETICIONES, numero)) / numero * 1e9
+
+
+def medir_memoria(funcion):
+    """Bytes pico por llamada"""
+    funcion()  # Calienta cachés e imports perezosos
+    gc.collect()
+    tracemalloc.start()
+    pico = 0
+    for _ in range(LLAMADAS_MEMORIA):
+        actual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        funcion()
+        pico += tracemalloc.get_traced_memory()[1] - actual
+    tracemalloc.stop()
+    return pico / LLAMADAS_MEMORIA
+
+
+def ejecutar(filtro=None):
+    vacia = medir_tiempo(lambda: None)
+    resultados = {}
+    with contextlib.redirect_stdout(SalidaNula()):
+        lista = casos()
+    for nombre, funcion in lista:
+        if filtro and filtro not in nombre:
+            continue
+        with contextlib.redirect_stdout(SalidaNula()):
+            ns = max(0.0, medir_tiempo(funcion) - vacia)
+            bytes_op = medir_memoria(funcion)
+        resultados[nombre] = {'ns_op': ns, 'bytes_op': bytes_op}
+    return resultados
+
+
+def imprimir(resultados, base=None):
+    print(f"{'caso':40} {'ns/op':>10} {'B/op':>8}  vs base")
+    regresiones = []
+    for nombre, r in resultados.items():
+        comparacion = ''
+        anterior = (base or {}).get(nombre)
+        if anterior and anterior['ns_op'] > 0:
+            cambio = r['ns_op'] / anterior['ns_op'] - 1
+            comparacion = f"{cambio * 100:+.1f}%"
+            if cambio > TOLERANCIA:
+                comparacion += " ⚠️"
+                regresiones.append(nombre)
+        print(f"{nombre:40} {r['ns_op']:10.1f} {r['bytes_op']:8.0f}  {comparacion}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de los caminos por mensaje")
+    parser.add_argument("--filtro", help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--guardar", help="Guarda los resultados como línea base (JSON)")
+    parser.add_argument("--comparar", help="Línea base JSON contra la cual comparar")
+    args = parser.parse_args()
+
+    base = None
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+
+    resultados = ejecutar(args.filtro)
+    regresiones = imprimir(resultados, base)
+
+    if args.guardar:
+        with open(args.guardar, 'w') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"💾 Línea base guardada en {args.guardar}")
+    if regresiones:
+        print(f"⚠️ {len(regresiones)} casos más de {TOLERANCIA * 100:.0f}% más lentos que la base")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
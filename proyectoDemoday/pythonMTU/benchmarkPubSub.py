@@ -0,0 +1,249 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import struct
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+from paho.mqtt import client as mqtt_client
+
+from brokerLocal import BrokerLocal
+from ventanaPublicacion import VentanaPublicacion, percentil
+
+# Benchmark de extremo a extremo de los caminos publish/subscribe.
+# Cada escenario levanta P publishers (como publisherPruebas) y S subscribers
+# (como subscriberGrl) contra un broker (el local por defecto) y mide msgs/s,
+# latencia publish -> on_message (p50/p99/p999) y pérdida. Los resultados se
+# guardan en JSON para comparar entre versiones:
+#   python benchmarkPubSub.py --salida resultados.json --comparar base.json
+
+TAMANOS = [16, 256, 4096]
+QOS = [0, 1]
+PUBLICADORES = [1, 4]
+SUBSCRIPTORES = [1, 4]
+MENSAJES = 2000            # Mensajes por publisher en cada escenario
+EN_VUELO = 100
+ESPERA_MAXIMA = 30.0       # Segundos máximos esperando las entregas de un escenario
+SILENCIO = 2.0             # Sin mensajes nuevos durante este tiempo se da por terminado
+
+TOPIC_BASE = 'bench'
+ENCABEZADO = struct.Struct('<QII')  # ns de envío, publisher, secuencia
+username = 'mtuuser'
+password = 'amerike'
+
+
+class SubscriptorBenchmark:
+    """Cliente que registra latencia y secuencias de cada mensaje recibido"""
+
+    def __init__(self, indice, broker, port, qos):
+        self.latencias = []
+        self.vistos = set()
+        self.duplicados = 0
+        self.ultimo_recibido = 0.0  # perf_counter de la última entrega nueva
+        self._candado = threading.Lock()
+        self.listo = threading.Event()
+
+        def on_connect(client, userdata, flags, rc):
+            client.subscribe(f"{TOPIC_BASE}/#", qos)
+
+        def on_subscribe(client, userdata, mid, granted_qos):
+            self.listo.set()
+
+        def on_message(client, userdata, msg):
+            ahora = time.time_ns()
+            enviado, publisher, secuencia = ENCABEZADO.unpack_from(msg.payload)
+            with self._candado:
+                if (publisher, secuencia) in self.vistos:
+                    self.duplicados += 1
+                    return
+                self.vistos.add((publisher, secuencia))
+                self.latencias.append(ahora - enviado)
+                self.ultimo_recibido = time.perf_counter()
+
+        self.client = mqtt_client.Client(f'bench-sub-{os.getpid()}-{indice}')
+        self.client.username_pw_set(username, password)
+        self.client.on_connect = on_connect
+        self.client.on_subscribe = on_subscribe
+        self.client.on_message = on_message
+        self.client.connect(broker, port)
+        self.client.loop_start()
+
+    def cerrar(self):
+        self.client.disconnect()
+        self.client.loop_stop()
+
+
+def publicar(indice, broker, port, qos, tamano, mensajes, resultado):
+    """Publica mensajes lo más rápido que permite la ventana; guarda (inicio, fin) en resultado"""
+    client = mqtt_client.Client(f'bench-pub-{os.getpid()}-{indice}')
+    client.username_pw_set(username, password)
+    conectado = threading.Event()
+    client.on_connect = lambda client, userdata, flags, rc: conectado.set()
+    client.connect(broker, port)
+    client.loop_start()
+    conectado.wait(10)
+
+    ventana = VentanaPublicacion(client, EN_VUELO, qos)
+    topic = f"{TOPIC_BASE}/{indice}"
+    relleno = b'x' * max(0, tamano - ENCABEZADO.size)
+    inicio = time.perf_counter()
+    for secuencia in range(mensajes):
+        ventana.publicar(topic, ENCABEZADO.pack(time.time_ns(), indice, secuencia) + relleno)
+    ventana.esperar_vacia(ESPERA_MAXIMA)
+    resultado[indice] = (inicio, time.perf_counter(), ventana.metricas())
+    client.disconnect()
+    client.loop_stop()
+
+
+def ejecutar_escenario(broker, port, tamano, qos, publicadores, subscriptores, mensajes):
+    subs = [SubscriptorBenchmark(i, broker, port, qos) for i in range(subscriptores)]
+    for sub in subs:
+        sub.listo.wait(10)
+
+    resultado = {}
+    hilos = [threading.Thread(target=publicar, args=(i, broker, port, qos, tamano, mensajes, resultado))
+             for i in range(publicadores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Espera las entregas pendientes hasta que no llegue nada durante SILENCIO segundos
+    esperados = publicadores * mensajes
+    limite = time.monotonic() + ESPERA_MAXIMA
+    anterior, cambio = -1, time.monotonic()
+    while time.monotonic() < limite:
+        recibidos = sum(len(sub.vistos) for sub in subs)
+        if recibidos >= esperados * subscriptores:
+            break
+        if recibidos != anterior:
+            anterior, cambio = recibidos, time.monotonic()
+        elif time.monotonic() - cambio > SILENCIO:
+            break
+        time.sleep(0.05)
+    for sub in subs:
+        sub.cerrar()
+
+    inicio = min(r[0] for r in resultado.values())
+    fin = max(r[1] for r in resultado.values())
+    # Las entregas siguen llegando después de que los publishers terminan: su tasa se mide
+    # hasta la última entrega, no hasta el último envío
+    fin_entregas = max([sub.ultimo_recibido for sub in subs] + [inicio])
+    latencias = sorted(itertools.chain.from_iterable(sub.latencias for sub in subs))
+    recibidos = sum(len(sub.vistos) for sub in subs)
+    enviados = sum(r[2]['publicados'] for r in resultado.values())
+
+    def ms(p):
+        valor = percentil(latencias, p)
+        return None if valor is None else valor / 1e6
+
+    return {
+        'tamano': tamano,
+        'qos': qos,
+        'publicadores': publicadores,
+        'subscriptores': subscriptores,
+        'enviados': enviados,
+        'recibidos': recibidos,
+        'duplicados': sum(sub.duplicados for sub in subs),
+        'perdida': 1 - recibidos / (esperados * subscriptores),
+        'publicados_por_s': enviados / (fin - inicio),
+        'entregados_por_s': recibidos / (fin_entregas - inicio) if fin_entregas > inicio else 0.0,
+        'latencia_p50_ms': ms(50),
+        'latencia_p99_ms': ms(99),
+        'latencia_p999_ms': ms(99.9),
+    }
+
+
+def version_codigo():
+    """Commit actual del repositorio, para identificar los resultados"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def clave(escenario):
+    return (escenario['tamano'], escenario['qos'], escenario['publicadores'], escenario['subscriptores'])
+
+
+def comparar(base, escenarios):
+    """Imprime la variación de msgs/s y p99 contra un JSON de resultados anterior"""
+    anteriores = {clave(e): e for e in base['escenarios']}
+    print(f"\n📐 Comparación contra {base.get('version')} ({base.get('fecha')})")
+    for e in escenarios:
+        a = anteriores.get(clave(e))
+        if a is None:
+            continue
+        # Una base sin entregas o con p99 de 0 ms no sirve de referencia: se marca, no se divide
+        if a.get('entregados_por_s'):
+            tasa = f"{(e['entregados_por_s'] / a['entregados_por_s'] - 1) * 100:+.1f}%"
+        else:
+            tasa = "sin entregas en la base"
+        p99 = ''
+        if e['latencia_p99_ms'] is not None and a.get('latencia_p99_ms'):
+            p99 = f", p99 {(e['latencia_p99_ms'] / a['latencia_p99_ms'] - 1) * 100:+.1f}%"
+        elif e['latencia_p99_ms'] is not None:
+            p99 = ", p99 sin referencia en la base"
+        print(f"   {formatear_clave(e)}: msgs/s {tasa}{p99}")
+
+
+def formatear_clave(e):
+    return f"{e['tamano']}B QoS{e['qos']} {e['publicadores']}pub/{e['subscriptores']}sub"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput/latencia publish-subscribe")
+    parser.add_argument("--broker", help="Host de un broker externo (por defecto se levanta brokerLocal)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS, help="Bytes de payload")
+    parser.add_argument("--qos", type=int, nargs="+", default=QOS)
+    parser.add_argument("--publicadores", type=int, nargs="+", default=PUBLICADORES)
+    parser.add_argument("--subscriptores", type=int, nargs="+", default=SUBSCRIPTORES)
+    parser.add_argument("--mensajes", type=int, default=MENSAJES, help="Mensajes por publisher")
+    parser.add_argument("--salida", default=f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    broker_local = None
+    broker, port = args.broker, args.port
+    if broker is None:
+        broker_local = BrokerLocal(puerto=0).iniciar_en_hilo()
+        broker, port = '127.0.0.1', broker_local.puerto
+
+    escenarios = []
+    try:
+        for tamano, qos, pubs, subs in itertools.product(args.tamanos, args.qos, args.publicadores,
+                                                         args.subscriptores):
+            e = ejecutar_escenario(broker, port, tamano, qos, pubs, subs, args.mensajes)
+            escenarios.append(e)
+            p99 = e['latencia_p99_ms']
+            print(f"⏱️ {formatear_clave(e)}: {e['entregados_por_s']:.0f} msgs/s entregados, "
+                  f"p50={e['latencia_p50_ms'] or 0:.2f} ms p99={p99 or 0:.2f} ms "
+                  f"p999={e['latencia_p999_ms'] or 0:.2f} ms, pérdida={e['perdida'] * 100:.2f}%")
+    finally:
+        if broker_local:
+            broker_local.detener()
+
+    resultados = {
+        'version': version_codigo(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'broker': 'brokerLocal' if broker_local else f"{broker}:{port}",
+        'mensajes_por_publicador': args.mensajes,
+        'escenarios': escenarios,
+    }
+    with open(args.salida, 'w') as f:
+        json.dump(resultados, f, indent=2)
+    print(f"💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            comparar(json.load(f), escenarios)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,461 @@
+import argparse
+import asyncio
+import struct
+import threading
+import time
+
+# Broker MQTT 3.1.1 mínimo sobre asyncio, para probar y medir los publishers/subscribers
+# sin la VM de Mosquitto. Soporta CONNECT con usuario/contraseña, SUBSCRIBE/UNSUBSCRIBE
+# con comodines + y #, PUBLISH QoS 0/1, mensajes retenidos, will, keepalive y PINGREQ.
+# QoS 2 se degrada a QoS 1. No guarda sesiones: cada conexión empieza limpia.
+#
+# Para apuntar los clientes a este broker:  MQTT_BROKER=127.0.0.1 python subscriberGrl.py
+
+HOST = '127.0.0.1'
+PUERTO = 1883
+USUARIOS = {'mtuuser': 'amerike'}  # Mismo usuario que la VM de Mosquitto
+INTERVALO_REPORTE = 10.0
+LIMITE_BUFFER = 1024 * 1024  # Bytes pendientes de un subscriber lento antes de descartar QoS 0
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+# Códigos de CONNACK
+ACEPTADA = 0
+PROTOCOLO_INVALIDO = 1
+USUARIO_INVALIDO = 4
+NO_AUTORIZADO = 5
+
+
+class ErrorProtocolo(Exception):
+    """El cliente envió un paquete que no cumple MQTT 3.1.1"""
+
+
+def codificar_largo(largo):
+    """Remaining length en el formato variable de MQTT (1 a 4 bytes)"""
+    salida = bytearray()
+    while True:
+        byte, largo = largo % 128, largo // 128
+        salida.append(byte | 0x80 if largo else byte)
+        if not largo:
+            return bytes(salida)
+
+
+def codificar_texto(texto):
+    datos = texto.encode() if isinstance(texto, str) else texto
+    return struct.pack('!H', len(datos)) + datos
+
+
+def paquete(tipo, flags, cuerpo):
+    return bytes([tipo << 4 | flags]) + codificar_largo(len(cuerpo)) + cuerpo
+
+
+def paquete_publish(topic, payload, qos, retain, mid=None):
+    cuerpo = codificar_texto(topic) + (struct.pack('!H', mid) if qos else b'') + payload
+    return paquete(PUBLISH, qos << 1 | retain, cuerpo)
+
+
+def coincide(filtro, topic):
+    """True si el topic cumple el filtro de suscripción (con + y #)"""
+    if filtro == topic:
+        return True
+    partes_filtro = filtro.split('/')
+    partes_topic = topic.split('/')
+    if topic.startswith('$') and partes_filtro[0] in ('+', '#'):
+        return False  # Los topics $SYS no coinciden con comodines al inicio
+    for i, parte in enumerate(partes_filtro):
+        if parte == '#':
+            return True
+        if i >= len(partes_topic) or (parte != '+' and parte != partes_topic[i]):
+            return False
+    return len(partes_filtro) == len(partes_topic)
+
+
+def filtro_valido(filtro):
+    if not filtro:
+        return False
+    partes = filtro.split('/')
+    for i, parte in enumerate(partes):
+        if '#' in parte and (parte != '#' or i != len(partes) - 1):
+            return False
+        if '+' in parte and parte != '+':
+            return False
+    return True
+
+
+class Lector:
+    """Campos de un cuerpo de paquete, leídos en orden"""
+
+    def __init__(self, datos):
+        self.datos = datos
+        self.pos = 0
+
+    def entero(self):
+        if self.pos + 2 > len(self.datos):
+            raise ErrorProtocolo("paquete truncado")
+        valor, = struct.unpack_from('!H', self.datos, self.pos)
+        self.pos += 2
+        return valor
+
+    def binario(self):
+        largo = self.entero()
+        if self.pos + largo > len(self.datos):
+            raise ErrorProtocolo("paquete truncado")
+        valor = self.datos[self.pos:self.pos + largo]
+        self.pos += largo
+        return valor
+
+    def texto(self):
+        try:
+            return self.binario().decode()
+        except UnicodeDecodeError:
+            raise ErrorProtocolo("texto no es UTF-8")
+
+    def byte(self):
+        if self.pos >= len(self.datos):
+            raise ErrorProtocolo("paquete truncado")
+        self.pos += 1
+        return self.datos[self.pos - 1]
+
+    def resto(self):
+        return self.datos[self.pos:]
+
+
+class EstadisticasTopic:
+    """Contadores de un topic para calcular su tasa entre reportes"""
+
+    def __init__(self):
+        self.recibidos = 0
+        self.entregados = 0
+        self.bytes = 0
+        self.recibidos_reporte = 0
+
+
+class Sesion:
+    """Una conexión de cliente"""
+
+    def __init__(self, broker, lector, escritor):
+        self.broker = broker
+        self.lector = lector
+        self.escritor = escritor
+        self.client_id = None
+        self.suscripciones = {}  # filtro -> qos
+        self.keepalive = 0
+        self.will = None         # (topic, payload, qos, retain)
+        self.siguiente_mid = 0
+        self.descartados = 0
+
+    def enviar(self, datos):
+        self.escritor.write(datos)
+
+    def nuevo_mid(self):
+        self.siguiente_mid = self.siguiente_mid % 65535 + 1
+        return self.siguiente_mid
+
+    def saturada(self):
+        return self.escritor.transport.get_write_buffer_size() > LIMITE_BUFFER
+
+    async def leer_paquete(self):
+        encabezado = await self.lector.readexactly(1)
+        largo = 0
+        for multiplicador in (1, 128, 128 ** 2, 128 ** 3):
+            byte = (await self.lector.readexactly(1))[0]
+            largo += (byte & 0x7F) * multiplicador
+            if not byte & 0x80:
+                break
+        else:
+            raise ErrorProtocolo("remaining length inválido")
+        cuerpo = await self.lector.readexactly(largo) if largo else b''
+        return encabezado[0] >> 4, encabezado[0] & 0x0F, cuerpo
+
+    def cerrar(self):
+        if not self.escritor.is_closing():
+            self.escritor.close()
+
+
+class BrokerLocal:
+    """Broker MQTT en memoria; usuarios=None acepta conexiones anónimas"""
+
+    def __init__(self, host=HOST, puerto=PUERTO, usuarios=USUARIOS, intervalo_reporte=None):
+        self.host = host
+        self.puerto = puerto
+        self.usuarios = usuarios
+        self.intervalo_reporte = intervalo_reporte
+        self.sesiones = {}        # client_id -> Sesion
+        self.suscripciones = {}   # filtro -> {Sesion: qos}
+        self.retenidos = {}       # topic -> (payload, qos)
+        self.estadisticas = {}    # topic -> EstadisticasTopic
+        self._destinos = {}       # topic -> [(Sesion, qos)] (caché, se limpia al cambiar suscripciones)
+        self.inicio_reporte = time.monotonic()
+        self.servidor = None
+        self._conexiones = {}     # Tarea atender() -> Sesion, de cada conexión abierta
+        self._loop = None
+        self._hilo = None
+
+    # --- Ciclo de vida ---
+
+    async def iniciar(self):
+        self.servidor = await asyncio.start_server(self.atender, self.host, self.puerto)
+        self.puerto = self.servidor.sockets[0].getsockname()[1]  # Si se pidió el puerto 0
+        if self.intervalo_reporte:
+            asyncio.ensure_future(self._reportar_periodicamente())
+
+    async def cerrar(self):
+        self.servidor.close()
+        for sesion in list(self._conexiones.values()):
+            sesion.cerrar()  # La lectura pendiente termina con IncompleteReadError
+        await asyncio.gather(*self._conexiones, return_exceptions=True)
+        await self.servidor.wait_closed()
+
+    async def servir(self):
+        await self.iniciar()
+        print(f"🛰️ Broker MQTT local escuchando en {self.host}:{self.puerto}")
+        async with self.servidor:
+            await self.servidor.serve_forever()
+
+    def iniciar_en_hilo(self):
+        """Arranca el broker en un hilo con su propio event loop; regresa cuando ya escucha"""
+        listo = threading.Event()
+
+        def hilo():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.iniciar())
+            listo.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.cerrar())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=hilo, daemon=True)
+        self._hilo.start()
+        listo.wait()
+        return self
+
+    def detener(self):
+        """Detiene el broker arrancado con iniciar_en_hilo()"""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join()
+            self._loop = None
+
+    # --- Conexiones ---
+
+    async def atender(self, lector, escritor):
+        sesion = Sesion(self, lector, escritor)
+        limpio = False
+        tarea = asyncio.current_task()
+        self._conexiones[tarea] = sesion
+        try:
+            tipo, _, cuerpo = await asyncio.wait_for(sesion.leer_paquete(), 10)
+            if tipo != CONNECT or not self.conectar(sesion, cuerpo):
+                return
+            while True:
+                espera = sesion.keepalive * 1.5 if sesion.keepalive else None
+                tipo, flags, cuerpo = await asyncio.wait_for(sesion.leer_paquete(), espera)
+                if tipo == DISCONNECT:
+                    limpio = True
+                    return
+                self.procesar(sesion, tipo, flags, cuerpo)
+                if sesion.escritor.transport.get_write_buffer_size():
+                    await sesion.escritor.drain()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ErrorProtocolo):
+            pass
+        finally:
+            self._conexiones.pop(tarea, None)
+            self.desconectar(sesion, limpio)
+
+    def conectar(self, sesion, cuerpo):
+        c = Lector(cuerpo)
+        protocolo = c.texto()
+        nivel = c.byte()
+        flags = c.byte()
+        sesion.keepalive = c.entero()
+        if (protocolo, nivel) not in (('MQTT', 4), ('MQIsdp', 3)):
+            sesion.enviar(paquete(CONNACK, 0, bytes([0, PROTOCOLO_INVALIDO])))
+            return False
+
+        sesion.client_id = c.texto() or f"anonimo-{id(sesion):x}"
+        if flags & 0x04:
+            topic, payload = c.texto(), c.binario()
+            sesion.will = (topic, payload, min((flags >> 3) & 0x03, 1), bool(flags & 0x20))
+        usuario = c.texto() if flags & 0x80 else None
+        password = c.binario().decode(errors='replace') if flags & 0x40 else None
+
+        if self.usuarios is not None:
+            if usuario is None:
+                sesion.enviar(paquete(CONNACK, 0, bytes([0, NO_AUTORIZADO])))
+                return False
+            if self.usuarios.get(usuario) != password:
+                sesion.enviar(paquete(CONNACK, 0, bytes([0, USUARIO_INVALIDO])))
+                return False
+
+        anterior = self.sesiones.get(sesion.client_id)
+        if anterior is not None:
+            anterior.will = None  # Toma de sesión: el cliente anterior se desconecta sin will
+            self.quitar_suscripciones(anterior)
+            anterior.cerrar()
+        self.sesiones[sesion.client_id] = sesion
+        sesion.enviar(paquete(CONNACK, 0, bytes([0, ACEPTADA])))
+        return True
+
+    def desconectar(self, sesion, limpio):
+        if sesion.client_id is not None and self.sesiones.get(sesion.client_id) is sesion:
+            del self.sesiones[sesion.client_id]
+            self.quitar_suscripciones(sesion)
+            if not limpio and sesion.will:
+                self.publicar(*sesion.will)
+        sesion.cerrar()
+
+    # --- Paquetes ---
+
+    def procesar(self, sesion, tipo, flags, cuerpo):
+        if tipo == PUBLISH:
+            qos = (flags >> 1) & 0x03
+            if qos == 3:
+                raise ErrorProtocolo("QoS inválido")
+            c = Lector(cuerpo)
+            topic = c.texto()
+            if not topic or '+' in topic or '#' in topic:
+                raise ErrorProtocolo("topic de publicación inválido")
+            if qos:
+                mid = c.entero()
+                sesion.enviar(paquete(PUBACK, 0, struct.pack('!H', mid)))
+            self.publicar(topic, c.resto(), min(qos, 1), bool(flags & 0x01))
+        elif tipo == PUBACK:
+            pass  # Sin reenvíos: la confirmación del subscriber solo se acepta
+        elif tipo == SUBSCRIBE:
+            self.suscribir(sesion, Lector(cuerpo))
+        elif tipo == UNSUBSCRIBE:
+            c = Lector(cuerpo)
+            mid = c.entero()
+            while c.pos < len(cuerpo):
+                filtro = c.texto()
+                if sesion.suscripciones.pop(filtro, None) is not None:
+                    self._quitar_suscripcion(sesion, filtro)
+            sesion.enviar(paquete(UNSUBACK, 0, struct.pack('!H', mid)))
+        elif tipo == PINGREQ:
+            sesion.enviar(paquete(PINGRESP, 0, b''))
+        else:
+            raise ErrorProtocolo(f"paquete inesperado {tipo}")
+
+    def suscribir(self, sesion, c):
+        mid = c.entero()
+        otorgados = bytearray()
+        nuevos = []
+        while c.pos < len(c.datos):
+            filtro = c.texto()
+            qos = c.byte() & 0x03
+            if not filtro_valido(filtro) or qos == 3:
+                otorgados.append(0x80)
+                continue
+            qos = min(qos, 1)
+            sesion.suscripciones[filtro] = qos
+            self.suscripciones.setdefault(filtro, {})[sesion] = qos
+            otorgados.append(qos)
+            nuevos.append((filtro, qos))
+        self._destinos.clear()
+        sesion.enviar(paquete(SUBACK, 0, struct.pack('!H', mid) + bytes(otorgados)))
+
+        # Los retenidos se envían después del SUBACK
+        for filtro, qos in nuevos:
+            for topic, (payload, qos_retenido) in self.retenidos.items():
+                if coincide(filtro, topic):
+                    self.entregar(sesion, topic, payload, min(qos, qos_retenido), True)
+
+    def _quitar_suscripcion(self, sesion, filtro):
+        suscriptores = self.suscripciones.get(filtro)
+        if suscriptores is not None:
+            suscriptores.pop(sesion, None)
+            if not suscriptores:
+                del self.suscripciones[filtro]
+        self._destinos.clear()
+
+    def quitar_suscripciones(self, sesion):
+        for filtro in list(sesion.suscripciones):
+            self._quitar_suscripcion(sesion, filtro)
+        sesion.suscripciones.clear()
+
+    def destinos(self, topic):
+        """[(Sesion, qos)] suscritas al topic; una entrega por sesión con el mayor QoS"""
+        destinos = self._destinos.get(topic)
+        if destinos is None:
+            por_sesion = {}
+            for filtro, suscriptores in self.suscripciones.items():
+                if coincide(filtro, topic):
+                    for sesion, qos in suscriptores.items():
+                        por_sesion[sesion] = max(qos, por_sesion.get(sesion, 0))
+            destinos = self._destinos[topic] = list(por_sesion.items())
+        return destinos
+
+    def publicar(self, topic, payload, qos, retain):
+        estadisticas = self.estadisticas.get(topic)
+        if estadisticas is None:
+            estadisticas = self.estadisticas[topic] = EstadisticasTopic()
+        estadisticas.recibidos += 1
+        estadisticas.bytes += len(payload)
+
+        if retain:
+            if payload:
+                self.retenidos[topic] = (payload, qos)
+            else:
+                self.retenidos.pop(topic, None)  # Payload vacío borra el retenido
+
+        for sesion, qos_suscripcion in self.destinos(topic):
+            if self.entregar(sesion, topic, payload, min(qos, qos_suscripcion), False):
+                estadisticas.entregados += 1
+
+    def entregar(self, sesion, topic, payload, qos, retain):
+        if qos == 0 and sesion.saturada():
+            sesion.descartados += 1  # Subscriber lento: QoS 0 se puede perder
+            return False
+        mid = sesion.nuevo_mid() if qos else None
+        sesion.enviar(paquete_publish(topic, payload, qos, retain, mid))
+        return True
+
+    # --- Métricas ---
+
+    def metricas(self):
+        """{topic: {recibidos, entregados, bytes, tasa}} con la tasa desde el último reporte"""
+        transcurrido = time.monotonic() - self.inicio_reporte
+        resultado = {}
+        for topic, e in self.estadisticas.items():
+            tasa = (e.recibidos - e.recibidos_reporte) / transcurrido if transcurrido > 0 else 0.0
+            resultado[topic] = {'recibidos': e.recibidos, 'entregados': e.entregados,
+                                'bytes': e.bytes, 'tasa': tasa}
+        return resultado
+
+    def reportar(self):
+        metricas = self.metricas()
+        total = sum(m['tasa'] for m in metricas.values())
+        print(f"📊 {len(self.sesiones)} clientes, {total:.1f} msg/s en {len(metricas)} topics")
+        for topic, m in sorted(metricas.items(), key=lambda par: -par[1]['tasa']):
+            print(f"   {topic}: {m['tasa']:.1f} msg/s, recibidos={m['recibidos']}, "
+                  f"entregados={m['entregados']}, bytes={m['bytes']}")
+        for e in self.estadisticas.values():
+            e.recibidos_reporte = e.recibidos
+        self.inicio_reporte = time.monotonic()
+
+    async def _reportar_periodicamente(self):
+        while True:
+            await asyncio.sleep(self.intervalo_reporte)
+            self.reportar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broker MQTT 3.1.1 local para pruebas y benchmarks")
+    parser.add_argument("--host", default=HOST, help="Dirección donde escuchar (0.0.0.0 para la red)")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto TCP")
+    parser.add_argument("--anonimo", action="store_true", help="Acepta clientes sin usuario/contraseña")
+    parser.add_argument("--reporte", type=float, default=INTERVALO_REPORTE,
+                        help="Segundos entre reportes de msg/s por topic (0 = sin reportes)")
+    args = parser.parse_args()
+
+    broker = BrokerLocal(args.host, args.puerto, None if args.anonimo else USUARIOS, args.reporte or None)
+    try:
+        asyncio.run(broker.servir())
+    except KeyboardInterrupt:
+        print("\nBroker detenido.")
+        broker.reportar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+
+from paho.mqtt import client as mqtt_client
+
+from poolConexiones import identidad_cliente
+from ventanaPublicacion import percentil
+
+# Cliente MQTT sobre asyncio para cargas con muchos publishers/subscribers concurrentes.
+# paho no crea hilo de red: su socket se registra en el event loop (add_reader/add_writer)
+# y todo corre en un solo hilo. Miles de tareas pueden publicar con el mismo cliente:
+# - publicar() espera (await) cuando hay en_vuelo mensajes sin confirmar, en vez de bloquear
+#   un hilo; publicar_confirmado() además espera el PUBACK y devuelve la latencia.
+# - Cada suscripción tiene un buffer; si el consumidor se atrasa, se deja de leer el socket
+#   hasta que se vacíe a la mitad (el broker y TCP frenan al emisor), sin perder mensajes.
+#   Mientras tanto tampoco llegan los PUBACK: consumir y publicar en tareas distintas.
+# - Al desconectarse paho descarta los QoS 0 que no escribió sin llamar on_publish: se
+#   liberan en on_disconnect (como en VentanaPublicacion) y se cuentan como perdidos.
+
+EN_VUELO = 100
+BUFFER_SUSCRIPCION = 10000  # Mensajes sin consumir antes de pausar la lectura del socket
+INTERVALO_MISC = 1.0        # Keepalive/reintentos de paho (loop_misc)
+ESPERA_RECONEXION = 1.0
+
+
+class Suscripcion:
+    """Mensajes de un filtro; se consumen con 'async for msg in suscripcion'"""
+
+    def __init__(self, cliente, filtro, limite):
+        self.cliente = cliente
+        self.filtro = filtro
+        self.limite = limite
+        self.mensajes = deque()
+        self._hay_mensajes = asyncio.Event()
+
+    def _agregar(self, msg):
+        self.mensajes.append(msg)
+        self._hay_mensajes.set()
+        if len(self.mensajes) >= self.limite:
+            self.cliente._pausar_lectura()
+
+    async def recibir(self):
+        while not self.mensajes:
+            self._hay_mensajes.clear()
+            await self._hay_mensajes.wait()
+        msg = self.mensajes.popleft()
+        if len(self.mensajes) <= self.limite // 2:
+            self.cliente._reanudar_lectura()
+        return msg
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.recibir()
+
+
+class ClienteAsync:
+    """Cliente paho integrado al event loop de asyncio"""
+
+    def __init__(self, broker, port=1883, username=None, password=None, client_id=None,
+                 en_vuelo=EN_VUELO, qos=0):
+        self.broker = broker
+        self.port = port
+        self.qos = qos
+        self.client = mqtt_client.Client(client_id or identidad_cliente('async'))
+        if username:
+            self.client.username_pw_set(username, password)
+        self.client.max_inflight_messages_set(en_vuelo)
+
+        self.client.on_socket_open = self._on_socket_open
+        self.client.on_socket_close = self._on_socket_close
+        self.client.on_socket_register_write = self._on_socket_register_write
+        self.client.on_socket_unregister_write = self._on_socket_unregister_write
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_publish = self._on_publish
+        self.client.on_message = self._on_message
+
+        self.loop = None
+        self._socket = None
+        self._leyendo = False
+        self._pausas = 0
+        self._conectado = None
+        self._cerrando = False
+        self._tarea_misc = None
+        self._ventana = None
+        self._en_vuelo = en_vuelo
+        self._pendientes = {}    # mid -> (instante, futuro o None, qos)
+        self.suscripciones = {}  # filtro -> [Suscripcion]
+
+        self.publicados = 0
+        self.confirmados = 0
+        self.perdidos = 0  # QoS 0 descartados por paho al desconectarse
+        self.latencias = deque(maxlen=10000)
+
+    # --- Integración del socket de paho con el event loop ---
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._socket = sock
+        self._reanudar_lectura()
+
+    def _on_socket_close(self, client, userdata, sock):
+        if self._leyendo:
+            self.loop.remove_reader(sock)
+            self._leyendo = False
+        self._socket = None
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self.loop.add_writer(sock, self._escribir)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self.loop.remove_writer(sock)
+
+    def _escribir(self):
+        self.client.loop_write()
+
+    def _leer(self):
+        self.client.loop_read()
+
+    def _pausar_lectura(self):
+        if self._leyendo and self._socket is not None:
+            self.loop.remove_reader(self._socket)
+            self._leyendo = False
+            self._pausas += 1
+
+    def _reanudar_lectura(self):
+        if not self._leyendo and self._socket is not None:
+            if any(len(s.mensajes) >= s.limite for lista in self.suscripciones.values() for s in lista):
+                return  # Otro consumidor sigue atrasado
+            self.loop.add_reader(self._socket, self._leer)
+            self._leyendo = True
+
+    async def _misc(self):
+        # loop_misc envía los PINGREQ; si la conexión se cayó, se reintenta desde aquí
+        while not self._cerrando:
+            await asyncio.sleep(INTERVALO_MISC)
+            if self.client.loop_misc() != mqtt_client.MQTT_ERR_SUCCESS and not self._cerrando:
+                await self._reconectar()
+
+    async def _reconectar(self):
+        while not self._cerrando:
+            try:
+                self.client.reconnect()
+                return
+            except OSError:
+                await asyncio.sleep(ESPERA_RECONEXION)
+
+    # --- Callbacks de paho (se ejecutan dentro del event loop) ---
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            for filtro in self.suscripciones:
+                client.subscribe(filtro, self.qos)
+        if self._conectado is not None and not self._conectado.done():
+            if rc == 0:
+                self._conectado.set_result(True)
+            else:
+                self._conectado.set_exception(ConnectionError(f"CONNACK {rc}"))
+
+    def _on_disconnect(self, client, userdata, rc):
+        # Los QoS > 0 siguen en vuelo: paho los reenvía al reconectar
+        perdidos = [mid for mid, (_, _, qos) in self._pendientes.items() if qos == 0]
+        for mid in perdidos:
+            _, futuro, _ = self._pendientes.pop(mid)
+            self.perdidos += 1
+            self._ventana.release()
+            if futuro is not None and not futuro.done():
+                futuro.set_exception(ConnectionError(f"Mensaje {mid} perdido al desconectarse"))
+
+    def _on_publish(self, client, userdata, mid):
+        pendiente = self._pendientes.pop(mid, None)
+        if pendiente is None:
+            return
+        inicio, futuro, _ = pendiente
+        latencia = time.perf_counter() - inicio
+        self.confirmados += 1
+        self.latencias.append(latencia)
+        self._ventana.release()
+        if futuro is not None and not futuro.done():
+            futuro.set_result(latencia)
+
+    def _on_message(self, client, userdata, msg):
+        for filtro, suscripciones in self.suscripciones.items():
+            if mqtt_client.topic_matches_sub(filtro, msg.topic):
+                for suscripcion in suscripciones:
+                    suscripcion._agregar(msg)
+
+    # --- API ---
+
+    async def conectar(self, timeout=10):
+        self.loop = asyncio.get_running_loop()
+        self._ventana = asyncio.Semaphore(self._en_vuelo)
+        self._conectado = self.loop.create_future()
+        self.client.connect(self.broker, self.port)  # Solo el handshake TCP bloquea; lo demás va por el loop
+        self._tarea_misc = self.loop.create_task(self._misc())
+        await asyncio.wait_for(self._conectado, timeout)
+        return self
+
+    async def publicar(self, topic, payload, qos=None, confirmar=False):
+        """Publica cuando hay lugar en la ventana; con confirmar=True espera el PUBACK"""
+        await self._ventana.acquire()
+        inicio = time.perf_counter()
+        qos = self.qos if qos is None else qos
+        try:
+            info = self.client.publish(topic, payload, qos)
+        except ValueError:  # Topic o QoS inválidos
+            self._ventana.release()
+            raise
+        # Desconectado con QoS > 0 paho guarda el mensaje y lo reenvía al reconectar
+        if info.rc != mqtt_client.MQTT_ERR_SUCCESS and not (info.rc == mqtt_client.MQTT_ERR_NO_CONN and qos > 0):
+            self._ventana.release()
+            raise ConnectionError(f"publish falló con código {info.rc}")
+        self.publicados += 1
+        futuro = self.loop.create_future() if confirmar else None
+        self._pendientes[info.mid] = (inicio, futuro, qos)
+        return await futuro if confirmar else info.mid
+
+    async def publicar_confirmado(self, topic, payload, qos=None):
+        """Publica y devuelve la latencia hasta la confirmación (PUBACK con QoS 1)"""
+        return await self.publicar(topic, payload, qos, confirmar=True)
+
+    def suscribir(self, filtro, limite=BUFFER_SUSCRIPCION):
+        """Devuelve una Suscripcion iterable con async for"""
+        suscripcion = Suscripcion(self, filtro, limite)
+        lista = self.suscripciones.setdefault(filtro, [])
+        if not lista and self.client.is_connected():
+            self.client.subscribe(filtro, self.qos)
+        lista.append(suscripcion)
+        return suscripcion
+
+    async def esperar_confirmaciones(self, timeout=10):
+        limite = time.monotonic() + timeout
+        while self._pendientes and time.monotonic() < limite:
+            await asyncio.sleep(0.01)
+        return not self._pendientes
+
+    def metricas(self):
+        ordenadas = sorted(self.latencias)
+        return {
+            'publicados': self.publicados,
+            'confirmados': self.confirmados,
+            'perdidos': self.perdidos,
+            'en_vuelo': len(self._pendientes),
+            'pausas_lectura': self._pausas,
+            'latencia_p50_ms': (percentil(ordenadas, 50) or 0) * 1000,
+            'latencia_p99_ms': (percentil(ordenadas, 99) or 0) * 1000,
+        }
+
+    async def desconectar(self):
+        self._cerrando = True
+        await self.esperar_confirmaciones()
+        self.client.disconnect()
+        if self._tarea_misc:
+            self._tarea_misc.cancel()
+
+
+async def dispositivo_simulado(cliente, indice, hz, duracion, atrasos, descartados):
+    """Publica lecturas TEMP de un dispositivo a hz con plazos absolutos (sin acumular deriva)
+
+    Sin conexión una lectura QoS 0 se pierde: se cuenta en descartados[0] y se sigue el plan.
+    """
+    topic = f"amerike/sensor/temp/{indice}"
+    periodo = 1 / hz
+    inicio = cliente.loop.time()
+    n = 0
+    while True:
+        n += 1
+        plazo = inicio + n * periodo
+        if plazo - inicio > duracion:
+            return
+        await asyncio.sleep(max(0.0, plazo - cliente.loop.time()))
+        atrasos.append(cliente.loop.time() - plazo)
+        try:
+            await cliente.publicar(topic, f"TEMP:{20 + indice % 10}.{n % 100:02d}")
+        except ConnectionError:
+            descartados[0] += 1
+
+
+async def prueba_carga(args):
+    cliente = await ClienteAsync(args.broker, args.port, 'mtuuser', 'amerike', qos=args.qos).conectar()
+    recibidos = 0
+
+    async def consumir():
+        nonlocal recibidos
+        async for _ in cliente.suscribir("amerike/sensor/#"):
+            recibidos += 1
+
+    consumidor = asyncio.ensure_future(consumir())
+    await asyncio.sleep(0.2)
+
+    atrasos = []
+    descartados = [0]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(dispositivo_simulado(cliente, i, args.hz, args.duracion, atrasos, descartados)
+                           for i in range(args.dispositivos)))
+    await cliente.esperar_confirmaciones()
+    transcurrido = time.perf_counter() - inicio
+    await asyncio.sleep(0.5)
+    consumidor.cancel()
+
+    m = cliente.metricas()
+    atrasos.sort()
+    print(f"📊 {args.dispositivos} dispositivos en un event loop: {m['publicados'] / transcurrido:.0f} msg/s publicados, "
+          f"{recibidos} recibidos, {descartados[0]} descartados sin conexión, {m['perdidos']} perdidos al desconectarse, "
+          f"atraso p99 del plan={percentil(atrasos, 99) * 1000:.1f} ms, "
+          f"latencia p50={m['latencia_p50_ms']:.2f} ms p99={m['latencia_p99_ms']:.2f} ms, "
+          f"pausas de lectura={m['pausas_lectura']}")
+    await cliente.desconectar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con el cliente MQTT asyncio")
+    parser.add_argument("--broker", default=os.environ.get('MQTT_BROKER', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=int(os.environ.get('MQTT_PORT', 1883)))
+    parser.add_argument("--dispositivos", type=int, default=1000, help="Tareas publicando en paralelo")
+    parser.add_argument("--hz", type=float, default=1.0, help="Publicaciones por segundo de cada tarea")
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos de prueba")
+    parser.add_argument("--qos", type=int, default=0)
+    asyncio.run(prueba_carga(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
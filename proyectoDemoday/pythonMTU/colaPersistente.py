@@ -0,0 +1,302 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_SUCCESS
+
+# Cola persistente "store-and-forward" para cuando el broker no está disponible.
+# Los mensajes se agregan al final de segmentos seg_XXXXXXXXXX.log (solo escritura al final)
+# y se sincronizan a disco por lotes (un fsync cada LOTE_FSYNC mensajes o INTERVALO_FSYNC s).
+# Un archivo "cursor" guarda hasta dónde confirmó el broker; los segmentos completamente
+# confirmados se borran. Al reiniciar, lo no confirmado se vuelve a enviar (al menos una vez).
+#
+# Formato de cada registro: crc32 (4 bytes) | largo topic (2) | largo mensaje (4) | topic | mensaje
+# El crc cubre largos y contenido; un registro cortado por un apagón se descarta al abrir.
+
+TAMANO_SEGMENTO = 1024 * 1024  # Bytes por segmento antes de abrir uno nuevo
+LOTE_FSYNC = 64
+INTERVALO_FSYNC = 1.0
+TASA_DRENADO = 50.0            # Mensajes/s al vaciar la cola tras reconectar
+
+ENCABEZADO = struct.Struct('<IHI')
+PREFIJO_SEGMENTO = 'seg_'
+EXTENSION_SEGMENTO = '.log'
+
+
+def nombre_segmento(numero):
+    return f"{PREFIJO_SEGMENTO}{numero:010d}{EXTENSION_SEGMENTO}"
+
+
+def leer_registros(ruta, desde=0):
+    """Genera (fin, topic, mensaje) de un segmento; se detiene en el primer registro inválido"""
+    with open(ruta, 'rb') as f:
+        f.seek(desde)
+        posicion = desde
+        while True:
+            encabezado = f.read(ENCABEZADO.size)
+            if len(encabezado) < ENCABEZADO.size:
+                return
+            crc, largo_topic, largo_mensaje = ENCABEZADO.unpack(encabezado)
+            cuerpo = f.read(largo_topic + largo_mensaje)
+            if len(cuerpo) < largo_topic + largo_mensaje or zlib.crc32(encabezado[4:] + cuerpo) != crc:
+                return
+            posicion += ENCABEZADO.size + len(cuerpo)
+            yield posicion, cuerpo[:largo_topic].decode(), cuerpo[largo_topic:].decode()
+
+
+class ColaPersistente:
+    """Cola FIFO en disco por segmentos, con confirmación explícita de lo entregado"""
+
+    def __init__(self, directorio, tamano_segmento=TAMANO_SEGMENTO,
+                 lote_fsync=LOTE_FSYNC, intervalo_fsync=INTERVALO_FSYNC):
+        self.directorio = directorio
+        self.tamano_segmento = tamano_segmento
+        self.lote_fsync = lote_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self._candado = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+        self.confirmado = self._leer_cursor()   # (segmento, offset) ya entregado al broker
+        self.lectura = self.confirmado          # Siguiente registro a entregar
+        self.pendientes = 0
+        self.agregados = 0
+        self.confirmados = 0
+        self.sincronizaciones = 0
+
+        segmentos = self.segmentos()
+        for numero in segmentos:
+            ruta = os.path.join(directorio, nombre_segmento(numero))
+            if numero < self.confirmado[0]:
+                os.remove(ruta)  # Quedó de una ejecución que se detuvo antes de recortar
+                continue
+            desde = self.confirmado[1] if numero == self.confirmado[0] else 0
+            fin = desde
+            for fin, _, _ in leer_registros(ruta, desde):
+                self.pendientes += 1
+            if numero == segmentos[-1] and os.path.getsize(ruta) > fin:
+                with open(ruta, 'r+b') as f:
+                    f.truncate(fin)  # Registro incompleto al final (apagón a mitad de escritura)
+
+        self.activo = max(segmentos[-1] if segmentos else 0, self.confirmado[0])
+        self._archivo = open(os.path.join(directorio, nombre_segmento(self.activo)), 'ab')
+        self._sin_sincronizar = 0
+        self._ultima_sincronizacion = time.monotonic()
+
+    def segmentos(self):
+        """Números de segmento existentes, en orden"""
+        numeros = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith(PREFIJO_SEGMENTO) and nombre.endswith(EXTENSION_SEGMENTO):
+                numeros.append(int(nombre[len(PREFIJO_SEGMENTO):-len(EXTENSION_SEGMENTO)]))
+        return sorted(numeros)
+
+    def _leer_cursor(self):
+        try:
+            with open(os.path.join(self.directorio, 'cursor')) as f:
+                segmento, offset = f.read().split()
+                return int(segmento), int(offset)
+        except (OSError, ValueError):
+            return 0, 0
+
+    def _guardar_cursor(self):
+        # Reemplazo atómico: el cursor nunca queda a medio escribir
+        ruta = os.path.join(self.directorio, 'cursor')
+        with open(ruta + '.tmp', 'w') as f:
+            f.write(f"{self.confirmado[0]} {self.confirmado[1]}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta + '.tmp', ruta)
+
+    def agregar(self, topic, mensaje):
+        """Agrega un mensaje al final de la cola"""
+        topic_b = topic.encode()
+        mensaje_b = mensaje.encode()
+        encabezado = ENCABEZADO.pack(0, len(topic_b), len(mensaje_b))[4:]
+        crc = zlib.crc32(encabezado + topic_b + mensaje_b)
+        with self._candado:
+            self._archivo.write(struct.pack('<I', crc) + encabezado + topic_b + mensaje_b)
+            self.pendientes += 1
+            self.agregados += 1
+            self._sin_sincronizar += 1
+            if self._archivo.tell() >= self.tamano_segmento:
+                self._rotar()
+            elif (self._sin_sincronizar >= self.lote_fsync or
+                  time.monotonic() - self._ultima_sincronizacion >= self.intervalo_fsync):
+                self._sincronizar()
+
+    def _sincronizar(self):
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._sin_sincronizar = 0
+        self._ultima_sincronizacion = time.monotonic()
+        self.sincronizaciones += 1
+
+    def _rotar(self):
+        self._sincronizar()
+        self._archivo.close()
+        self.activo += 1
+        self._archivo = open(os.path.join(self.directorio, nombre_segmento(self.activo)), 'ab')
+
+    def sincronizar(self):
+        """Fuerza el fsync de lo agregado (por ejemplo, antes de salir)"""
+        with self._candado:
+            if self._sin_sincronizar:
+                self._sincronizar()
+
+    def leer(self, maximo):
+        """Devuelve hasta maximo [(posicion, topic, mensaje)] sin confirmarlos
+
+        Cada llamada continúa donde terminó la anterior; rebobinar() vuelve a lo no confirmado.
+        """
+        with self._candado:
+            self._archivo.flush()
+            registros = []
+            segmento, offset = self.lectura
+            while len(registros) < maximo:
+                ruta = os.path.join(self.directorio, nombre_segmento(segmento))
+                for fin, topic, mensaje in leer_registros(ruta, offset):
+                    registros.append(((segmento, fin), topic, mensaje))
+                    offset = fin
+                    if len(registros) == maximo:
+                        break
+                else:
+                    if segmento >= self.activo:
+                        break
+                    segmento, offset = segmento + 1, 0  # Segmento agotado: sigue en el próximo
+            self.lectura = (segmento, offset)
+            return registros
+
+    def rebobinar(self, posicion=None):
+        """La próxima lectura empieza en posicion (por defecto, el primer mensaje no confirmado)"""
+        with self._candado:
+            self.lectura = self.confirmado if posicion is None else max(posicion, self.confirmado)
+
+    def confirmar(self, posicion, cantidad):
+        """Marca como entregado todo hasta posicion (inclusive) y borra segmentos ya vacíos"""
+        with self._candado:
+            if posicion <= self.confirmado:
+                return
+            anterior = self.confirmado[0]
+            self.confirmado = posicion
+            self.lectura = max(self.lectura, posicion)
+            self.pendientes -= cantidad
+            self.confirmados += cantidad
+            self._guardar_cursor()
+            for numero in range(anterior, posicion[0]):
+                try:
+                    os.remove(os.path.join(self.directorio, nombre_segmento(numero)))
+                except FileNotFoundError:
+                    pass
+
+    def metricas(self):
+        return {
+            'pendientes': self.pendientes,
+            'agregados': self.agregados,
+            'confirmados': self.confirmados,
+            'segmentos': self.activo - self.confirmado[0] + 1,
+            'sincronizaciones': self.sincronizaciones,
+        }
+
+    def cerrar(self):
+        self.sincronizar()
+        with self._candado:
+            self._archivo.close()
+
+
+class DrenadorCola:
+    """Vacía la cola hacia el broker en segundo plano, a una tasa limitada
+
+    Los mensajes se publican con QoS 1 y solo se confirman en la cola cuando paho
+    recibe el PUBACK, en orden; así un corte a mitad del drenado no pierde lecturas.
+    Si publish falla, lo que paho ya aceptó sigue en vuelo (paho reenvía los QoS > 0 al
+    reconectar) y la cola solo rebobina hasta el primer mensaje que no aceptó. La entrega
+    es al menos una vez: un PUBACK perdido en el corte, o un reinicio con mensajes sin
+    confirmar, hace que el broker reciba ese mensaje de nuevo.
+    """
+
+    def __init__(self, cola, client, tasa=TASA_DRENADO, qos=1):
+        self.cola = cola
+        self.client = client
+        self.tasa = tasa
+        self.qos = qos
+        self.en_vuelo = []  # [(posicion, MQTTMessageInfo)] en el orden de la cola
+        self.drenados = 0
+        self.inicio_drenado = None
+        self._activo = False
+        self._hilo = None
+
+    def paso(self, dt):
+        """Publica lo que permite la tasa en dt segundos y confirma lo ya entregado"""
+        entregados = 0
+        while entregados < len(self.en_vuelo) and self.en_vuelo[entregados][1].is_published():
+            entregados += 1
+        if entregados:
+            self.cola.confirmar(self.en_vuelo[entregados - 1][0], entregados)  # Un cursor por lote
+            del self.en_vuelo[:entregados]
+            self.drenados += entregados
+
+        if not self.client.is_connected():
+            self.inicio_drenado = None
+            return
+        if not self.cola.pendientes or len(self.en_vuelo) >= max(1, int(self.tasa)):
+            return  # Nada que enviar, o esperando PUBACKs (como máximo un segundo de tasa)
+        if self.inicio_drenado is None:
+            self.inicio_drenado = (time.monotonic(), self.drenados)
+
+        for posicion, topic, mensaje in self.cola.leer(max(1, int(self.tasa * dt))):
+            info = self.client.publish(topic, mensaje, self.qos)
+            if info.rc == MQTT_ERR_NO_CONN and self.qos > 0:
+                # paho lo guardó y lo enviará al reconectar: queda en vuelo como los anteriores
+                self.en_vuelo.append((posicion, info))
+                self.cola.rebobinar(posicion)
+                return
+            if info.rc != MQTT_ERR_SUCCESS:
+                # Solo se reintenta desde este mensaje; los ya aceptados siguen esperando su PUBACK
+                self.cola.rebobinar(self.en_vuelo[-1][0] if self.en_vuelo else None)
+                return
+            self.en_vuelo.append((posicion, info))
+
+    def throughput(self):
+        """Mensajes/s confirmados desde que empezó el drenado actual"""
+        if self.inicio_drenado is None:
+            return 0.0
+        inicio, drenados = self.inicio_drenado
+        transcurrido = time.monotonic() - inicio
+        return (self.drenados - drenados) / transcurrido if transcurrido > 0 else 0.0
+
+    def iniciar(self, intervalo=0.1):
+        """Ejecuta paso() cada intervalo segundos en un hilo daemon"""
+        self._activo = True
+
+        def bucle():
+            while self._activo:
+                time.sleep(intervalo)
+                self.paso(intervalo)
+        self._hilo = threading.Thread(target=bucle, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._activo = False
+        if self._hilo:
+            self._hilo.join()
+
+
+def importar_offline(cola, ruta):
+    """Carga en la cola un log offline antiguo; devuelve cuántos mensajes se importaron
+
+    Acepta el formato del publisher ("msg -> topic") y el de los puentes ("ts | msg → topic").
+    """
+    cantidad = 0
+    with open(ruta, encoding='utf-8') as f:
+        for linea in f:
+            linea = linea.rstrip('\n')
+            mensaje, separador, topic = linea.rpartition(' -> ')
+            if not separador:
+                mensaje, separador, topic = linea.rpartition(' → ')
+                mensaje = mensaje.partition(' | ')[2]
+            if separador and mensaje and topic:
+                cola.agregar(topic, mensaje)
+                cantidad += 1
+    return cantidad
@@ -0,0 +1,305 @@
+import argparse
+import glob
+import os
+import re
+import struct
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+# Compresión con diccionario para lotes de lecturas y logs archivados.
+# Los payloads son pequeños y repetitivos (mismos topics, prefijos y valores); sin
+# diccionario zlib casi no gana nada en 100-200 bytes. Un diccionario entrenado con
+# tráfico grabado (received_serial_data.txt) da de antemano esos fragmentos.
+#
+# Cada diccionario tiene una versión y se guarda en diccionarios/v{version}.{algoritmo};
+# el payload comprimido lleva en su encabezado el algoritmo y la versión, así el
+# receptor sabe cuál usar aunque el emisor ya haya pasado a uno nuevo:
+#   [0xB2][algoritmo][versión u16] + datos comprimidos
+# Versión 0 = sin diccionario. zstd (paquete zstandard) es opcional; zlib siempre está.
+#
+#   python compresionDiccionario.py entrenar            # nueva versión con los datos grabados
+#   python compresionDiccionario.py medir               # razón y CPU/MB por algoritmo y diccionario
+#   python compresionDiccionario.py archivar logs/*.txt # comprime logs (.zd)
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO = os.path.join(AQUI, 'diccionarios')
+GRABACION = os.path.join(AQUI, '..', 'SERVIDORES', 'SerialToMqtt', 'received_serial_data.txt')
+
+MAGICO = 0xB2
+ENCABEZADO = struct.Struct('<BBH')  # Mágico, algoritmo, versión del diccionario
+ZLIB, ZSTD = 1, 2
+NOMBRES = {ZLIB: 'zlib', ZSTD: 'zstd'}
+TAMANO_DICCIONARIO = 16 * 1024      # zlib solo usa los últimos 32 KB de ventana
+NIVEL = 9
+MAXIMO_DESCOMPRIMIDO = 1024 * 1024  # Bytes máximos al descomprimir un payload recibido
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Errores de datos comprimidos corruptos (además de ValueError)
+ERRORES = (zlib.error, zstandard.ZstdError) if zstandard else (zlib.error,)
+
+
+def algoritmos_disponibles():
+    return [ZLIB, ZSTD] if zstandard else [ZLIB]
+
+
+def ruta_diccionario(version, algoritmo, directorio=DIRECTORIO):
+    return os.path.join(directorio, f"v{version}.{NOMBRES[algoritmo]}")
+
+
+def versiones(algoritmo, directorio=DIRECTORIO):
+    """Versiones guardadas de un algoritmo, de menor a mayor"""
+    patron = os.path.join(directorio, f"v*.{NOMBRES[algoritmo]}")
+    return sorted(int(os.path.basename(ruta)[1:].split('.')[0]) for ruta in glob.glob(patron))
+
+
+class Compresor:
+    """Comprime y descomprime con un algoritmo y una versión de diccionario"""
+
+    _cargados = {}  # (algoritmo, versión, directorio) -> Compresor
+
+    def __init__(self, algoritmo=ZLIB, version=0, diccionario=b'', nivel=NIVEL):
+        if algoritmo == ZSTD and zstandard is None:
+            raise ValueError("zstd requiere el paquete zstandard")
+        self.algoritmo = algoritmo
+        self.version = version
+        self.diccionario = diccionario
+        self.nivel = nivel
+        self.encabezado = ENCABEZADO.pack(MAGICO, algoritmo, version)
+        if algoritmo == ZSTD:
+            datos = zstandard.ZstdCompressionDict(diccionario) if diccionario else None
+            # Sin id ni checksum en la trama de zstd: el encabezado propio ya dice la versión
+            self._zc = zstandard.ZstdCompressor(level=nivel, dict_data=datos, write_checksum=False,
+                                                write_dict_id=False)
+            self._zd = zstandard.ZstdDecompressor(dict_data=datos)
+
+    @classmethod
+    def cargar(cls, algoritmo=None, version=None, directorio=DIRECTORIO):
+        """Compresor de una versión guardada (por defecto la última del mejor algoritmo disponible)"""
+        if algoritmo is None:
+            algoritmo = ZSTD if zstandard and versiones(ZSTD, directorio) else ZLIB
+        if version is None:
+            version = (versiones(algoritmo, directorio) or [0])[-1]
+        clave = (algoritmo, version, directorio)
+        compresor = cls._cargados.get(clave)
+        if compresor is None:
+            diccionario = b''
+            if version:
+                with open(ruta_diccionario(version, algoritmo, directorio), 'rb') as f:
+                    diccionario = f.read()
+            compresor = cls._cargados[clave] = cls(algoritmo, version, diccionario)
+        return compresor
+
+    @property
+    def nombre(self):
+        return f"{NOMBRES[self.algoritmo]}-v{self.version}" if self.version else NOMBRES[self.algoritmo]
+
+    def comprimir_crudo(self, datos):
+        if self.algoritmo == ZSTD:
+            return self._zc.compress(datos)
+        # Deflate crudo (wbits negativo): sin los 6 bytes de encabezado/checksum de zlib
+        if self.diccionario:
+            compresor = zlib.compressobj(self.nivel, zlib.DEFLATED, -15, zdict=self.diccionario)
+        else:
+            compresor = zlib.compressobj(self.nivel, zlib.DEFLATED, -15)
+        return compresor.compress(datos) + compresor.flush()
+
+    def descomprimir_crudo(self, datos, maximo=None):
+        """Datos originales; con maximo, ValueError si pasarían de maximo bytes"""
+        if self.algoritmo == ZSTD:
+            if maximo is None:
+                return self._zd.decompress(datos)
+            # La trama dice su tamaño: se rechaza antes de reservar la memoria
+            tamano = zstandard.frame_content_size(datos)
+            if tamano > maximo:
+                raise ValueError(f"Payload comprimido de {tamano} bytes (máximo {maximo})")
+            return self._zd.decompress(datos, max_output_size=maximo)
+        if self.diccionario:
+            descompresor = zlib.decompressobj(-15, zdict=self.diccionario)
+        else:
+            descompresor = zlib.decompressobj(-15)
+        if maximo is None:
+            return descompresor.decompress(datos) + descompresor.flush()
+        # Un byte de más basta para saber que no cabe, sin inflar el resto
+        salida = descompresor.decompress(datos, maximo + 1)
+        if len(salida) > maximo or descompresor.unconsumed_tail:
+            raise ValueError(f"Payload comprimido de más de {maximo} bytes")
+        return salida + descompresor.flush()
+
+    def comprimir(self, datos):
+        """Payload con encabezado [0xB2][algoritmo][versión] + datos comprimidos"""
+        return self.encabezado + self.comprimir_crudo(datos)
+
+
+def es_comprimido(payload):
+    return len(payload) >= ENCABEZADO.size and payload[0] == MAGICO
+
+
+def descomprimir(payload, directorio=DIRECTORIO, maximo=MAXIMO_DESCOMPRIMIDO):
+    """Datos originales de un payload de Compresor.comprimir (carga el diccionario que indica)
+
+    ValueError si el algoritmo o la versión del diccionario no existen aquí, o si el resultado
+    pasaría de maximo bytes (None = sin límite, para archivos locales).
+    """
+    _, algoritmo, version = ENCABEZADO.unpack_from(payload)
+    if algoritmo not in NOMBRES:
+        raise ValueError(f"Algoritmo de compresión {algoritmo} desconocido")
+    if algoritmo == ZSTD and zstandard is None:
+        raise ValueError("zstd requiere el paquete zstandard")
+    if version and not os.path.exists(ruta_diccionario(version, algoritmo, directorio)):
+        raise ValueError(f"Diccionario {NOMBRES[algoritmo]} v{version} no disponible")
+    compresor = Compresor.cargar(algoritmo, version, directorio)
+    return compresor.descomprimir_crudo(bytes(payload[ENCABEZADO.size:]), maximo)
+
+
+# ===================== ENTRENAMIENTO =====================
+
+def muestras_grabadas(ruta=GRABACION, por_lote=20):
+    """{'lotes': [...], 'logs': [...]}: muestras con la forma del tráfico real"""
+    from enrutadorTopics import EnrutadorTopics
+    from loteLecturas import ENCABEZADO as ENCABEZADO_LOTE, codecs_disponibles, codificar_lote
+
+    enrutador = EnrutadorTopics()
+    lineas, lecturas = [], []
+    with open(ruta, 'rb') as f:
+        for linea in f:
+            lineas.append(linea)
+            ts, _, trama = linea.decode('ascii', errors='replace').partition(' - RX_SERIAL: ')
+            partes = trama.strip().split(',')
+            if len(partes) == 8:
+                for mensaje in (f"TEMP:{partes[2]}", f"HUM:{partes[3]}", f"RFID:{partes[7]}"):
+                    instante = datetime.fromisoformat(ts.replace('Z', '+00:00')).timestamp()
+                    lecturas.append((enrutador.topic(mensaje), mensaje, instante))
+
+    return {
+        'lotes': [codificar_lote(lecturas[i:i + por_lote], codec)[ENCABEZADO_LOTE.size:]
+                  for codec in codecs_disponibles() for i in range(0, len(lecturas), por_lote)],
+        'logs': [b''.join(lineas[i:i + 8]) for i in range(0, len(lineas), 8)],
+    }
+
+
+def _entrenar_zlib(muestras, tamano):
+    """Fragmentos repetidos ordenados por ahorro; los más valiosos al final (distancias cortas)"""
+    conteo = Counter()
+    for muestra in muestras:
+        conteo.update(set(re.findall(rb'[^,\n]+[,\n]?', muestra)))
+    fragmentos = sorted((f for f, n in conteo.items() if n > 1 and len(f) > 3),
+                        key=lambda f: conteo[f] * len(f))
+    diccionario = b''
+    for fragmento in reversed(fragmentos):
+        if len(diccionario) + len(fragmento) > tamano:
+            break
+        diccionario = fragmento + diccionario
+    # El espacio que sobra se llena con muestras completas (coincidencias largas), al principio
+    repetidas = Counter(muestras)
+    for muestra in sorted(repetidas, key=repetidas.get, reverse=True):
+        if len(diccionario) + len(muestra) > tamano:
+            break
+        diccionario = muestra + diccionario
+    return diccionario
+
+
+def entrenar(muestras, algoritmo=ZLIB, tamano=TAMANO_DICCIONARIO, directorio=DIRECTORIO):
+    """Entrena y guarda la siguiente versión del diccionario; devuelve su Compresor"""
+    if algoritmo == ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd requiere el paquete zstandard")
+        diccionario = zstandard.train_dictionary(tamano, muestras).as_bytes()
+    else:
+        diccionario = _entrenar_zlib(muestras, tamano)
+    os.makedirs(directorio, exist_ok=True)
+    version = (versiones(algoritmo, directorio) or [0])[-1] + 1
+    with open(ruta_diccionario(version, algoritmo, directorio), 'wb') as f:
+        f.write(diccionario)
+    return Compresor.cargar(algoritmo, version, directorio)
+
+
+# ===================== LOGS ARCHIVADOS =====================
+
+def comprimir_archivo(ruta, compresor=None):
+    """Escribe ruta + '.zd' con el encabezado del compresor; devuelve (bytes antes, bytes después)"""
+    compresor = compresor or Compresor.cargar()
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    comprimido = compresor.comprimir(datos)
+    with open(ruta + '.zd', 'wb') as f:
+        f.write(comprimido)
+    return len(datos), len(comprimido)
+
+
+def descomprimir_archivo(ruta):
+    with open(ruta, 'rb') as f:
+        return descomprimir(f.read(), maximo=None)
+
+
+# ===================== MEDICIÓN =====================
+
+def medir(compresor, muestras, minimo_bytes=1024 * 1024):
+    """Razón de compresión y segundos de CPU por MB original (comprimir y descomprimir)"""
+    comprimidas = [compresor.comprimir_crudo(m) for m in muestras]
+    originales = sum(len(m) for m in muestras)
+    repeticiones = max(1, -(-minimo_bytes // originales))
+
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        for muestra in muestras:
+            compresor.comprimir_crudo(muestra)
+    cpu_comprimir = time.process_time() - inicio
+
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        for comprimida in comprimidas:
+            compresor.descomprimir_crudo(comprimida)
+    cpu_descomprimir = time.process_time() - inicio
+
+    mb = originales * repeticiones / (1024 * 1024)
+    return {
+        'compresor': compresor.nombre,
+        'razon': originales / (sum(len(c) for c in comprimidas) + ENCABEZADO.size * len(muestras)),
+        'cpu_s_por_mb_comprimir': cpu_comprimir / mb,
+        'cpu_s_por_mb_descomprimir': cpu_descomprimir / mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diccionarios de compresión para lotes y logs")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p = sub.add_parser('entrenar', help="Crea la siguiente versión del diccionario")
+    p.add_argument("--origen", default=GRABACION, help="Tráfico grabado (formato received_serial_data.txt)")
+    p.add_argument("--algoritmo", choices=[NOMBRES[a] for a in algoritmos_disponibles()], default='zlib')
+    p.add_argument("--tamano", type=int, default=TAMANO_DICCIONARIO)
+    p = sub.add_parser('medir', help="Razón de compresión y CPU por MB de cada opción")
+    p.add_argument("--origen", default=GRABACION)
+    p = sub.add_parser('archivar', help="Comprime logs con el último diccionario")
+    p.add_argument("rutas", nargs='+')
+    args = parser.parse_args()
+
+    if args.comando == 'entrenar':
+        algoritmo = ZLIB if args.algoritmo == 'zlib' else ZSTD
+        muestras = [m for lista in muestras_grabadas(args.origen).values() for m in lista]
+        compresor = entrenar(muestras, algoritmo, args.tamano)
+        print(f"📚 Diccionario {compresor.nombre} ({len(compresor.diccionario)} bytes) en "
+              f"{ruta_diccionario(compresor.version, algoritmo)}")
+    elif args.comando == 'medir':
+        tipos = muestras_grabadas(args.origen)
+        for algoritmo in algoritmos_disponibles():
+            for version in [0] + versiones(algoritmo)[-1:]:
+                compresor = Compresor.cargar(algoritmo, version)
+                for tipo, lista in tipos.items():
+                    r = medir(compresor, lista)
+                    print(f"🗜️ {r['compresor']:10} {tipo:5}: razón {r['razon']:5.2f}x, CPU "
+                          f"{r['cpu_s_por_mb_comprimir'] * 1000:6.1f} ms/MB comprimir, "
+                          f"{r['cpu_s_por_mb_descomprimir'] * 1000:6.1f} ms/MB descomprimir")
+    else:
+        compresor = Compresor.cargar()
+        for ruta in args.rutas:
+            antes, despues = comprimir_archivo(ruta, compresor)
+            print(f"🗄️ {ruta} -> {ruta}.zd: {antes} -> {despues} bytes ({antes / max(despues, 1):.1f}x, {compresor.nombre})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+
+# Enrutador de mensajes a topics basado en una tabla precalculada.
+# Cada tipo de mensaje ("TEMP:24.5" -> TEMP) tiene un sufijo de topic y cada ubicación
+# (sede/piso) arma sus topics una sola vez, internados con sys.intern. Por mensaje solo
+# se hace una búsqueda en un diccionario, sin formatear cadenas. Los RFID se dividen en
+# autorizado/denegado según la lista de UIDs, como en nodeMQTT/index.js.
+#
+# La tabla se puede cambiar sin tocar código con un JSON (ruta en TOPICS_CONFIG):
+#   {"plantilla": "{sede}/{piso}/{sufijo}",
+#    "tipos": {"TEMP": "temp", "HUM": "hum", "RFID": "rfid", "CO2": "co2"},
+#    "otros": "otros",
+#    "lote": "lote",
+#    "autorizados": ["12345", "67890"],
+#    "denegados": {"RFID": "rfid/denegado"}}
+
+PLANTILLA = '{sede}/{piso}/{sufijo}'
+TIPOS = {'TEMP': 'temp', 'HUM': 'hum', 'RFID': 'rfid'}
+OTROS = 'otros'
+LOTE = 'lote'  # Lotes de lecturas (loteLecturas.py)
+AUTORIZADOS = ('12345', '67890')
+DENEGADOS = {'RFID': 'rfid/denegado'}  # Tipo -> sufijo cuando el valor no está autorizado
+
+
+class EnrutadorTopics:
+    """Devuelve el topic de un mensaje 'TIPO:valor' para una sede y piso"""
+
+    def __init__(self, sede='amerikeCDMX', piso='P1', plantilla=PLANTILLA, tipos=TIPOS,
+                 otros=OTROS, autorizados=AUTORIZADOS, denegados=DENEGADOS, lote=LOTE):
+        def topic(sufijo):
+            return sys.intern(plantilla.format(sede=sede, piso=piso, sufijo=sufijo))
+
+        self.sede = sede
+        self.piso = piso
+        self.tipos = {tipo: topic(sufijo) for tipo, sufijo in tipos.items()}
+        self.otros = topic(otros)
+        self.lote = topic(lote)
+        # Sin lista de autorizados no se divide (todos los RFID van a su topic normal)
+        self.autorizados = frozenset(autorizados) if autorizados is not None else None
+        self.denegados = {tipo: topic(sufijo) for tipo, sufijo in (denegados or {}).items()}
+
+    def topic(self, msg):
+        """Topic del mensaje; los tipos desconocidos van a 'otros'"""
+        tipo, separador, valor = msg.partition(':')
+        if not separador:
+            return self.otros
+        # Los valores casi nunca se repiten (TEMP:24.51, TEMP:24.53, ...): cachear el mensaje
+        # completo cuesta más que esta búsqueda. Solo los tipos que se dividen miran el valor.
+        if tipo in self.denegados and self.autorizados is not None and valor not in self.autorizados:
+            return self.denegados[tipo]
+        return self.tipos.get(tipo, self.otros)
+
+    def todos(self):
+        """Todos los topics de la ubicación (útil para menús y suscripciones)"""
+        return sorted(set(self.tipos.values()) | set(self.denegados.values()) | {self.otros, self.lote})
+
+
+class TablaTopics:
+    """Un EnrutadorTopics por (sede, piso), todos con la misma configuración"""
+
+    def __init__(self, **configuracion):
+        self.configuracion = configuracion
+        self._enrutadores = {}
+
+    def para(self, sede, piso):
+        enrutador = self._enrutadores.get((sede, piso))
+        if enrutador is None:
+            enrutador = self._enrutadores[(sede, piso)] = EnrutadorTopics(sede, piso, **self.configuracion)
+        return enrutador
+
+    def topic(self, sede, piso, msg):
+        return self.para(sede, piso).topic(msg)
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Crea la tabla con la configuración de un JSON (ver el encabezado del módulo)"""
+        with open(ruta, encoding='utf-8') as f:
+            return cls(**json.load(f))
+
+    @classmethod
+    def desde_entorno(cls, **por_defecto):
+        """Usa el JSON de TOPICS_CONFIG si está definido; si no, la configuración por defecto"""
+        ruta = os.environ.get('TOPICS_CONFIG')
+        return cls.desde_archivo(ruta) if ruta else cls(**por_defecto)
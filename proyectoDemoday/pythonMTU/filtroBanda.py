@@ -0,0 +1,108 @@
+import time
+
+# Reporte por excepción: solo se publica una lectura cuando cambió lo suficiente.
+# Cada tipo de sensor tiene una banda muerta (cambio mínimo respecto al último valor
+# publicado) y un latido (segundos máximos sin publicar aunque no cambie, para que el
+# receptor sepa que el dispositivo sigue vivo). Los tipos sin banda numérica (RFID,
+# LEDs, ...) se publican ante cualquier cambio.
+#
+# La configuración se puede escribir como texto (variable DEADBAND o --banda):
+#   "TEMP=0.2@30,HUM=1"  ->  TEMP: banda 0.2 y latido 30 s; HUM: banda 1 y latido LATIDO
+
+BANDAS = {'TEMP': 0.1, 'HUM': 0.5}  # Cambio mínimo para volver a publicar
+LATIDO = 60.0                       # Segundos máximos sin publicar un sensor
+
+
+def leer_configuracion(texto):
+    """'TIPO=banda[@latido],...' -> (bandas, latidos)"""
+    bandas, latidos = {}, {}
+    for parte in filter(None, (p.strip() for p in texto.split(','))):
+        tipo, _, valor = parte.partition('=')
+        banda, _, latido = valor.partition('@')
+        if banda:
+            bandas[tipo.strip()] = float(banda)
+        if latido:
+            latidos[tipo.strip()] = float(latido)
+    return bandas, latidos
+
+
+class FiltroBanda:
+    """Decide qué lecturas publicar (banda muerta + latido) y cuenta lo suprimido"""
+
+    def __init__(self, bandas=BANDAS, latido=LATIDO, latidos=None):
+        self.bandas = dict(bandas)
+        self.latido = latido
+        self.latidos = dict(latidos or {})
+        self._ultimos = {}  # (clave, tipo) -> (valor publicado, instante)
+        self.evaluados = 0
+        self.publicados = 0
+        self.por_latido = 0
+
+    def _cambio(self, clave, tipo, valor, ahora):
+        """'nuevo', 'banda', 'latido' o None si la lectura no amerita publicarse"""
+        ultimo = self._ultimos.get((clave, tipo))
+        if ultimo is None:
+            return 'nuevo'
+        anterior, instante = ultimo
+        banda = self.bandas.get(tipo)
+        if banda is None:
+            if valor != anterior:
+                return 'banda'
+        else:
+            try:
+                if abs(float(valor) - float(anterior)) > banda:
+                    return 'banda'
+            except (TypeError, ValueError):
+                if valor != anterior:
+                    return 'banda'
+        if ahora - instante >= self.latidos.get(tipo, self.latido):
+            return 'latido'
+        return None
+
+    def debe_publicar_lecturas(self, clave, lecturas, ahora=None, registrar=True):
+        """True si alguna lectura {tipo: valor} de la clave (dispositivo o topic) debe salir
+
+        Cuando se publica, se registran todas las lecturas como el último valor enviado.
+        Con registrar=False solo se decide; quien envía llama registrar() si el envío salió.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        self.evaluados += 1
+        motivos = [self._cambio(clave, tipo, valor, ahora) for tipo, valor in lecturas.items()]
+        if not any(motivos):
+            return False
+        if registrar:
+            self._registrar(clave, lecturas, ahora, motivos)
+        return True
+
+    def registrar(self, clave, lecturas, ahora=None):
+        """Anota como enviadas las lecturas que aprobó debe_publicar_lecturas(registrar=False)"""
+        ahora = time.monotonic() if ahora is None else ahora
+        self._registrar(clave, lecturas, ahora,
+                        [self._cambio(clave, tipo, valor, ahora) for tipo, valor in lecturas.items()])
+
+    def _registrar(self, clave, lecturas, ahora, motivos):
+        if all(motivo in (None, 'latido') for motivo in motivos):
+            self.por_latido += 1
+        for tipo, valor in lecturas.items():
+            self._ultimos[(clave, tipo)] = (valor, ahora)
+        self.publicados += 1
+
+    def debe_publicar(self, clave, mensaje, ahora=None):
+        """Igual que debe_publicar_lecturas para un solo mensaje 'TIPO:valor'"""
+        tipo, _, valor = mensaje.partition(':')
+        return self.debe_publicar_lecturas(clave, {tipo: valor}, ahora)
+
+    def metricas(self):
+        suprimidos = self.evaluados - self.publicados
+        return {
+            'evaluados': self.evaluados,
+            'publicados': self.publicados,
+            'suprimidos': suprimidos,
+            'por_latido': self.por_latido,
+            'reduccion': suprimidos / self.evaluados if self.evaluados else 0.0,
+        }
+
+
+def formatear_metricas(m):
+    return (f"suprimidos={m['suprimidos']}/{m['evaluados']} ({m['reduccion'] * 100:.1f}%), "
+            f"latidos={m['por_latido']}")
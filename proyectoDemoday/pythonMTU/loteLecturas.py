@@ -0,0 +1,161 @@
+import json
+import struct
+import time
+
+import compresionDiccionario
+
+# Lotes de lecturas: muchas lecturas 'TIPO:valor' (de uno o varios dispositivos/topics)
+# en un solo payload MQTT, para no pagar el encabezado MQTT/TCP y el trabajo del broker
+# por cada lectura. El payload es un encabezado de 2 bytes y el cuerpo codificado:
+#   [0xB1][codec] + {"t": ms_base, "d": {topic: [[dt_ms, "TEMP:24.5"], ...], ...}}
+# Un mensaje normal empieza con una letra ASCII, así que un subscriber distingue los lotes
+# por el primer byte y expandir() le entrega los mismos (topic, payload) que recibiría
+# sin lotes, junto con el instante de cada lectura. Los lotes se publican en el topic 'lote' de la ubicación (EnrutadorTopics.lote).
+#
+# Codecs: 'json' siempre; 'cbor' requiere cbor2 y 'msgpack' requiere msgpack (opcionales).
+# Opcionalmente el lote completo se comprime con diccionario (compresionDiccionario.py);
+# el payload comprimido empieza con 0xB2 y también se reconoce como lote.
+
+MAGICO = 0xB1
+ENCABEZADO = struct.Struct('<BB')  # Mágico, codec
+MAXIMO_LECTURAS = 500              # Lecturas por lote antes de enviarlo
+INTERVALO_LOTE = 1.0               # Segundos máximos que una lectura espera en el lote
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _json_codificar(cuerpo):
+    return json.dumps(cuerpo, separators=(',', ':')).encode()
+
+
+# id -> (nombre, codificar, decodificar); None si falta la biblioteca
+CODECS = {
+    1: ('json', _json_codificar, json.loads),
+    2: ('cbor', cbor2.dumps, cbor2.loads) if cbor2 else None,
+    3: ('msgpack', msgpack.packb, msgpack.unpackb) if msgpack else None,
+}
+IDS_CODEC = {'json': 1, 'cbor': 2, 'msgpack': 3}
+
+
+# Lo que puede lanzar decodificar_lote con un payload dañado o ilegible en este equipo
+ERRORES_LOTE = (ValueError, TypeError, KeyError, AttributeError, OSError, struct.error) + compresionDiccionario.ERRORES
+
+
+def codecs_disponibles():
+    return [codec[0] for codec in CODECS.values() if codec is not None]
+
+
+def _codec(nombre):
+    codec = CODECS.get(IDS_CODEC.get(nombre))
+    if codec is None:
+        raise ValueError(f"Codec '{nombre}' no disponible (disponibles: {', '.join(codecs_disponibles())})")
+    return IDS_CODEC[nombre], codec
+
+
+def codificar_lote(lecturas, codec='json'):
+    """[(topic, mensaje, ts)] -> payload del lote (ts en segundos epoch)"""
+    id_codec, (_, codificar, _) = _codec(codec)
+    base = int(min(ts for _, _, ts in lecturas) * 1000) if lecturas else 0
+    datos = {}
+    for topic, mensaje, ts in lecturas:
+        datos.setdefault(topic, []).append([int(ts * 1000) - base, mensaje])
+    return ENCABEZADO.pack(MAGICO, id_codec) + codificar({'t': base, 'd': datos})
+
+
+def es_lote(payload):
+    return len(payload) >= ENCABEZADO.size and (payload[0] == MAGICO or compresionDiccionario.es_comprimido(payload))
+
+
+def decodificar_lote(payload):
+    """Payload del lote -> [(topic, mensaje, ts)] en el orden en que se agregaron por topic"""
+    if compresionDiccionario.es_comprimido(payload):
+        payload = compresionDiccionario.descomprimir(payload)
+    _, id_codec = ENCABEZADO.unpack_from(payload)
+    codec = CODECS.get(id_codec)
+    if codec is None:
+        raise ValueError(f"Lote con codec {id_codec} desconocido o no instalado")
+    cuerpo = codec[2](bytes(payload[ENCABEZADO.size:]))
+    base = cuerpo['t']
+    return [(topic, mensaje, (base + dt) / 1000)
+            for topic, lecturas in cuerpo['d'].items() for dt, mensaje in lecturas]
+
+
+def expandir(msg):
+    """[(topic, payload, ts)] de un mensaje recibido: el mismo mensaje o las lecturas de su lote
+
+    ts es el instante epoch de la lectura en el lote; None para un mensaje suelto (es ahora).
+    Un lote dañado o que no se puede leer aquí (codec o diccionario faltante) se descarta
+    con un aviso en vez de romper el on_message.
+    """
+    if not es_lote(msg.payload):
+        return [(msg.topic, msg.payload, None)]
+    try:
+        return [(topic, mensaje.encode(), ts) for topic, mensaje, ts in decodificar_lote(msg.payload)]
+    except ERRORES_LOTE as e:
+        print(f"⚠️ Lote descartado de '{msg.topic}' ({len(msg.payload)} bytes): {e}")
+        return []
+
+
+class AcumuladorLote:
+    """Junta lecturas y entrega el payload cuando el lote se llena o vence su intervalo"""
+
+    def __init__(self, codec='json', maximo=MAXIMO_LECTURAS, intervalo=INTERVALO_LOTE, compresor=None):
+        _codec(codec)  # Falla al crear el acumulador, no al primer envío
+        self.codec = codec
+        self.compresor = compresor  # compresionDiccionario.Compresor o None
+        self.maximo = maximo
+        self.intervalo = intervalo
+        self.lecturas = []
+        self._inicio = None
+        self.lotes = 0
+        self.total_lecturas = 0
+        self.bytes = 0
+
+    def agregar(self, topic, mensaje, ts=None):
+        """Agrega una lectura; devuelve el payload si el lote quedó listo (si no, None)"""
+        if not self.lecturas:
+            self._inicio = time.monotonic()
+        self.lecturas.append((topic, mensaje, time.time() if ts is None else ts))
+        return self.vaciar() if len(self.lecturas) >= self.maximo else self.vencido()
+
+    def vence_en(self):
+        """Segundos hasta que vence el lote pendiente (None si está vacío)"""
+        if not self.lecturas:
+            return None
+        return max(0.0, self._inicio + self.intervalo - time.monotonic())
+
+    def vencido(self):
+        """Payload del lote si la lectura más antigua ya esperó el intervalo (si no, None)"""
+        if self.lecturas and time.monotonic() - self._inicio >= self.intervalo:
+            return self.vaciar()
+        return None
+
+    def vaciar(self):
+        """Payload con todas las lecturas pendientes (None si no hay)"""
+        if not self.lecturas:
+            return None
+        payload = codificar_lote(self.lecturas, self.codec)
+        if self.compresor is not None:
+            payload = self.compresor.comprimir(payload)
+        self.lotes += 1
+        self.total_lecturas += len(self.lecturas)
+        self.bytes += len(payload)
+        self.lecturas = []
+        return payload
+
+    def metricas(self):
+        return {
+            'lotes': self.lotes,
+            'lecturas': self.total_lecturas,
+            'lecturas_por_lote': self.total_lecturas / self.lotes if self.lotes else 0.0,
+            'bytes_por_lectura': self.bytes / self.total_lecturas if self.total_lecturas else 0.0,
+            'pendientes': len(self.lecturas),
+        }
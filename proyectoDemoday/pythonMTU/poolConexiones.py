@@ -0,0 +1,184 @@
+import os
+import socket
+import tempfile
+import threading
+import zlib
+
+from paho.mqtt import client as mqtt_client
+
+from ventanaPublicacion import VentanaPublicacion
+
+# Conexiones MQTT compartidas entre muchos dispositivos virtuales.
+# En lugar de un Client (un socket y un hilo de red) por dispositivo, el pool abre unas
+# pocas conexiones y asigna cada dispositivo a una de ellas por hash de su identidad:
+# el mismo dispositivo siempre usa la misma conexión, así sus mensajes salen en orden.
+# Las suscripciones se hacen una vez por conexión y se reparten en el proceso.
+#
+# identidad_cliente() reemplaza los client_id aleatorios (random.randint(0, 1000)):
+# da un id estable entre reinicios y único en la máquina aunque corran varias copias.
+
+CONEXIONES = 4
+EN_VUELO = 100
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_candados = []  # Archivos de candado abiertos mientras viva el proceso
+
+
+def identidad_cliente(rol, maximo=1000):
+    """client_id '{rol}-{equipo}-{n}' con el n libre más bajo en esta máquina
+
+    Cada instancia toma un candado de archivo; al reiniciar, el proceso recupera el mismo
+    id (el broker reemplaza la sesión anterior en vez de convivir con un id al azar).
+    """
+    equipo = socket.gethostname().split('.')[0]
+    if fcntl is None:
+        return f"{rol}-{equipo}-{os.getpid()}"
+    for n in range(maximo):
+        ruta = os.path.join(tempfile.gettempdir(), f"mqtt-{rol}-{n}.lock")
+        archivo = open(ruta, 'a')
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            archivo.close()
+            continue
+        _candados.append(archivo)
+        return f"{rol}-{equipo}-{n}"
+    raise RuntimeError(f"No hay identidades libres para {rol}")
+
+
+class ConexionPool:
+    """Un cliente paho compartido: ventana de publicación y reparto de suscripciones"""
+
+    def __init__(self, client_id, broker, port, username, password, en_vuelo, qos):
+        self.client_id = client_id
+        self.client = mqtt_client.Client(client_id)
+        if username:
+            self.client.username_pw_set(username, password)
+        self.ventana = VentanaPublicacion(self.client, en_vuelo, qos)
+        self.suscripciones = {}   # filtro -> [callback]
+        self._destinos = {}       # topic -> [callback] (caché)
+        self._candado = threading.Lock()
+        self.dispositivos = 0
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self._on_message
+        self.client.connect_async(broker, port)
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            # Al reconectar se renuevan todas las suscripciones
+            with self._candado:
+                filtros = list(self.suscripciones)
+            for filtro in filtros:
+                client.subscribe(filtro, self.ventana.qos)
+
+    def _on_message(self, client, userdata, msg):
+        destinos = self._destinos.get(msg.topic)
+        if destinos is None:
+            with self._candado:
+                destinos = self._destinos[msg.topic] = [
+                    callback for filtro, callbacks in self.suscripciones.items()
+                    if mqtt_client.topic_matches_sub(filtro, msg.topic) for callback in callbacks
+                ]
+        for callback in destinos:
+            callback(msg)
+
+    def suscribir(self, filtro, callback):
+        with self._candado:
+            callbacks = self.suscripciones.setdefault(filtro, [])
+            nuevo = not callbacks
+            callbacks.append(callback)
+            self._destinos.clear()
+        if nuevo and self.client.is_connected():
+            self.client.subscribe(filtro, self.ventana.qos)
+
+    def desuscribir(self, filtro, callback):
+        with self._candado:
+            callbacks = self.suscripciones.get(filtro, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            vacio = not callbacks
+            if vacio:
+                self.suscripciones.pop(filtro, None)
+            self._destinos.clear()
+        if vacio:
+            self.client.unsubscribe(filtro)
+
+
+class DispositivoVirtual:
+    """Un dispositivo simulado que publica por la conexión que le tocó en el pool"""
+
+    __slots__ = ('identidad', 'conexion', 'publicados', 'referencias')
+
+    def __init__(self, identidad, conexion):
+        self.identidad = identidad
+        self.conexion = conexion
+        self.publicados = 0
+        self.referencias = 0  # Usuarios de la identidad que todavía no la liberan
+
+    def publicar(self, topic, mensaje, qos=None, timeout=None):
+        """Publica sin esperar confirmación; devuelve el MQTTMessageInfo (None si venció la ventana)"""
+        self.publicados += 1
+        return self.conexion.ventana.publicar(topic, mensaje, qos, timeout)
+
+    def suscribir(self, filtro, callback):
+        """callback(msg) recibe los mensajes del filtro (una sola suscripción por conexión)"""
+        self.conexion.suscribir(filtro, callback)
+
+
+class PoolConexiones:
+    """Pocas conexiones al broker compartidas por miles de dispositivos virtuales"""
+
+    def __init__(self, broker, port=1883, username=None, password=None,
+                 conexiones=CONEXIONES, en_vuelo=EN_VUELO, qos=0, rol='pool'):
+        self.conexiones = [
+            ConexionPool(identidad_cliente(f"{rol}{i}"), broker, port, username, password, en_vuelo, qos)
+            for i in range(conexiones)
+        ]
+        self.dispositivos = {}  # identidad -> DispositivoVirtual
+        self._candado = threading.Lock()
+        for conexion in self.conexiones:
+            conexion.client.loop_start()
+
+    def dispositivo(self, identidad):
+        """Registra (o devuelve) el dispositivo con esa identidad; siempre cae en la misma conexión
+
+        Cada llamada cuenta como un usuario más de la identidad y necesita su liberar().
+        """
+        with self._candado:
+            dispositivo = self.dispositivos.get(identidad)
+            if dispositivo is None:
+                conexion = self.conexiones[zlib.crc32(identidad.encode()) % len(self.conexiones)]
+                conexion.dispositivos += 1
+                dispositivo = self.dispositivos[identidad] = DispositivoVirtual(identidad, conexion)
+            dispositivo.referencias += 1
+            return dispositivo
+
+    def liberar(self, identidad):
+        """Suelta un usuario del dispositivo (se quita con el último); devuelve cuántos quedan"""
+        with self._candado:
+            dispositivo = self.dispositivos.get(identidad)
+            if dispositivo is not None:
+                dispositivo.referencias -= 1
+                if dispositivo.referencias <= 0:
+                    del self.dispositivos[identidad]
+                    dispositivo.conexion.dispositivos -= 1
+            return len(self.dispositivos)
+
+    def conectado(self):
+        return all(conexion.client.is_connected() for conexion in self.conexiones)
+
+    def metricas(self):
+        """Métricas de la ventana de cada conexión, con su número de dispositivos"""
+        return [dict(conexion.ventana.metricas(), dispositivos=conexion.dispositivos,
+                     client_id=conexion.client_id)
+                for conexion in self.conexiones]
+
+    def cerrar(self, timeout=5):
+        for conexion in self.conexiones:
+            conexion.ventana.esperar_vacia(timeout)
+            conexion.client.disconnect()
+            conexion.client.loop_stop()
@@ -1,20 +1,53 @@
 import random
 import time
 import os
-from datetime import datetime
+import sys
+import glob
 from paho.mqtt import client as mqtt_client
+from colaPersistente import ColaPersistente, DrenadorCola, importar_offline
+from ventanaPublicacion import VentanaPublicacion, formatear_metricas
+from enrutadorTopics import TablaTopics
+from poolConexiones import identidad_cliente
 
-broker = '192.168.3.52' # ip VM
-port = 1883
-client_id = f'publish-{random.randint(0, 1000)}'
+broker = os.environ.get('MQTT_BROKER', '192.168.3.52') # ip VM
+port = int(os.environ.get('MQTT_PORT', 1883))
+client_id = identidad_cliente('publish')  # Estable y sin colisiones en esta máquina
 
 username = 'mtuuser' # config mosquitto en server
 password = 'amerike'
 
-offline_log = None
 logs_dir = 'logs'
+tasa_drenado = 50  # Mensajes/s al reenviar lo guardado cuando vuelve el broker
+qos = 1            # Entrega confirmada por el broker (PUBACK)
+en_vuelo = 20      # Mensajes QoS 1 que pueden esperar PUBACK al mismo tiempo
+intervalo = 2      # Segundos entre lecturas simuladas
 
-os.makedirs(logs_dir, exist_ok=True)
+# Topics planos amerike/sensor/* (los que escucha subscriberGrl); TOPICS_CONFIG cambia la tabla
+enrutador = TablaTopics.desde_entorno(plantilla='amerike/sensor/{sufijo}', autorizados=None).para(
+    os.environ.get('SEDE', 'amerikeCDMX'), os.environ.get('PISO', 'P1'))
+
+# Generador de señales del simulador (requiere numpy); sin él se usan mensajes fijos
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simuladorArduino'))
+try:
+    from generadorSenales import GeneradorSenales
+    generador = GeneradorSenales(1)
+except ImportError:
+    generador = None
+
+def abrir_cola():
+    """Lo que no se pudo enviar se guarda en una cola en disco y se reenvía al reconectar"""
+    os.makedirs(logs_dir, exist_ok=True)
+    cola = ColaPersistente(os.path.join(logs_dir, 'cola'))
+    # Logs offline de versiones anteriores del publisher (offline_AAAAMMDD_HHMMSS.txt): se pasan
+    # a la cola para no perderlos. Los del puente (offline_<ms>.txt) los sigue escribiendo él.
+    for ruta in sorted(glob.glob(os.path.join(logs_dir, 'offline_[0-9]*_[0-9]*.txt'))):
+        cantidad = importar_offline(cola, ruta)
+        if not cantidad:
+            print(f"⚠️ {ruta} no tiene mensajes reconocibles; se deja sin importar")
+            continue
+        print(f"📂 {cantidad} mensajes importados de {ruta}")
+        os.rename(ruta, ruta + '.importado')
+    return cola
 
 def connect_mqtt():
     def on_connect(client, userdata, flags, rc):
@@ -32,6 +65,9 @@ def connect_mqtt():
     return client
 
 def simulate_sensor_data():
+    if generador is not None:
+        generador.paso(2)  # Mismo intervalo que el bucle de publicación
+        return random.choice([msg for _, msg in generador.mensajes()])
     return random.choice([
         'TEMP:24.5',
         'HUM:60',
@@ -40,44 +76,47 @@ def simulate_sensor_data():
     ])
 
 def get_topic_from_data(msg):
-    if msg.startswith("TEMP"):
-        return "amerike/sensor/temp"
-    elif msg.startswith("HUM"):
-        return "amerike/sensor/hum"
-    elif msg.startswith("RFID"):
-        return "amerike/sensor/rfid"
-    else:
-        return "amerike/sensor/otros"
-
-def publish(client):
-    global offline_log
+    return enrutador.topic(msg)
+
+def on_confirmado(mid, topic, latencia):
+    print(f"✅ PUBACK del mensaje {mid} ('{topic}') en {latencia * 1000:.1f} ms")
+
+def publish(client, cola, drenador, ventana):
     for _ in range(10):
-        time.sleep(2)
+        time.sleep(intervalo)
         msg = simulate_sensor_data()
         topic = get_topic_from_data(msg)
 
         print(f"📦 Simulado: {msg} → {topic}")
 
-        result = client.publish(topic, msg)
-        status = result[0]
+        # Sin conexión va directo a la cola: paho también retendría el mensaje QoS 1 y se duplicaría
+        result = ventana.publicar(topic, msg) if client.is_connected() else None
+        status = result.rc if result is not None else mqtt_client.MQTT_ERR_NO_CONN
 
         if status == 0:
             print(f"📤 Enviado: '{msg}' al topic '{topic}'")
-            if offline_log:
-                offline_log.close()
-                offline_log = None
         else:
-            print("⚠️ Error al enviar, guardando localmente...")
-            if not offline_log:
-                filename = f"offline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                offline_log = open(os.path.join(logs_dir, filename), 'a')
-            offline_log.write(f"{msg} -> {topic}\n")
+            cola.agregar(topic, msg)
+            print(f"⚠️ Error al enviar, guardado en la cola local ({cola.pendientes} pendientes)")
+
+        if cola.pendientes or drenador.en_vuelo:
+            print(f"📼 Cola: {cola.pendientes} pendientes, reenviando a {drenador.throughput():.1f} msg/s")
 
 def run():
     client = connect_mqtt()
     client.loop_start()
-    publish(client)
-    client.loop_stop()
+    cola = abrir_cola()
+    drenador = DrenadorCola(cola, client, tasa_drenado)
+    drenador.iniciar()
+    ventana = VentanaPublicacion(client, en_vuelo, qos, on_confirmado)
+    try:
+        publish(client, cola, drenador, ventana)
+        ventana.esperar_vacia(timeout=10)
+        print(f"📊 {formatear_metricas(ventana.metricas())}")
+    finally:
+        drenador.detener()
+        cola.cerrar()
+        client.loop_stop()
 
 if __name__ == '__main__':
     run()
@@ -0,0 +1,258 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import serial
+from paho.mqtt import client as mqtt_client
+
+from ventanaPublicacion import VentanaPublicacion, formatear_metricas
+from enrutadorTopics import TablaTopics
+from filtroBanda import FiltroBanda, LATIDO, leer_configuracion
+from filtroBanda import formatear_metricas as formatear_supresion
+from loteLecturas import AcumuladorLote, INTERVALO_LOTE, codecs_disponibles, decodificar_lote
+from compresionDiccionario import Compresor
+
+# Puente serial -> MQTT en Python, equivalente a nodeMQTT/index.js:
+# cada trama se separa en {sede}/{piso}/temp, hum, rfid o rfid/denegado, y lo que no es
+# una trama completa va a {sede}/{piso}/otros. Las publicaciones pasan por una ventana
+# de mensajes en vuelo, así que el bucle serial nunca espera a la red mensaje por mensaje.
+# TEMP/HUM/RFID se publican por excepción (filtroBanda): solo si cambiaron más que su banda
+# muerta o si pasó el latido sin publicarlos. Con --lote las lecturas se juntan en un
+# solo payload por intervalo en {sede}/{piso}/lote (loteLecturas.py); --comprimir los
+# comprime con el último diccionario entrenado (compresionDiccionario.py). Un hilo envía el
+# lote al vencer su intervalo aunque el puerto serial deje de mandar bytes.
+# El decodificador de tramas y la lectura serial viven en SegundoParcial/Python
+SEGUNDO_PARCIAL = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                                                'SegundoParcial', 'Python'))
+sys.path.append(SEGUNDO_PARCIAL)
+try:
+    from ArduinoListener import bloques_recibidos
+    from DecodificadorTramas import DecodificadorTramas
+except ModuleNotFoundError as e:
+    if e.name not in ('ArduinoListener', 'DecodificadorTramas'):
+        raise  # Falta otra dependencia (ej. pyserial): el error original ya es claro
+    raise ImportError(f"puenteSerialMqtt necesita {e.name}.py de {SEGUNDO_PARCIAL}; "
+                      f"la carpeta SegundoParcial/Python del repositorio no está en su lugar") from e
+
+# Configuración (mismas variables de entorno que el puente de Node)
+SEDE = os.environ.get('SEDE', 'amerikeCDMX')
+PISO = os.environ.get('PISO', 'P1')
+SERIAL_PORT = os.environ.get('SERIAL_PORT', '/dev/pts/0')
+BAUD_RATE = 9600
+DEADBAND = os.environ.get('DEADBAND', '')  # Ej. "TEMP=0.2@30,HUM=1" (ver filtroBanda.py)
+
+broker = os.environ.get('MQTT_BROKER', '172.16.48.92')
+port = int(os.environ.get('MQTT_PORT', 1883))
+username = 'mtuuser'
+password = 'amerike'
+
+CAMPOS_TRAMA = 8
+LONGITUD_MAXIMA_LINEA = 64 * 1024  # Como readline de Node: las líneas largas también van a /otros
+ESPERA_VENTANA = 1.0      # Segundos máximos esperando lugar en la ventana antes de ir al log offline
+INTERVALO_REPORTE = 10.0  # Segundos entre reportes de tramas/s y latencia
+logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+
+# Acepta cualquier línea: las que no son tramas completas se publican en /otros
+PATRON_LINEA = re.compile(rb'[^\n]*')
+
+
+class PuenteSerialMqtt:
+    """Lee líneas del puerto serial y publica cada sensor en su topic"""
+
+    def __init__(self, client, sede=SEDE, piso=PISO, maximo_en_vuelo=100, verbose=True, filtro=None,
+                 lote=None):
+        # Topics {sede}/{piso}/... y UIDs autorizados; TOPICS_CONFIG cambia la tabla
+        self.enrutador = TablaTopics.desde_entorno().para(sede, piso)
+        self.client = client
+        self.ventana = VentanaPublicacion(client, maximo_en_vuelo)
+        self.decodificador = DecodificadorTramas(PATRON_LINEA, LONGITUD_MAXIMA_LINEA)
+        self.verbose = verbose
+        self.filtro = filtro  # FiltroBanda o None para publicar todo
+        self.lote = lote      # AcumuladorLote o None para un mensaje por lectura
+        self.offline_log = None
+        self._candado_lote = threading.Lock()  # procesar() y el hilo de vaciado comparten el lote
+        self._detener_vaciado = threading.Event()
+        self._hilo_vaciado = None
+
+        self.tramas = 0
+        self.tramas_reporte = 0
+        self.inicio_reporte = time.monotonic()
+
+    def mensajes(self, linea):
+        """Devuelve [(topic, mensaje)] de una línea, con la misma lógica que index.js"""
+        partes = linea.split(',')
+        if len(partes) < CAMPOS_TRAMA:
+            return [(self.enrutador.otros, linea)]
+        mensajes = (f"TEMP:{partes[2]}", f"HUM:{partes[3]}", f"RFID:{partes[7]}")
+        return [(self.enrutador.topic(mensaje), mensaje) for mensaje in mensajes]
+
+    def procesar(self, bloque):
+        """Publica todos los mensajes de las líneas completas del bloque recibido"""
+        for vista in self.decodificador.alimentar(bloque):
+            linea = str(vista, 'ascii', errors='replace').strip()
+            vista.release()
+            if not linea:
+                continue
+            self.tramas += 1
+            if self.verbose:
+                print(f"📡 Datos del Arduino: {linea}")
+            for topic, mensaje in self.mensajes(linea):
+                # Lo que no es trama (/otros) no tiene valor que comparar: siempre se publica
+                if self.filtro and topic is not self.enrutador.otros and not self.filtro.debe_publicar(topic, mensaje):
+                    continue
+                if self.lote:
+                    with self._candado_lote:
+                        self.publicar_lote(self.lote.agregar(topic, mensaje))
+                else:
+                    self.publicar(topic, mensaje)
+
+    def iniciar_vaciado(self):
+        """Hilo daemon que publica el lote en cuanto vence, sin esperar al siguiente bloque serial"""
+        def bucle():
+            espera = self.lote.intervalo
+            while not self._detener_vaciado.wait(espera):
+                with self._candado_lote:
+                    self.publicar_lote(self.lote.vencido())
+                    restante = self.lote.vence_en()
+                espera = self.lote.intervalo if restante is None else restante
+        self._detener_vaciado.clear()
+        self._hilo_vaciado = threading.Thread(target=bucle, daemon=True)
+        self._hilo_vaciado.start()
+
+    def detener_vaciado(self):
+        self._detener_vaciado.set()
+        if self._hilo_vaciado:
+            self._hilo_vaciado.join()
+            self._hilo_vaciado = None
+
+    def publicar(self, topic, mensaje):
+        if self.client.is_connected():
+            info = self.ventana.publicar(topic, mensaje, timeout=ESPERA_VENTANA)
+            if info is not None and info.rc == mqtt_client.MQTT_ERR_SUCCESS:
+                if self.offline_log:
+                    self.offline_log.close()
+                    self.offline_log = None
+                if self.verbose:
+                    print(f"📤 Publicado en '{topic}' → {mensaje}")
+                return
+        self.guardar_offline(topic, mensaje)
+
+    def publicar_lote(self, payload):
+        """Publica un lote listo; si no sale, cada lectura va al log offline"""
+        if payload is None:
+            return
+        if self.client.is_connected():
+            info = self.ventana.publicar(self.enrutador.lote, payload, timeout=ESPERA_VENTANA)
+            if info is not None and info.rc == mqtt_client.MQTT_ERR_SUCCESS:
+                if self.verbose:
+                    print(f"📤 Lote publicado en '{self.enrutador.lote}' ({len(payload)} bytes)")
+                return
+        for topic, mensaje, _ in decodificar_lote(payload):
+            self.guardar_offline(topic, mensaje)
+
+    def guardar_offline(self, topic, mensaje):
+        """Mismo formato que el log offline del puente de Node"""
+        if not self.offline_log:
+            os.makedirs(logs_dir, exist_ok=True)
+            filename = f"offline_{int(time.time() * 1000)}.txt"
+            self.offline_log = open(os.path.join(logs_dir, filename), 'a')
+        ahora = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        self.offline_log.write(f"{ahora} | {mensaje} → {topic}\n")
+
+    def reportar(self):
+        """Imprime tramas/s y las métricas de publicación desde el último reporte"""
+        ahora = time.monotonic()
+        transcurrido = ahora - self.inicio_reporte
+        tasa = (self.tramas - self.tramas_reporte) / transcurrido if transcurrido > 0 else 0.0
+        print(f"📊 {tasa:.1f} tramas/s, tramas={self.tramas}, {formatear_metricas(self.ventana.metricas())}")
+        if self.filtro:
+            print(f"🔇 Reporte por excepción: {formatear_supresion(self.filtro.metricas())}")
+        if self.lote:
+            m = self.lote.metricas()
+            print(f"📦 Lotes: {m['lotes']}, {m['lecturas_por_lote']:.1f} lecturas/lote, "
+                  f"{m['bytes_por_lectura']:.1f} bytes/lectura")
+        self.tramas_reporte = self.tramas
+        self.inicio_reporte = ahora
+
+    def run(self, ser):
+        siguiente_reporte = time.monotonic() + INTERVALO_REPORTE
+        if self.lote:
+            self.iniciar_vaciado()
+        for bloque in bloques_recibidos(ser):
+            self.procesar(bloque)
+            if time.monotonic() >= siguiente_reporte:
+                self.reportar()
+                siguiente_reporte = time.monotonic() + INTERVALO_REPORTE
+
+    def cerrar(self):
+        if self.lote:
+            self.detener_vaciado()
+            self.publicar_lote(self.lote.vaciar())
+        self.ventana.esperar_vacia(timeout=5)
+        if self.offline_log:
+            self.offline_log.close()
+            self.offline_log = None
+
+
+def connect_mqtt(broker, port):
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            print("✅ Conectado al broker MQTT")
+        else:
+            print(f"❌ Error de conexión, código {rc}")
+    client = mqtt_client.Client(f'puente-{SEDE}-{PISO}')
+    client.username_pw_set(username, password)
+    client.on_connect = on_connect
+    try:
+        client.connect(broker, port)
+    except Exception as e:
+        print("❌ Fallo de conexión MQTT:", e)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Puente serial -> MQTT con publicación en ventana")
+    parser.add_argument("--puerto", default=SERIAL_PORT, help="Puerto serial (ej. /dev/pts/0 o COM3)")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Velocidad en baudios")
+    parser.add_argument("--broker", default=broker, help="Host del broker MQTT")
+    parser.add_argument("--en-vuelo", type=int, default=100, help="Mensajes máximos sin confirmar")
+    parser.add_argument("--silencioso", action="store_true", help="No imprime cada trama (para medir rendimiento)")
+    parser.add_argument("--banda", default=DEADBAND, help='Bandas muertas y latidos, ej. "TEMP=0.2@30,HUM=1"')
+    parser.add_argument("--latido", type=float, default=LATIDO, help="Segundos máximos sin publicar un sensor")
+    parser.add_argument("--sin-banda", action="store_true", help="Publica todas las lecturas de cada trama")
+    parser.add_argument("--lote", choices=codecs_disponibles(), help="Junta las lecturas en lotes con este codec")
+    parser.add_argument("--intervalo-lote", type=float, default=INTERVALO_LOTE, help="Segundos máximos por lote")
+    parser.add_argument("--comprimir", action="store_true", help="Comprime los lotes con diccionario")
+    args = parser.parse_args()
+
+    filtro = None
+    if not args.sin_banda:
+        bandas, latidos = leer_configuracion(args.banda)
+        filtro = FiltroBanda(latido=args.latido, latidos=latidos)
+        filtro.bandas.update(bandas)
+
+    client = connect_mqtt(args.broker, port)
+    client.loop_start()
+    if args.comprimir and not args.lote:
+        parser.error("--comprimir requiere --lote")
+    compresor = Compresor.cargar() if args.comprimir else None
+    lote = AcumuladorLote(args.lote, intervalo=args.intervalo_lote, compresor=compresor) if args.lote else None
+    puente = PuenteSerialMqtt(client, maximo_en_vuelo=args.en_vuelo, verbose=not args.silencioso, filtro=filtro,
+                              lote=lote)
+    try:
+        with serial.Serial(args.puerto, args.baud, timeout=1) as ser:
+            print(f"Escuchando en {args.puerto}, publicando en {SEDE}/{PISO}/...")
+            puente.run(ser)
+    except KeyboardInterrupt:
+        print("\nPrograma terminado.")
+    finally:
+        puente.cerrar()
+        puente.reportar()
+        client.loop_stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
-import random
+import os
 from paho.mqtt import client as mqtt_client
+from almacenSeries import AlmacenSeries, formatear_estadisticas
+from poolConexiones import identidad_cliente
+from loteLecturas import expandir
+from enrutadorTopics import EnrutadorTopics
 
 # Datos del servidor Mosquitto
-broker = '172.16.48.92'
-port = 1883
-client_id = f'subscriber-{random.randint(0, 1000)}'
+broker = os.environ.get('MQTT_BROKER', '172.16.48.92')
+port = int(os.environ.get('MQTT_PORT', 1883))
+client_id = identidad_cliente('subscriber')  # Estable y sin colisiones en esta máquina
 
 # Lista sede/piso/sensor
 opciones = {
@@ -47,19 +51,23 @@ opciones = {
     '30': ('amerikeGDJ/P2/otros', 'GDJ P2 - Otros sensores'),
 }
 
-# Mostrar menú
-print("Selecciona el topic al que deseas suscribirte:\n")
-for k, v in opciones.items():
-    print(f"{k}. {v[1]}")
+def elegir_topic():
+    """Muestra el menú y devuelve el topic elegido"""
+    print("Selecciona el topic al que deseas suscribirte:\n")
+    for k, v in opciones.items():
+        print(f"{k}. {v[1]}")
 
-opcion = input("\nIngresa el número de opción: ").strip()
+    opcion = input("\nIngresa el número de opción: ").strip()
 
-if opcion not in opciones:
-    print("❌ Opción inválida.")
-    exit(1)
+    if opcion not in opciones:
+        print("❌ Opción inválida.")
+        exit(1)
 
-topic = opciones[opcion][0]
-print(f"\n📡 Suscrito a: {topic} - {opciones[opcion][1]}")
+    print(f"\n📡 Suscrito a: {opciones[opcion][0]} - {opciones[opcion][1]}")
+    return opciones[opcion][0]
+
+# Últimas muestras del topic con estadísticas móviles (últimos 5 minutos)
+almacen = AlmacenSeries(ventana=300)
 
 # Conexión al broker
 def connect_mqtt():
@@ -75,17 +83,27 @@ def connect_mqtt():
     client.connect(broker, port)
     return client
 
-# Lógica de suscripción
-def subscribe(client):
-    def on_message(client, userdata, msg):
-        print(f"📥 Mensaje recibido: '{msg.payload.decode()}' del topic '{msg.topic}'")
+def on_message(client, userdata, msg):
+    # userdata es el topic elegido: de un lote solo interesan sus lecturas
+    for topic, payload, ts in expandir(msg):
+        if userdata and not mqtt_client.topic_matches_sub(userdata, topic):
+            continue
+        print(f"📥 Mensaje recibido: '{payload.decode()}' del topic '{topic}'")
+        if almacen.insertar_mensaje(topic, payload, ts):
+            print(f"📊 Últimos 5 min: {formatear_estadisticas(almacen.consultar(topic))}")
 
-    client.subscribe(topic)
+# Lógica de suscripción
+def subscribe(client, topic):
+    # Además del topic, el de lotes de la misma sede/piso (puenteSerialMqtt --lote)
+    sede, piso = topic.split('/')[:2]
+    client.user_data_set(topic)
+    client.subscribe([(topic, 0), (EnrutadorTopics(sede, piso).lote, 0)])
     client.on_message = on_message
 
 def run():
+    topic = elegir_topic()
     client = connect_mqtt()
-    subscribe(client)
+    subscribe(client, topic)
     client.loop_forever()
 
 if __name__ == '__main__':
@@ -1,16 +1,22 @@
-import random
+import os
 from paho.mqtt import client as mqtt_client
+from almacenSeries import AlmacenSeries, formatear_estadisticas
+from poolConexiones import identidad_cliente
+from loteLecturas import expandir
 
 # Datos del servidor Mosquitto
-broker = '192.168.3.53'
-port = 1883
-client_id = f'subscribe-{random.randint(0, 1000)}'
+broker = os.environ.get('MQTT_BROKER', '192.168.3.53')
+port = int(os.environ.get('MQTT_PORT', 1883))
+client_id = identidad_cliente('subscribe')  # Estable y sin colisiones en esta máquina
 username = 'mtuuser'
 password = 'amerike'
 
-# Nos suscribimos a todos los sensores: TEMP, HUM, RFID
+# Nos suscribimos a todos los sensores: TEMP, HUM, RFID (y sus lotes en amerike/sensor/lote)
 topic = "amerike/sensor/#"
 
+# Últimas muestras por topic con estadísticas móviles (últimos 5 minutos)
+almacen = AlmacenSeries(ventana=300)
+
 def connect_mqtt():
     def on_connect(client, userdata, flags, rc):
         if rc == 0:
@@ -24,9 +30,14 @@ def connect_mqtt():
     client.connect(broker, port)
     return client
 
+def on_message(client, userdata, msg):
+    # Un lote se procesa como si cada lectura hubiera llegado en su propio mensaje
+    for topic, payload, ts in expandir(msg):
+        print(f"📥 Recibido '{payload.decode()}' del topic '{topic}'")
+        if almacen.insertar_mensaje(topic, payload, ts):
+            print(f"📊 {topic} (5 min): {formatear_estadisticas(almacen.consultar(topic))}")
+
 def subscribe(client: mqtt_client):
-    def on_message(client, userdata, msg):
-        print(f"📥 Recibido '{msg.payload.decode()}' del topic '{msg.topic}'")
     client.subscribe(topic)
     client.on_message = on_message
 
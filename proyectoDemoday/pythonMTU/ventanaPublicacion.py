@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import deque
+
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_SUCCESS
+
+# Ventana de publicaciones en vuelo sobre un cliente paho.
+# En lugar de publicar y esperar cada mensaje, se encolan hasta MAXIMO_EN_VUELO mensajes
+# y el hilo de red de paho los envía en lote; cuando la ventana está llena, publicar()
+# espera a que se libere un lugar (backpressure). La latencia se mide desde publish()
+# hasta on_publish (escritura en el socket con QoS 0, PUBACK con QoS 1).
+# Con QoS 1 la ventana es además la garantía de entrega: un lugar se libera solo cuando
+# el broker confirmó el mensaje, y on_confirmado recibe la latencia de cada uno.
+# Al desconectarse, paho descarta los QoS 0 que no alcanzó a escribir y nunca llama
+# on_publish por ellos: la ventana libera sus lugares en on_disconnect.
+
+MAXIMO_EN_VUELO = 100
+MUESTRAS_LATENCIA = 10000  # Latencias recientes que se conservan para los percentiles
+
+
+def percentil(ordenadas, p):
+    """Percentil p (0-100) de una lista ya ordenada; None si está vacía"""
+    if not ordenadas:
+        return None
+    indice = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+    return ordenadas[indice]
+
+
+class VentanaPublicacion:
+    """Limita los mensajes publicados que aún no confirma paho y mide su latencia"""
+
+    def __init__(self, client, maximo=MAXIMO_EN_VUELO, qos=0, on_confirmado=None):
+        self.client = client
+        self.maximo = maximo
+        self.qos = qos
+        self.on_confirmado = on_confirmado  # on_confirmado(mid, topic, latencia_s)
+        self._condicion = threading.Condition()
+        self._ocupados = 0          # Lugares reservados de la ventana
+        self._pendientes = {}       # mid -> (instante de publicación, topic, qos)
+        self._adelantados = set()   # mids confirmados antes de registrarse (paho sin hilo de red)
+        self._publicando = 0        # Llamadas a publish() en curso
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)
+
+        self.publicados = 0
+        self.confirmados = 0
+        self.errores = 0
+        self.esperas = 0       # Veces que publicar() tuvo que esperar por ventana llena
+        self.maximo_en_vuelo = 0
+
+        client.max_inflight_messages_set(maximo)
+        anterior = client.on_publish
+
+        def on_publish(client, userdata, mid):
+            self.confirmar(mid)
+            if anterior:
+                anterior(client, userdata, mid)
+        client.on_publish = on_publish
+
+        anterior_desconexion = client.on_disconnect
+
+        def on_disconnect(client, userdata, rc):
+            self.descartar_qos0()
+            if anterior_desconexion:
+                anterior_desconexion(client, userdata, rc)
+        client.on_disconnect = on_disconnect
+
+    @property
+    def en_vuelo(self):
+        return self._ocupados
+
+    def publicar(self, topic, payload, qos=None, timeout=None):
+        """Publica sin esperar la confirmación; bloquea solo si la ventana está llena
+
+        Devuelve el MQTTMessageInfo de paho, o None si la ventana no se liberó a tiempo.
+        """
+        qos = self.qos if qos is None else qos
+        with self._condicion:
+            if self._ocupados >= self.maximo:
+                self.esperas += 1
+                if not self._condicion.wait_for(lambda: self._ocupados < self.maximo, timeout):
+                    return None
+            self._ocupados += 1  # Se reserva el lugar antes de soltar el candado
+            self._publicando += 1
+            self.maximo_en_vuelo = max(self.maximo_en_vuelo, self._ocupados)
+
+        # paho llama on_publish con sus propios candados tomados: publish() va fuera del nuestro
+        inicio = time.perf_counter()
+        info = self.client.publish(topic, payload, qos)
+
+        confirmado = None
+        with self._condicion:
+            self._publicando -= 1
+            if info.rc == MQTT_ERR_NO_CONN and qos > 0:
+                # paho conserva los mensajes QoS>0 y los reenvía al reconectar: siguen en vuelo
+                self.errores += 1
+                self._pendientes[info.mid] = (inicio, topic, qos)
+            elif info.rc != MQTT_ERR_SUCCESS:
+                self.errores += 1
+                self._liberar()
+            elif info.mid in self._adelantados:
+                self.publicados += 1
+                self._adelantados.discard(info.mid)
+                confirmado = self._registrar(time.perf_counter() - inicio)
+                self._liberar()
+            else:
+                self.publicados += 1
+                self._pendientes[info.mid] = (inicio, topic, qos)
+            if not self._publicando:
+                self._adelantados.clear()  # mids ajenos a la ventana (otro código publicando)
+        if confirmado is not None and self.on_confirmado:
+            self.on_confirmado(info.mid, topic, confirmado)
+        return info
+
+    def confirmar(self, mid):
+        """Llamado desde on_publish: libera el lugar del mensaje y registra su latencia"""
+        with self._condicion:
+            pendiente = self._pendientes.pop(mid, None)
+            if pendiente is None:
+                if self._publicando:
+                    self._adelantados.add(mid)  # publicar() todavía no registra el mid
+                return
+            inicio, topic, _ = pendiente
+            latencia = self._registrar(time.perf_counter() - inicio)
+            self._liberar()
+        if self.on_confirmado:
+            self.on_confirmado(mid, topic, latencia)
+
+    def descartar_qos0(self):
+        """Libera los lugares de los QoS 0 sin confirmar (paho los pierde al desconectarse)"""
+        with self._condicion:
+            perdidos = [mid for mid, (_, _, qos) in self._pendientes.items() if qos == 0]
+            for mid in perdidos:
+                del self._pendientes[mid]
+                self.errores += 1
+                self._liberar()
+        return len(perdidos)
+
+    def _liberar(self):
+        self._ocupados -= 1
+        self._condicion.notify_all()
+
+    def _registrar(self, latencia):
+        self.confirmados += 1
+        self.latencias.append(latencia)
+        return latencia
+
+    def sin_confirmar(self, antiguedad):
+        """[(mid, topic, segundos)] de los mensajes en vuelo hace más de antiguedad segundos"""
+        ahora = time.perf_counter()
+        with self._condicion:
+            return [(mid, topic, ahora - inicio) for mid, (inicio, topic, _) in self._pendientes.items()
+                    if ahora - inicio > antiguedad]
+
+    def esperar_vacia(self, timeout=None):
+        """Espera a que se confirmen todos los mensajes en vuelo; False si venció el timeout"""
+        with self._condicion:
+            return self._condicion.wait_for(lambda: not self._ocupados, timeout)
+
+    def metricas(self):
+        """Contadores y percentiles de latencia en milisegundos"""
+        with self._condicion:
+            ordenadas = sorted(self.latencias)
+            ahora = time.perf_counter()
+            antiguo = min((inicio for inicio, _, _ in self._pendientes.values()), default=None)
+            resultado = {
+                'publicados': self.publicados,
+                'confirmados': self.confirmados,
+                'errores': self.errores,
+                'en_vuelo': self._ocupados,
+                'maximo_en_vuelo': self.maximo_en_vuelo,
+                'esperas': self.esperas,
+                'mas_antiguo_ms': None if antiguo is None else (ahora - antiguo) * 1000,
+            }
+        for nombre, p in (('p50', 50), ('p99', 99), ('p999', 99.9), ('max', 100)):
+            valor = percentil(ordenadas, p)
+            resultado[f'latencia_{nombre}_ms'] = None if valor is None else valor * 1000
+        return resultado
+
+
+def formatear_metricas(m):
+    """Texto corto de las métricas de la ventana"""
+    if m['latencia_p50_ms'] is None:
+        latencia = "sin confirmaciones"
+    else:
+        latencia = (f"latencia p50={m['latencia_p50_ms']:.2f} ms p99={m['latencia_p99_ms']:.2f} ms "
+                    f"p999={m['latencia_p999_ms']:.2f} ms máx={m['latencia_max_ms']:.2f} ms")
+    return (f"publicados={m['publicados']} confirmados={m['confirmados']} errores={m['errores']} "
+            f"en vuelo={m['en_vuelo']} (máx {m['maximo_en_vuelo']}), {latencia}")
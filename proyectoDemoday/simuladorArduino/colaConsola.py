@@ -0,0 +1,51 @@
+"""
+Cola Coalescente para las Consolas del Simulador
+
+Recibe líneas desde cualquier hilo sin bloquear nunca al que escribe. El hilo
+principal las drena todas de una vez en cada cuadro de la UI, para insertarlas en
+el widget con un solo insert. Si se acumulan más líneas que la capacidad (UI más
+lenta que la tasa de envío), se descartan las más antiguas y se cuentan como
+omitidas.
+
+Solo usa operaciones atómicas de collections.deque (append/popleft), sin locks.
+
+Autor: Amerike6oSemestre
+"""
+
+from collections import deque
+
+CAPACIDAD_PENDIENTES = 500  # Líneas máximas en espera entre dos cuadros de la UI
+
+
+class ColaConsola:
+    """Buffer de líneas pendientes para una consola, con contador de omitidas"""
+
+    def __init__(self, capacidad=CAPACIDAD_PENDIENTES):
+        self.capacidad = capacidad
+        self.pendientes = deque(maxlen=capacidad)  # maxlen descarta la más antigua al llenarse
+        self.omitidas_total = 0      # Solo lo incrementa el productor
+        self._omitidas_drenadas = 0  # Solo lo modifica el hilo principal
+
+    def agregar(self, linea):
+        """Encola una línea; nunca bloquea (ejecutable desde cualquier hilo)"""
+        if len(self.pendientes) >= self.capacidad:
+            self.omitidas_total += 1
+        self.pendientes.append(linea)
+
+    def drenar(self):
+        """Extrae todas las líneas pendientes (hilo principal)
+
+        Devuelve (lineas, omitidas) donde omitidas son las líneas descartadas
+        desde el drenado anterior.
+        """
+        lineas = []
+        try:
+            while True:
+                lineas.append(self.pendientes.popleft())
+        except IndexError:
+            pass
+
+        total = self.omitidas_total
+        omitidas = total - self._omitidas_drenadas
+        self._omitidas_drenadas = total
+        return lineas, omitidas
@@ -0,0 +1,67 @@
+"""
+Consola con Buffer Circular para el Simulador
+
+Las consolas de la GUI reciben una línea por cada trama enviada. En lugar de
+acumular todo en el widget Tk (memoria y costo de redibujado sin límite), cada
+consola guarda el historial en un buffer circular de capacidad fija y el widget
+solo conserva la ventana visible (las últimas LINEAS_VISIBLES líneas).
+
+El historial completo retenido se puede exportar a un archivo de texto.
+
+Autor: Amerike6oSemestre
+"""
+
+import tkinter as tk
+from tkinter import scrolledtext
+from collections import deque
+
+RETENCION_LINEAS = 100000  # Líneas guardadas en el historial (exportables)
+LINEAS_VISIBLES = 200      # Líneas que se mantienen en el widget
+
+
+class ConsolaAnillo:
+    """ScrolledText de solo lectura respaldado por un buffer circular"""
+
+    def __init__(self, parent, retencion=RETENCION_LINEAS, lineas_visibles=LINEAS_VISIBLES, **opciones):
+        """Crea el widget con las opciones de ScrolledText indicadas"""
+        self.historial = deque(maxlen=retencion)  # Al llenarse descarta la línea más antigua
+        self.lineas_visibles = lineas_visibles
+        self.lineas_widget = 0  # Líneas actualmente en el widget (evita consultar índices Tk)
+        self.descartadas = 0    # Líneas que salieron del historial por la retención
+        self.widget = scrolledtext.ScrolledText(parent, state=tk.DISABLED, **opciones)
+
+    def pack(self, **opciones):
+        self.widget.pack(**opciones)
+
+    def agregar_lineas(self, lineas):
+        """Agrega líneas al historial y a la ventana visible (ejecutado en el hilo principal)"""
+        if not lineas:
+            return
+
+        exceso_historial = len(self.historial) + len(lineas) - self.historial.maxlen
+        if exceso_historial > 0:
+            self.descartadas += exceso_historial
+        self.historial.extend(lineas)
+
+        # Solo se renderizan las últimas líneas que caben en la ventana visible
+        visibles = lineas[-self.lineas_visibles:]
+        self.widget.config(state=tk.NORMAL)
+        self.widget.insert(tk.END, "\n".join(visibles) + "\n")
+        self.lineas_widget += len(visibles)
+
+        exceso = self.lineas_widget - self.lineas_visibles
+        if exceso > 0:
+            self.widget.delete("1.0", f"{exceso + 1}.0")
+            self.lineas_widget -= exceso
+
+        self.widget.see(tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+    def exportar(self, ruta):
+        """Escribe todo el historial retenido en un archivo de texto; devuelve las líneas escritas"""
+        lineas = list(self.historial)  # Copia para no iterar mientras se agregan líneas
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            if self.descartadas:
+                archivo.write(f"# {self.descartadas} líneas anteriores descartadas por la retención\n")
+            archivo.writelines(linea + "\n" for linea in lineas)
+        return len(lineas)
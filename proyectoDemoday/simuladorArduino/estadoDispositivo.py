@@ -0,0 +1,68 @@
+"""
+Instantánea Inmutable del Estado de un Dispositivo
+
+EstadoDispositivo guarda los valores de sensores/actuadores de un Arduino simulado
+y la trama CSV ya serializada:
+sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
+
+La GUI crea una instantánea nueva en el hilo principal solo cuando cambia un
+control y la publica reemplazando una referencia; el hilo de envío lee esa
+referencia y escribe la trama sin llamar a Tk. Como nunca se modifica, no hace
+falta ningún lock.
+
+También guarda sus lecturas por tipo de sensor ({'TEMP': 22.5, ...}) para que el
+reporte por excepción compare instantáneas sin volver a separar la trama.
+
+Autor: Amerike6oSemestre
+"""
+
+
+class EstadoDispositivo:
+    """Valores de un dispositivo y su trama CSV precalculada (inmutable)"""
+
+    __slots__ = (
+        'sonico', 'fotoresistencia', 'temperatura', 'humedad',
+        'led_ultra', 'leds', 'buzzer', 'rfid',
+        'leds_binario', 'trama', 'datos', 'lecturas'
+    )
+
+    def __init__(self, sonico=0, fotoresistencia=1, temperatura=22.5, humedad=45.0,
+                 led_ultra=0, leds=(0,) * 10, buzzer=0, rfid="ID0001ABC"):
+        """Crea la instantánea con los valores por defecto de la GUI y serializa la trama"""
+        leds = tuple(leds)
+        leds_binario = ''.join([str(led) for led in leds])
+        trama = (
+            f"{sonico},{fotoresistencia},"
+            f"{temperatura:.2f},{humedad:.2f},"
+            f"{led_ultra},{leds_binario},"
+            f"{buzzer},{rfid}"
+        )
+        for nombre, valor in (
+            ('sonico', sonico), ('fotoresistencia', fotoresistencia),
+            ('temperatura', temperatura), ('humedad', humedad),
+            ('led_ultra', led_ultra), ('leds', leds), ('buzzer', buzzer), ('rfid', rfid),
+            ('leds_binario', leds_binario), ('trama', trama),
+            ('datos', (trama + "\n").encode()),  # Bytes listos para escribir en el puerto
+            ('lecturas', {
+                'SONICO': sonico, 'LUZ': fotoresistencia, 'TEMP': temperatura, 'HUM': humedad,
+                'LED': led_ultra, 'LEDS': leds_binario, 'BUZZER': buzzer, 'RFID': rfid,
+            }),
+        ):
+            object.__setattr__(self, nombre, valor)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("EstadoDispositivo es inmutable; use reemplazar()")
+
+    def reemplazar(self, **cambios):
+        """Devuelve una instantánea nueva con los campos indicados modificados"""
+        valores = {
+            'sonico': self.sonico, 'fotoresistencia': self.fotoresistencia,
+            'temperatura': self.temperatura, 'humedad': self.humedad,
+            'led_ultra': self.led_ultra, 'leds': self.leds,
+            'buzzer': self.buzzer, 'rfid': self.rfid,
+        }
+        valores.update(cambios)
+        return EstadoDispositivo(**valores)
+
+    def __repr__(self):
+        return f"EstadoDispositivo({self.trama!r})"
@@ -0,0 +1,147 @@
+"""
+Generador Vectorizado de Señales para Flotas Simuladas
+
+Avanza en un solo paso de NumPy los modelos de todos los dispositivos de la flota:
+- Temperatura y humedad: ciclo diurno + caminata aleatoria con reversión a la media
+  (Ornstein-Uhlenbeck) + ruido de medición. La humedad va en contrafase.
+- Sónico: cadena de Markov de dos estados (presencia / sin presencia).
+- Fotoresistencia: nivel de luz diurno con ruido y umbral por dispositivo;
+  el LED ultra se enciende cuando no hay luz (misma lógica que la GUI).
+- RFID: lecturas como proceso de Poisson sobre un catálogo de tarjetas.
+
+La salida alimenta el formato CSV de la trama serial:
+sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
+y los mensajes TEMP:/HUM:/RFID: que publican publisherPruebas y nodeMQTT.
+
+Requiere numpy.
+
+Autor: Amerike6oSemestre
+"""
+
+import time
+
+import numpy as np
+
+# ===================== PARÁMETROS DE LOS MODELOS =====================
+TEMP_BASE = (20.0, 25.0)      # Rango de temperatura media por dispositivo (°C)
+TEMP_AMPLITUD_DIURNA = 3.0    # °C de variación día/noche
+TEMP_SIGMA_CAMINATA = 0.05    # °C/√s de la caminata aleatoria
+TEMP_SIGMA_RUIDO = 0.05       # °C de ruido de medición
+HUM_BASE = (35.0, 55.0)       # Rango de humedad media por dispositivo (%)
+HUM_AMPLITUD_DIURNA = 8.0     # % de variación día/noche (contrafase con la temperatura)
+HUM_SIGMA_CAMINATA = 0.2      # %/√s de la caminata aleatoria
+HUM_SIGMA_RUIDO = 0.3         # % de ruido de medición
+TAU_REVERSION = 600.0         # Segundos para volver a la media (Ornstein-Uhlenbeck)
+HORA_PICO = 15.0              # Hora del día con la temperatura máxima
+
+SONICO_TASA_ACTIVACION = 0.02 # Activaciones por segundo (sin presencia -> presencia)
+SONICO_TASA_LIBERACION = 0.2  # Liberaciones por segundo (presencia -> sin presencia)
+LUZ_SIGMA_RUIDO = 0.1         # Ruido del nivel de luz normalizado (0-1)
+
+RFID_TASA = 1.0 / 60.0        # Lecturas RFID por segundo por dispositivo
+RFID_CATALOGO = ['12345', '67890', 'ID0001ABC', 'ID0002XYZ', 'A1B2C3D4']
+
+
+class GeneradorSenales:
+    """Modelos de señales de N dispositivos en arreglos de NumPy"""
+
+    def __init__(self, n_dispositivos, semilla=None, inicio=None):
+        """Inicializa el estado de la flota con parámetros aleatorios por dispositivo"""
+        self.n = n_dispositivos
+        self.rng = np.random.default_rng(semilla)
+        self.t = time.time() if inicio is None else inicio  # Reloj simulado (epoch)
+
+        # ========== PARÁMETROS POR DISPOSITIVO ==========
+        self.temp_media = self.rng.uniform(*TEMP_BASE, self.n)
+        self.hum_media = self.rng.uniform(*HUM_BASE, self.n)
+        self.umbral_luz = self.rng.uniform(0.3, 0.6, self.n)
+
+        # ========== ESTADO ==========
+        self.temp_desvio = np.zeros(self.n)  # Componente de caminata aleatoria
+        self.hum_desvio = np.zeros(self.n)
+        self.temperatura = self.temp_media.copy()
+        self.humedad = self.hum_media.copy()
+        self.sonico = np.zeros(self.n, dtype=np.uint8)
+        self.fotoresistencia = np.ones(self.n, dtype=np.uint8)
+        self.led_ultra = np.zeros(self.n, dtype=np.uint8)
+        self.leds = np.zeros(self.n, dtype=np.uint16)  # Máscara de 10 bits (bit 0 = LED 1)
+        self.buzzer = np.zeros(self.n, dtype=np.uint8)
+        self.rfid = np.zeros(self.n, dtype=np.intp)    # Índice en RFID_CATALOGO
+        self.rfid_leido = np.zeros(self.n, dtype=bool)  # Lectura RFID en el último paso
+
+        self.catalogo = np.array(RFID_CATALOGO)
+        self.paso(0.0)
+
+    def paso(self, dt):
+        """Avanza dt segundos todos los modelos de la flota"""
+        self.t += dt
+        rng = self.rng
+        n = self.n
+
+        # Ciclo diurno común (fase 0 en HORA_PICO)
+        hora = (self.t % 86400.0) / 3600.0
+        fase = np.cos(2.0 * np.pi * (hora - HORA_PICO) / 24.0)
+
+        # Caminata aleatoria con reversión a la media (discretización exacta de OU)
+        decaimiento = np.exp(-dt / TAU_REVERSION)
+        escala = np.sqrt(TAU_REVERSION / 2.0 * (1.0 - decaimiento ** 2))
+        self.temp_desvio = self.temp_desvio * decaimiento + rng.normal(0.0, TEMP_SIGMA_CAMINATA * escala, n)
+        self.hum_desvio = self.hum_desvio * decaimiento + rng.normal(0.0, HUM_SIGMA_CAMINATA * escala, n)
+
+        self.temperatura = np.clip(
+            self.temp_media + TEMP_AMPLITUD_DIURNA * fase + self.temp_desvio
+            + rng.normal(0.0, TEMP_SIGMA_RUIDO, n),
+            -10.0, 50.0
+        ).round(2)
+        self.humedad = np.clip(
+            self.hum_media - HUM_AMPLITUD_DIURNA * fase + self.hum_desvio
+            + rng.normal(0.0, HUM_SIGMA_RUIDO, n),
+            0.0, 100.0
+        ).round(2)
+
+        # Sónico: transición con probabilidad 1 - e^(-tasa*dt) según el estado actual
+        p_activar = 1.0 - np.exp(-SONICO_TASA_ACTIVACION * dt)
+        p_liberar = 1.0 - np.exp(-SONICO_TASA_LIBERACION * dt)
+        sorteo = rng.random(n)
+        cambia = np.where(self.sonico == 1, sorteo < p_liberar, sorteo < p_activar)
+        self.sonico ^= cambia.astype(np.uint8)
+
+        # Fotoresistencia: luz diurna (máxima a mediodía) contra el umbral del dispositivo
+        luz = 0.5 + 0.5 * np.cos(2.0 * np.pi * (hora - 12.0) / 24.0)
+        self.fotoresistencia = (luz + rng.normal(0.0, LUZ_SIGMA_RUIDO, n) > self.umbral_luz).astype(np.uint8)
+        self.led_ultra = 1 - self.fotoresistencia
+
+        # RFID: proceso de Poisson; el campo conserva la última tarjeta leída
+        self.rfid_leido = rng.random(n) < 1.0 - np.exp(-RFID_TASA * dt)
+        lecturas = np.flatnonzero(self.rfid_leido)
+        self.rfid[lecturas] = rng.integers(0, len(self.catalogo), lecturas.size)
+
+    def leds_binarios(self):
+        """Devuelve la máscara de LEDs de cada dispositivo como cadena '0000000000'"""
+        return [format(mascara, '010b')[::-1] for mascara in self.leds.tolist()]
+
+    def tramas(self):
+        """Devuelve la trama CSV de cada dispositivo (mismo formato que la GUI)"""
+        return [
+            f"{s},{f},{t:.2f},{h:.2f},{l},{b},{z},{r}"
+            for s, f, t, h, l, b, z, r in zip(
+                self.sonico.tolist(), self.fotoresistencia.tolist(),
+                self.temperatura.tolist(), self.humedad.tolist(),
+                self.led_ultra.tolist(), self.leds_binarios(),
+                self.buzzer.tolist(), self.catalogo[self.rfid].tolist()
+            )
+        ]
+
+    def mensajes(self):
+        """Devuelve los mensajes TEMP:/HUM:/RFID: del paso como (indice, mensaje)
+
+        TEMP y HUM se generan para todos los dispositivos; RFID solo para los
+        que tuvieron una lectura en el último paso.
+        """
+        salida = []
+        for i, (t, h) in enumerate(zip(self.temperatura.tolist(), self.humedad.tolist())):
+            salida.append((i, f"TEMP:{t:.2f}"))
+            salida.append((i, f"HUM:{h:.2f}"))
+        for i in np.flatnonzero(self.rfid_leido).tolist():
+            salida.append((i, f"RFID:{self.catalogo[self.rfid[i]]}"))
+        return salida
@@ -0,0 +1,106 @@
+"""
+Planificador Periódico sin Deriva
+
+Calcula cada instante de envío a partir del inicio (inicio + k * periodo) con un
+reloj monotónico, en lugar de dormir un tiempo fijo después de cada envío. Así el
+tiempo que tarda la escritura serial o la UI no se acumula en el intervalo.
+
+Para periodos de milisegundos duerme hasta poco antes del deadline y termina con
+una espera activa corta (MARGEN_ESPERA_ACTIVA, a lo más FRACCION_ESPERA_ACTIVA del
+periodo), porque la resolución de sleep del sistema operativo (~1 ms en Linux,
+~15 ms en Windows) no alcanza. La espera activa cede el GIL (sleep(0)) para no
+frenar al hilo de la UI.
+
+La espera es un Event: detener() o cambiar_periodo() la interrumpen de inmediato.
+
+Métricas: tasa lograda, jitter (retraso respecto al deadline) y deadlines perdidos.
+
+Autor: Amerike6oSemestre
+"""
+
+import threading
+import time
+
+MARGEN_ESPERA_ACTIVA = 0.002  # Segundos finales que se esperan activamente
+FRACCION_ESPERA_ACTIVA = 0.1  # Fracción máxima del periodo en espera activa
+
+
+class PlanificadorPeriodico:
+    """Genera ticks periódicos con deadlines absolutos sobre time.perf_counter"""
+
+    def __init__(self, periodo, margen_espera_activa=MARGEN_ESPERA_ACTIVA):
+        """Crea el planificador con el periodo en segundos"""
+        self.periodo = periodo
+        self.margen_espera_activa = margen_espera_activa
+        self.evento = threading.Event()  # Despierta esperar() al detener o cambiar el periodo
+        self.detenido = False
+        self.iniciar()
+
+    def iniciar(self):
+        """Fija el origen de los deadlines y reinicia las métricas"""
+        self.inicio = time.perf_counter()
+        self.deadline = self.inicio
+        self.ticks = 0
+        self.perdidos = 0          # Deadlines saltados por ir con más de un periodo de retraso
+        self.retraso_max = 0.0
+        self._retraso_media = 0.0  # Media y suma de cuadrados (Welford) del retraso
+        self._retraso_m2 = 0.0
+
+    def cambiar_periodo(self, periodo):
+        """Cambia el periodo desde ahora; interrumpe la espera en curso (sin saltos acumulados)"""
+        self.periodo = periodo
+        self.iniciar()
+        self.evento.set()
+
+    def esperar(self):
+        """Bloquea hasta el siguiente deadline; devuelve False si se pidió detener"""
+        self.deadline += self.periodo
+        ahora = time.perf_counter()
+
+        # Si ya pasó más de un periodo, se saltan los deadlines perdidos (sin ráfagas)
+        if ahora - self.deadline >= self.periodo:
+            saltados = int((ahora - self.deadline) // self.periodo)
+            self.perdidos += saltados
+            self.deadline += saltados * self.periodo
+
+        margen = min(self.margen_espera_activa, self.periodo * FRACCION_ESPERA_ACTIVA)
+        restante = self.deadline - ahora
+        if restante > margen:
+            self.evento.wait(restante - margen)
+        while time.perf_counter() < self.deadline and not self.evento.is_set():
+            time.sleep(0)  # Cede el GIL mientras espera
+
+        if self.evento.is_set():
+            # Detenido, o nuevo periodo: el tick sale ya (origen nuevo) y no cuenta como jitter
+            self.evento.clear()
+            return not self.detenido
+
+        self._registrar_retraso(time.perf_counter() - self.deadline)
+        return True
+
+    def detener(self):
+        """Despierta al hilo que espera y hace que esperar() devuelva False"""
+        self.detenido = True
+        self.evento.set()
+
+    def _registrar_retraso(self, retraso):
+        """Actualiza las estadísticas de jitter de forma incremental"""
+        self.ticks += 1
+        delta = retraso - self._retraso_media
+        self._retraso_media += delta / self.ticks
+        self._retraso_m2 += delta * (retraso - self._retraso_media)
+        if retraso > self.retraso_max:
+            self.retraso_max = retraso
+
+    def metricas(self):
+        """Devuelve tasa lograda (Hz), jitter medio/desviación/máximo (s) y perdidos"""
+        transcurrido = time.perf_counter() - self.inicio
+        return {
+            'tasa_hz': self.ticks / transcurrido if transcurrido > 0 else 0.0,
+            'tasa_objetivo_hz': 1.0 / self.periodo,
+            'jitter_medio': self._retraso_media,
+            'jitter_desviacion': (self._retraso_m2 / self.ticks) ** 0.5 if self.ticks else 0.0,
+            'jitter_max': self.retraso_max,
+            'perdidos': self.perdidos,
+            'ticks': self.ticks,
+        }
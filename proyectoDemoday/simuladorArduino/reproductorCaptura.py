@@ -0,0 +1,168 @@
+"""
+Grabación y Reproducción de Capturas Seriales
+
+Trabaja con el formato de captura de serial_to_mqtt_logger.js
+(SERVIDORES/SerialToMqtt/received_serial_data.txt):
+
+    2025-05-21T16:14:00.022Z - RX_SERIAL: 0,1,22.50,45.00,0,0000000000,0,ID0001ABC
+
+- reproducir: envía las tramas de una captura a cualquier transporte de
+  transportes.py (serial, pty, TCP, UDP, MQTT, memoria) respetando los tiempos
+  originales entre tramas, escalados por --velocidad (10 = 10x más rápido,
+  0 = tan rápido como sea posible). --max-pausa recorta los huecos largos entre
+  sesiones de captura (ej. entre días distintos).
+- grabar: lee líneas de un puerto serial (o pty) y las guarda en el mismo formato.
+
+Uso:
+    python3 reproductorCaptura.py reproducir received_serial_data.txt --destino pty:// --velocidad 10
+    python3 reproductorCaptura.py reproducir captura.txt --destino "mqtt://localhost:1883/amerikeCDMX/P1/serial" --velocidad 0
+    python3 reproductorCaptura.py grabar /dev/pts/4 --archivo captura.txt
+
+Autor: Amerike6oSemestre
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime, timezone
+
+from planificador import MARGEN_ESPERA_ACTIVA
+from transportes import crear_transporte
+
+# ===================== CONFIGURACIÓN INICIAL =====================
+TIPOS_TRAMA = ('RX_SERIAL', 'SERIAL_RX')  # Tipos de línea que contienen tramas recibidas
+TIPO_GRABACION = 'RX_SERIAL'              # Tipo con el que se graban las tramas nuevas
+BAUD_RATE = 9600
+INTERVALO_REPORTE = 5.0                   # Segundos entre reportes durante la reproducción
+
+LINEA_CAPTURA = re.compile(r'^(\S+) - (\w+): (.*)$')
+
+
+def parse_timestamp(texto):
+    """Convierte un timestamp ISO 8601 (con 'Z', como toISOString de JS) a segundos epoch"""
+    return datetime.fromisoformat(texto.replace('Z', '+00:00')).timestamp()
+
+
+def format_timestamp(segundos=None):
+    """Devuelve el timestamp en el mismo formato que toISOString de JS (UTC, milisegundos)"""
+    instante = datetime.now(timezone.utc) if segundos is None else datetime.fromtimestamp(segundos, timezone.utc)
+    return instante.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def leer_captura(ruta, tipos=TIPOS_TRAMA):
+    """Genera (timestamp, trama) de las líneas de la captura con alguno de los tipos indicados"""
+    with open(ruta, encoding='utf-8', errors='replace') as archivo:
+        for linea in archivo:
+            coincidencia = LINEA_CAPTURA.match(linea.rstrip('\r\n'))
+            if not coincidencia or coincidencia.group(2) not in tipos:
+                continue
+            try:
+                yield parse_timestamp(coincidencia.group(1)), coincidencia.group(3)
+            except ValueError:
+                continue  # Timestamp corrupto: se omite la línea
+
+
+def esperar_hasta(instante):
+    """Duerme hasta el instante (perf_counter) con una espera activa corta al final
+
+    La espera activa cede el GIL en cada vuelta (sleep(0)), como en planificador.py, para no
+    frenar a los hilos de la GUI y del transporte.
+    """
+    restante = instante - time.perf_counter()
+    if restante > MARGEN_ESPERA_ACTIVA:
+        time.sleep(restante - MARGEN_ESPERA_ACTIVA)
+    while time.perf_counter() < instante:
+        time.sleep(0)
+
+
+def reproducir(ruta, transporte, velocidad=1.0, tipos=TIPOS_TRAMA, max_pausa=None):
+    """Envía la captura al transporte escalando los tiempos entre tramas por la velocidad"""
+    enviadas = descartadas = 0
+    retraso_max = 0.0
+    inicio = time.perf_counter()
+    siguiente_reporte = inicio + INTERVALO_REPORTE
+    ts_anterior = None
+    tiempo_captura = 0.0  # Segundos de captura transcurridos (con huecos recortados)
+
+    for ts, trama in leer_captura(ruta, tipos):
+        if ts_anterior is not None:
+            hueco = max(0.0, ts - ts_anterior)
+            tiempo_captura += hueco if max_pausa is None else min(hueco, max_pausa)
+        ts_anterior = ts
+
+        # Instante de envío relativo al inicio de la captura (sin acumular deriva)
+        if velocidad > 0:
+            objetivo = inicio + tiempo_captura / velocidad
+            esperar_hasta(objetivo)
+            retraso_max = max(retraso_max, time.perf_counter() - objetivo)
+
+        if transporte.write((trama + "\n").encode()):
+            enviadas += 1
+        else:
+            descartadas += 1
+
+        if time.perf_counter() >= siguiente_reporte:
+            print(f"📈 enviadas={enviadas} descartadas={descartadas} "
+                  f"({enviadas / (time.perf_counter() - inicio):.1f} tramas/s)")
+            siguiente_reporte += INTERVALO_REPORTE
+
+    total = time.perf_counter() - inicio
+    print(f"✅ Reproducción terminada: {enviadas} tramas en {total:.2f} s "
+          f"({enviadas / total if total > 0 else 0:.1f} tramas/s), descartadas={descartadas}, "
+          f"retraso máx={retraso_max * 1000:.2f} ms")
+
+
+def grabar(puerto, ruta, baud_rate=BAUD_RATE, tipo=TIPO_GRABACION):
+    """Guarda cada línea recibida por el puerto serial con timestamp, hasta Ctrl+C"""
+    import serial
+    total = 0
+    with serial.Serial(puerto, baud_rate, timeout=1) as ser, \
+            open(ruta, 'a', encoding='utf-8', buffering=1) as archivo:
+        print(f"⏺️ Grabando {puerto} en {ruta}...")
+        while True:
+            linea = ser.readline()
+            if not linea:
+                continue
+            datos = linea.decode(errors='replace').strip()
+            if datos:
+                archivo.write(f"{format_timestamp()} - {tipo}: {datos}\n")
+                total += 1
+                if total % 100 == 0:
+                    print(f"📝 {total} tramas grabadas")
+
+
+# ===================== PUNTO DE ENTRADA =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grabación y reproducción de capturas seriales")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    rep = comandos.add_parser("reproducir", help="Envía una captura a un transporte")
+    rep.add_argument("archivo", help="Archivo de captura")
+    rep.add_argument("--destino", default="pty://", help="URL del transporte (ver transportes.py)")
+    rep.add_argument("--velocidad", type=float, default=1.0,
+                     help="Factor de velocidad (1 = original, 10 = 10x, 0 = lo más rápido posible)")
+    rep.add_argument("--max-pausa", type=float,
+                     help="Segundos máximos de hueco entre tramas (en tiempo de captura)")
+    rep.add_argument("--tipos", nargs="+", default=list(TIPOS_TRAMA), help="Tipos de línea a reproducir")
+    rep.add_argument("--esperar", type=float, default=0.0,
+                     help="Segundos de espera antes de empezar (para conectar el consumidor a un pty)")
+
+    gra = comandos.add_parser("grabar", help="Graba las tramas de un puerto serial")
+    gra.add_argument("puerto", help="Puerto serial de origen (COM4, /dev/pts/4)")
+    gra.add_argument("--archivo", default="received_serial_data.txt", help="Archivo de captura de salida")
+    gra.add_argument("--baud", type=int, default=BAUD_RATE, help="Velocidad en baudios")
+
+    args = parser.parse_args()
+    try:
+        if args.comando == "reproducir":
+            transporte = crear_transporte(args.destino)
+            print(f"▶️ Reproduciendo {args.archivo} en {transporte.nombre} (velocidad {args.velocidad:g}x)")
+            try:
+                time.sleep(args.esperar)
+                reproducir(args.archivo, transporte, args.velocidad, tuple(args.tipos), args.max_pausa)
+            finally:
+                transporte.close()
+        else:
+            grabar(args.puerto, args.archivo, args.baud)
+    except KeyboardInterrupt:
+        print("\nPrograma terminado.")
@@ -0,0 +1,160 @@
+"""
+Simulador de Flota de Arduinos (modo sin interfaz gráfica)
+
+Ejecuta N dispositivos virtuales desde un solo proceso, sin Tk. Cada dispositivo
+envía la misma trama CSV que EnhancedSensorUI (ver estadoDispositivo):
+sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
+
+Cada dispositivo escribe en su propio endpoint:
+- Un pseudo-terminal (pty) creado por el simulador (por defecto, solo Linux/macOS).
+  La ruta del extremo esclavo (/dev/pts/N) se imprime para configurar el consumidor
+  (SERIAL_PORT en el .env de nodeMQTT), sin necesidad de socat.
+- O un puerto serial existente indicado con --puertos.
+- O cualquier transporte de transportes.py indicado con --transporte (TCP, UDP,
+  MQTT, memoria). {n} en la URL se reemplaza por el número de dispositivo.
+
+Con --senales, temperatura, humedad, sónico, fotoresistencia y RFID evolucionan
+con los modelos de generadorSenales (requiere numpy) en lugar de quedar fijos.
+
+Uso:
+    python3 simuladorFlota.py --dispositivos 200 --hz 5
+    python3 simuladorFlota.py --dispositivos 1000 --hz 1 --senales
+    python3 simuladorFlota.py --puertos /dev/pts/3 /dev/pts/5 --hz 0.5
+    python3 simuladorFlota.py --dispositivos 500 --hz 100 --transporte udp://127.0.0.1:5000
+    python3 simuladorFlota.py --dispositivos 50 --transporte "mqtt://localhost:1883/flota/{n}"
+
+Autor: Amerike6oSemestre
+"""
+
+import argparse
+import time
+
+from estadoDispositivo import EstadoDispositivo
+from transportes import crear_transporte
+
+# ===================== CONFIGURACIÓN INICIAL =====================
+BAUD_RATE = 9600            # Velocidad en baudios (solo para puertos seriales reales)
+TRANSPORTE = "pty://"       # Transporte por defecto: un pty nuevo por dispositivo
+FRECUENCIA_HZ = 0.5         # Tramas por segundo por dispositivo (0.5 = cada 2 s, como la GUI)
+INTERVALO_REPORTE = 5.0     # Segundos entre reportes de tramas/s
+
+
+class FlotaSimulada:
+    """Maneja N dispositivos virtuales desde un solo hilo"""
+
+    def __init__(self, endpoints, frecuencia_hz=FRECUENCIA_HZ, generador=None):
+        self.endpoints = endpoints
+        # Una instantánea por dispositivo, con los mismos valores por defecto que la GUI
+        self.dispositivos = [EstadoDispositivo(rfid=f"ID{i + 1:04d}ABC") for i in range(len(endpoints))]
+        self.generador = generador  # GeneradorSenales opcional (un paso de NumPy por ronda)
+        if not frecuencia_hz > 0:
+            raise ValueError(f"La frecuencia debe ser mayor que 0 Hz (se recibió {frecuencia_hz})")
+        self.periodo = 1.0 / frecuencia_hz
+        self.running = False
+
+        # ========== MÉTRICAS ==========
+        self.tramas_enviadas = 0
+        self.tramas_descartadas = 0  # Endpoint ocupado (nadie leyendo del otro lado)
+
+    def enviar_ronda(self):
+        """Envía una trama por cada dispositivo de la flota"""
+        if self.generador is not None:
+            self.generador.paso(self.periodo)
+            tramas = [(trama + "\n").encode() for trama in self.generador.tramas()]
+        else:
+            tramas = [estado.datos for estado in self.dispositivos]  # Trama ya serializada
+
+        for datos, endpoint in zip(tramas, self.endpoints):
+            if endpoint.write(datos):
+                self.tramas_enviadas += 1
+            else:
+                self.tramas_descartadas += 1
+
+    def run(self, duracion=None):
+        """Bucle principal: una ronda por periodo y reporte periódico de tramas/s"""
+        self.running = True
+        inicio = time.monotonic()
+        siguiente_ronda = inicio
+        siguiente_reporte = inicio + INTERVALO_REPORTE
+        enviadas_reporte = 0
+
+        while self.running:
+            ahora = time.monotonic()
+            if duracion is not None and ahora - inicio >= duracion:
+                break
+
+            if ahora >= siguiente_ronda:
+                self.enviar_ronda()
+                siguiente_ronda += self.periodo
+
+            if ahora >= siguiente_reporte:
+                tasa = (self.tramas_enviadas - enviadas_reporte) / INTERVALO_REPORTE
+                print(f"📈 {tasa:.1f} tramas/s | enviadas={self.tramas_enviadas} "
+                      f"descartadas={self.tramas_descartadas}")
+                enviadas_reporte = self.tramas_enviadas
+                siguiente_reporte += INTERVALO_REPORTE
+
+            time.sleep(max(0.0, min(siguiente_ronda, siguiente_reporte) - time.monotonic()))
+
+        total = time.monotonic() - inicio
+        print(f"✅ Total: {self.tramas_enviadas} tramas en {total:.1f} s "
+              f"({self.tramas_enviadas / total:.1f} tramas/s), descartadas={self.tramas_descartadas}")
+
+    def stop(self):
+        """Detiene el bucle y cierra todos los endpoints"""
+        self.running = False
+        for endpoint in self.endpoints:
+            try:
+                endpoint.close()
+            except OSError:
+                pass
+
+
+def crear_endpoints(args):
+    """Crea un transporte no bloqueante por dispositivo: puertos indicados o la URL de --transporte"""
+    if args.puertos:
+        return [crear_transporte(puerto, BAUD_RATE, bloqueante=False) for puerto in args.puertos]
+    return [
+        crear_transporte(args.transporte.replace("{n}", str(i)), BAUD_RATE, bloqueante=False)
+        for i in range(1, args.dispositivos + 1)
+    ]
+
+
+def frecuencia_positiva(texto):
+    """Tipo de argparse para --hz: un número mayor que 0"""
+    try:
+        hz = float(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un número")
+    if not hz > 0:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que 0 (se recibió {texto})")
+    return hz
+
+
+# ===================== PUNTO DE ENTRADA =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de flota de Arduinos sin interfaz gráfica")
+    parser.add_argument("--dispositivos", type=int, default=10, help="Número de dispositivos (ptys) a crear")
+    parser.add_argument("--puertos", nargs="+", help="Puertos seriales existentes (uno por dispositivo)")
+    parser.add_argument("--transporte", default=TRANSPORTE, help="URL del transporte (ver transportes.py)")
+    parser.add_argument("--hz", type=frecuencia_positiva, default=FRECUENCIA_HZ, help="Tramas por segundo por dispositivo")
+    parser.add_argument("--senales", action="store_true", help="Usar señales simuladas (generadorSenales)")
+    parser.add_argument("--duracion", type=float, help="Segundos de ejecución (por defecto, hasta Ctrl+C)")
+    args = parser.parse_args()
+
+    endpoints = crear_endpoints(args)
+    for i, endpoint in enumerate(endpoints, start=1):
+        print(f"🔌 Dispositivo {i}: {endpoint.nombre}")
+
+    generador = None
+    if args.senales:
+        from generadorSenales import GeneradorSenales
+        generador = GeneradorSenales(len(endpoints))
+
+    flota = FlotaSimulada(endpoints, args.hz, generador)
+    try:
+        flota.run(args.duracion)
+    except KeyboardInterrupt:
+        print("\nPrograma terminado.")
+    finally:
+        flota.stop()
@@ -11,25 +11,53 @@ Este programa permite controlar y monitorear diversos sensores y actuadores IoT:
 - Buzzer
 - RFID
 
-Los datos se envían cada 2 segundos por puerto serial en formato CSV:
+Los datos se envían periódicamente (cada 2 segundos por defecto, configurable hasta
+el rango de milisegundos) por puerto serial, o por otro transporte (TCP, UDP, MQTT,
+memoria; ver transportes.py), en formato CSV:
 sonico,fotoresistencia,temperatura,humedad,led_ultra,leds_binario,buzzer,rfid
 
+Como el firmware real, envía una trama en cada periodo. Con REPORTE_POR_EXCEPCION
+(opcional) la trama solo se envía si algún sensor cambió más que su banda muerta o si
+pasó LATIDO_S sin enviar (ver pythonMTU/filtroBanda.py); normalmente ese filtro lo
+aplica el puente (puenteSerialMqtt.py), no el emulador.
+
 Autor: Amerike6oSemestre
 Versión: 1.0
 Fecha: 28 Mayo de 2025
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import serial
+from tkinter import ttk, messagebox, filedialog
+import os
+import sys
 import threading
-import queue
 import time
 
+from colaConsola import ColaConsola
+from consolaAnillo import ConsolaAnillo
+from estadoDispositivo import EstadoDispositivo
+from planificador import PlanificadorPeriodico
+from transportes import crear_transporte
+
+# filtroBanda vive en pythonMTU y solo se necesita con REPORTE_POR_EXCEPCION
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pythonMTU'))
+try:
+    from filtroBanda import FiltroBanda
+except ModuleNotFoundError:
+    FiltroBanda = None
+
 # ===================== CONFIGURACIÓN INICIAL =====================
 # Configuración del puerto serial (ajustar según necesidad)
-SERIAL_PORT = 'COM1'    # Puerto serial de salida de datos
+SERIAL_PORT = 'COM1'    # Puerto serial de salida de datos (o URL: tcp://, udp://, mqtt://, mem://)
 BAUD_RATE = 9600        # Velocidad en baudios
+RETENCION_CONSOLA = 100000 # Líneas retenidas por consola (historial exportable)
+LINEAS_VISIBLES = 200   # Líneas renderizadas en cada consola
+INTERVALO_UI_MS = 100   # Milisegundos entre cuadros de actualización de la UI
+PERIODO_ENVIO_MS = 2000 # Periodo de envío en milisegundos (1 ms = 1000 Hz)
+INTERVALO_METRICAS = 1.0 # Segundos entre actualizaciones de métricas en la barra de estado
+REPORTE_POR_EXCEPCION = False # True omite tramas sin cambios (el puente ya filtra por banda)
+BANDA_MUERTA = {'TEMP': 0.1, 'HUM': 0.5} # Cambio mínimo por sensor; los demás, cualquier cambio
+LATIDO_S = 30.0         # Segundos máximos sin enviar aunque nada cambie
 
 class EnhancedSensorUI:
     """Clase principal que maneja la interfaz gráfica y la lógica de control"""
@@ -54,6 +82,20 @@ class EnhancedSensorUI:
         self.buzzer = tk.IntVar(value=0)          # Buzzer apagado
         self.rfid = tk.StringVar(value="ID0001ABC") # ID RFID de ejemplo
         self.sending_active = True                 # Control para el envío de datos
+        self.periodo_ms = tk.DoubleVar(value=PERIODO_ENVIO_MS) # Periodo de envío
+        self.planificador = PlanificadorPeriodico(PERIODO_ENVIO_MS / 1000.0)
+        if REPORTE_POR_EXCEPCION and FiltroBanda is None:
+            raise ImportError("REPORTE_POR_EXCEPCION requiere proyectoDemoday/pythonMTU/filtroBanda.py")
+        self.filtro = FiltroBanda(BANDA_MUERTA, LATIDO_S) if REPORTE_POR_EXCEPCION else None
+        self.descartadas = 0  # Tramas que el transporte no aceptó (buffer lleno, sin conexión)
+        
+        # ========== INSTANTÁNEA DEL ESTADO ==========
+        # El hilo de envío solo lee self.estado; se reconstruye en el hilo principal
+        # cada vez que cambia un control (trace de las variables Tk)
+        self.estado = self.build_estado()
+        for var in [self.sonico, self.fotoresistencia, self.temperatura, self.humedad,
+                    self.led_ultra, self.buzzer, self.rfid] + self.leds:
+            var.trace_add('write', self.on_control_change)
         
         # ========== CONFIGURACIÓN DE LA INTERFAZ ==========
         self.setup_main_frames()       # Frames principales
@@ -63,22 +105,24 @@ class EnhancedSensorUI:
         self.setup_status_bar()        # Barra de estado
         
         # ========== SISTEMA DE COLAS ==========
-        self.data_queue = queue.Queue()    # Para datos serial
-        self.update_queue = queue.Queue(maxsize=10) # Para actualizaciones de UI
+        # Colas coalescentes: el hilo de envío nunca se bloquea esperando a la UI
+        self.data_lines = ColaConsola()    # Para la consola de datos
+        self.event_lines = ColaConsola()   # Para la consola de eventos
+        self.status_pendiente = None       # Último mensaje de estado (gana el más reciente)
         
         # ========== INICIO DE SERVICIOS ==========
         try:
-            self.serial_port = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
+            self.transporte = crear_transporte(SERIAL_PORT, BAUD_RATE)
             self.running = True
             self.start_services()  # Inicia el hilo de envío de datos
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo abrir el puerto serial:\n{str(e)}")
+            messagebox.showerror("Error", f"No se pudo abrir el transporte {SERIAL_PORT}:\n{str(e)}")
             self.root.destroy()
             return
         
         # ========== CONFIGURACIÓN ADICIONAL ==========
         self.setup_tooltips()      # Tooltips para controles
-        self.root.after(100, self.process_updates) # Inicia el procesamiento de actualizaciones
+        self.root.after(INTERVALO_UI_MS, self.process_updates) # Inicia el procesamiento de actualizaciones
 
     # ===================== MÉTODOS DE CONFIGURACIÓN =====================
     
@@ -239,6 +283,20 @@ class EnhancedSensorUI:
             style='TButton'
         )
         self.stop_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Periodo de envío en milisegundos (Spinbox)
+        ttk.Label(self.control_frame, text="Periodo (ms):").pack(side=tk.LEFT, padx=5)
+        self.periodo_spin = ttk.Spinbox(
+            self.control_frame,
+            from_=1,
+            to=10000,
+            increment=1,
+            textvariable=self.periodo_ms,
+            width=8,
+            command=self.update_periodo
+        )
+        self.periodo_spin.bind("<Return>", lambda e: self.update_periodo())
+        self.periodo_spin.pack(side=tk.LEFT)
     
     def setup_console_system(self):
         """Configura el sistema de consolas divididas"""
@@ -249,30 +307,42 @@ class EnhancedSensorUI:
         data_console_frame = ttk.LabelFrame(console_frame, text="Datos Enviados", padding=5)
         data_console_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
-        self.data_console = scrolledtext.ScrolledText(
+        self.data_console = ConsolaAnillo(
             data_console_frame,
+            retencion=RETENCION_CONSOLA,
+            lineas_visibles=LINEAS_VISIBLES,
             height=5,
-            state=tk.DISABLED,
             bg='white',
             fg='black',
             font=('Consolas', 9),
             insertbackground='black'
         )
+        ttk.Button(
+            data_console_frame,
+            text="Exportar historial",
+            command=lambda: self.export_console(self.data_console, "datos")
+        ).pack(side=tk.BOTTOM, anchor=tk.E)
         self.data_console.pack(fill=tk.BOTH, expand=True)
         
         # Consola inferior: Muestra los eventos del sistema
         event_console_frame = ttk.LabelFrame(console_frame, text="Eventos del Sistema", padding=5)
         event_console_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
-        self.event_console = scrolledtext.ScrolledText(
+        self.event_console = ConsolaAnillo(
             event_console_frame,
+            retencion=RETENCION_CONSOLA,
+            lineas_visibles=LINEAS_VISIBLES,
             height=5,
-            state=tk.DISABLED,
             bg='white',
             fg='black',
             font=('Consolas', 9),
             insertbackground='black'
         )
+        ttk.Button(
+            event_console_frame,
+            text="Exportar historial",
+            command=lambda: self.export_console(self.event_console, "eventos")
+        ).pack(side=tk.BOTTOM, anchor=tk.E)
         self.event_console.pack(fill=tk.BOTH, expand=True)
     
     def setup_status_bar(self):
@@ -286,6 +356,16 @@ class EnhancedSensorUI:
             style='Status.TLabel'
         )
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Contador visible de líneas omitidas por sobrecarga de la UI
+        self.omitidas = 0
+        self.omitidas_var = tk.StringVar(value="Líneas omitidas: 0")
+        omitidas_label = ttk.Label(
+            status_bar,
+            textvariable=self.omitidas_var,
+            style='Status.TLabel'
+        )
+        omitidas_label.pack(side=tk.RIGHT, padx=5)
     
     def setup_tooltips(self):
         """Configura los tooltips para los controles"""
@@ -296,6 +376,7 @@ class EnhancedSensorUI:
         self.create_tooltip(self.rfid_entry, "Ingrese el código RFID (máx. 10 caracteres alfanuméricos)")
         self.create_tooltip(self.led_canvas, "Estado del LED Ultra Brillante (controlado por fotoresistencia)")
         self.create_tooltip(self.buzzer_btn, "Activa/desactiva el buzzer")
+        self.create_tooltip(self.periodo_spin, "Periodo de envío en milisegundos (1 a 10000 ms)")
     
     # ===================== MÉTODOS DE FUNCIONALIDAD =====================
     
@@ -328,10 +409,10 @@ class EnhancedSensorUI:
             self.tooltip.destroy()
     
     def start_services(self):
-        """Inicia los servicios en segundo plano (hilo de envío serial)"""
+        """Inicia los servicios en segundo plano (hilo de envío)"""
         self.serial_thread = threading.Thread(target=self.send_data_loop, daemon=True)
         self.serial_thread.start()
-        self.update_status("Servicios iniciados - Conectado a COM2")
+        self.update_status(f"Servicios iniciados - Conectado a {self.transporte.nombre}")
     
     def stop_led(self):
         """Detiene el LED ultra brillante manualmente"""
@@ -370,6 +451,19 @@ class EnhancedSensorUI:
         self.led_canvas.itemconfig(self.led_indicator, fill=color)
         self.led_status.config(text=text)
     
+    def update_periodo(self):
+        """Aplica el nuevo periodo de envío al planificador"""
+        try:
+            periodo_ms = float(self.periodo_ms.get())
+        except (tk.TclError, ValueError):
+            self.show_error("Periodo inválido", "Ingrese un número de milisegundos")
+            return
+        if not 1 <= periodo_ms <= 10000:
+            self.show_error("Periodo fuera de rango", "El periodo debe estar entre 1 y 10000 ms")
+            return
+        self.planificador.cambiar_periodo(periodo_ms / 1000.0)
+        self.log_action(f"Periodo de envío ajustado a {periodo_ms:g} ms ({1000.0 / periodo_ms:.1f} Hz)")
+    
     def validate_rfid(self, new_value):
         """Valida que el RFID ingresado sea válido (alfanumérico y <= 10 caracteres)"""
         if len(new_value) > 10:
@@ -388,59 +482,114 @@ class EnhancedSensorUI:
         self.update_event_console(f"[{timestamp}] {message}")
     
     def update_event_console(self, message):
-        """Agrega un mensaje a la cola para actualizar la consola de eventos"""
-        self.update_queue.put(lambda: self._update_event_console(message))
-    
-    def _update_event_console(self, message):
-        """Actualiza la consola de eventos (ejecutado en el hilo principal)"""
-        self.event_console.config(state=tk.NORMAL)
-        self.event_console.insert(tk.END, message + "\n")
-        self.event_console.see(tk.END)
-        self.event_console.config(state=tk.DISABLED)
+        """Agrega un mensaje a la cola de la consola de eventos (no bloquea)"""
+        self.event_lines.agregar(message)
     
     def update_data_console(self, message):
-        """Agrega un mensaje a la cola para actualizar la consola de datos"""
-        self.update_queue.put(lambda: self._update_data_console(message))
+        """Agrega un mensaje a la cola de la consola de datos (no bloquea)"""
+        self.data_lines.agregar(message)
     
-    def _update_data_console(self, message):
-        """Actualiza la consola de datos (ejecutado en el hilo principal)"""
-        self.data_console.config(state=tk.NORMAL)
-        self.data_console.insert(tk.END, message + "\n")
-        self.data_console.see(tk.END)
-        self.data_console.config(state=tk.DISABLED)
+    def _flush_console(self, consola, cola):
+        """Agrega todas las líneas pendientes con un solo insert (ejecutado en el hilo principal)"""
+        lineas, omitidas = cola.drenar()
+        if omitidas:
+            lineas.insert(0, f"... {omitidas} líneas omitidas por sobrecarga ...")
+            self.omitidas += omitidas
+        consola.agregar_lineas(lineas)
+    
+    def export_console(self, consola, nombre):
+        """Exporta el historial completo de una consola a un archivo de texto"""
+        ruta = filedialog.asksaveasfilename(
+            title=f"Exportar consola de {nombre}",
+            defaultextension=".txt",
+            initialfile=f"consola_{nombre}_{time.strftime('%Y%m%d_%H%M%S')}.txt",
+            filetypes=[("Texto", "*.txt"), ("Todos", "*.*")]
+        )
+        if not ruta:
+            return
+        try:
+            total = consola.exportar(ruta)
+        except OSError as e:
+            self.show_error("Error al exportar", str(e))
+            return
+        self.log_action(f"Consola de {nombre} exportada: {total} líneas en {ruta}")
     
     def update_status(self, message):
-        """Actualiza el mensaje en la barra de estado"""
-        self.status_var.set(message)
+        """Actualiza el mensaje en la barra de estado (se aplica en el siguiente cuadro de la UI)"""
+        self.status_pendiente = message
         self.log_action(f"Estado: {message}")
     
-    def generate_data_string(self):
-        """Genera la cadena de datos en formato CSV para enviar por serial"""
-        return (
-            f"{self.sonico.get()},{self.fotoresistencia.get()},"
-            f"{self.temperatura.get():.2f},{self.humedad.get():.2f},"
-            f"{self.led_ultra.get()},{self.get_leds_binary()},"
-            f"{self.buzzer.get()},{self.rfid.get()}"
+    def build_estado(self):
+        """Crea una instantánea inmutable a partir de las variables Tk (hilo principal)"""
+        return EstadoDispositivo(
+            sonico=self.sonico.get(),
+            fotoresistencia=self.fotoresistencia.get(),
+            temperatura=self.temperatura.get(),
+            humedad=self.humedad.get(),
+            led_ultra=self.led_ultra.get(),
+            leds=[led.get() for led in self.leds],
+            buzzer=self.buzzer.get(),
+            rfid=self.rfid.get()
         )
     
+    def on_control_change(self, *args):
+        """Reconstruye la instantánea cuando cambia un control (ejecutado en el hilo principal)"""
+        try:
+            self.estado = self.build_estado()  # Reemplazo atómico de la referencia
+        except (tk.TclError, ValueError):
+            pass  # Valor incompleto en un Spinbox (ej. "22."); se conserva la instantánea anterior
+    
+    def generate_data_string(self):
+        """Devuelve la cadena de datos en formato CSV de la instantánea actual (sin llamadas a Tk)"""
+        return self.estado.trama
+    
     def get_leds_binary(self):
-        """Devuelve el estado de los 10 LEDs como cadena binaria"""
-        return ''.join([str(led.get()) for led in self.leds])
+        """Devuelve el estado de los 10 LEDs como cadena binaria (sin llamadas a Tk)"""
+        return self.estado.leds_binario
     
     def send_data_loop(self):
-        """Bucle principal para enviar datos periódicamente por puerto serial"""
-        while True:
+        """Bucle principal para enviar datos periódicamente por el transporte"""
+        self.planificador.iniciar()
+        siguiente_metrica = time.monotonic() + INTERVALO_METRICAS
+        while self.running:
             if self.sending_active:
                 try:
-                    data = self.generate_data_string()
-                    self.serial_port.write((data + "\n").encode())
-                    self.update_data_console(data)
-                    self.update_status(f"Datos enviados a {SERIAL_PORT}")
+                    estado = self.estado  # Una sola lectura de la referencia por envío
+                    # El filtro solo anota la trama si el transporte la aceptó; si no, se
+                    # cuenta como descartada y se vuelve a evaluar en el siguiente periodo
+                    if self.filtro is None or self.filtro.debe_publicar_lecturas('trama', estado.lecturas,
+                                                                                 registrar=False):
+                        if self.transporte.write(estado.datos):
+                            if self.filtro is not None:
+                                self.filtro.registrar('trama', estado.lecturas)
+                            self.update_data_console(estado.trama)
+                        else:
+                            self.descartadas += 1
                 except Exception as e:
-                    self.update_status(f"Error serial: {str(e)}")
+                    self.update_status(f"Error de transporte: {str(e)}")
                     break
             
-            time.sleep(2)  # Espera 2 segundos entre envíos
+            # Métricas de temporización en la barra de estado (no en cada envío)
+            if time.monotonic() >= siguiente_metrica:
+                self.update_status(self.format_metricas())
+                siguiente_metrica += INTERVALO_METRICAS
+            
+            # Espera hasta el siguiente deadline absoluto (sin deriva)
+            if not self.planificador.esperar():
+                break
+    
+    def format_metricas(self):
+        """Devuelve las métricas del planificador como texto para la barra de estado"""
+        m = self.planificador.metricas()
+        texto = (
+            f"Enviando a {self.transporte.nombre} | {m['tasa_hz']:.1f}/{m['tasa_objetivo_hz']:.1f} Hz | "
+            f"jitter {m['jitter_medio'] * 1000:.2f}±{m['jitter_desviacion'] * 1000:.2f} ms "
+            f"(máx {m['jitter_max'] * 1000:.2f}) | perdidos {m['perdidos']} | descartadas {self.descartadas}"
+        )
+        if self.filtro is not None:
+            f = self.filtro.metricas()
+            texto += f" | suprimidas {f['suprimidos']}/{f['evaluados']} ({f['reduccion'] * 100:.0f}%)"
+        return texto
     
     def toggle_sending(self):
         """Alterna el estado de envío de datos (activado/desactivado)"""
@@ -456,24 +605,25 @@ class EnhancedSensorUI:
         self.log_action(f"Envio de datos {'ACTIVADO' if self.sending_active else 'DESACTIVADO'}")
     
     def process_updates(self):
-        """Procesa las actualizaciones pendientes en la cola (ejecutado en el hilo principal)"""
-        try:
-            while not self.update_queue.empty():
-                update_fn = self.update_queue.get_nowait()
-                update_fn()
-        except queue.Empty:
-            pass
+        """Aplica en un solo cuadro todas las actualizaciones pendientes (ejecutado en el hilo principal)"""
+        self._flush_console(self.data_console, self.data_lines)
+        self._flush_console(self.event_console, self.event_lines)
+        
+        status, self.status_pendiente = self.status_pendiente, None
+        if status is not None:
+            self.status_var.set(status)
+        self.omitidas_var.set(f"Líneas omitidas: {self.omitidas}")
         
-        self.root.after(100, self.process_updates)  # Programa la próxima verificación
+        self.root.after(INTERVALO_UI_MS, self.process_updates)  # Programa el próximo cuadro
     
     def stop(self):
         """Detiene la aplicación de forma segura, cerrando recursos"""
         self.running = False
+        self.planificador.detener()  # Despierta al hilo de envío
         self.update_status("Deteniendo servicios...")
         
         try:
-            if self.serial_port.is_open:
-                self.serial_port.close()
+            self.transporte.close()
         except:
             pass
         
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Los módulos del repositorio se importan por nombre desde sus carpetas, como en los scripts
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for carpeta in (('proyectoDemoday', 'pythonMTU'), ('proyectoDemoday', 'simuladorArduino'),
+                ('SegundoParcial', 'Python')):
+    ruta = os.path.join(RAIZ, *carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from brokerLocal import BrokerLocal
+from clienteAsync import ClienteAsync
+
+
+@pytest.fixture(scope='module')
+def broker():
+    broker = BrokerLocal(host='127.0.0.1', puerto=0, usuarios=None).iniciar_en_hilo()
+    yield broker
+    broker.detener()
+
+
+def test_publicar_y_recibir(broker):
+    async def prueba():
+        cliente = await ClienteAsync('127.0.0.1', broker.puerto, qos=1).conectar()
+        suscripcion = cliente.suscribir('prueba/#')
+        await asyncio.sleep(0.1)
+        latencia = await cliente.publicar_confirmado('prueba/temp', 'TEMP:24.50')
+        msg = await asyncio.wait_for(suscripcion.recibir(), 2)
+        await cliente.desconectar()
+        return latencia, msg
+
+    latencia, msg = asyncio.run(prueba())
+    assert latencia > 0
+    assert (msg.topic, msg.payload) == ('prueba/temp', b'TEMP:24.50')
+
+
+def test_desconexion_libera_qos0_y_cuenta_perdidos(broker):
+    async def prueba():
+        cliente = await ClienteAsync('127.0.0.1', broker.puerto, en_vuelo=2).conectar()
+        # Dos mensajes que paho no alcanzó a escribir: uno QoS 0 con futuro y otro QoS 1
+        for mid, qos in ((1001, 0), (1002, 1)):
+            await cliente._ventana.acquire()
+            cliente._pendientes[mid] = (time.perf_counter(), cliente.loop.create_future(), qos)
+        futuro_qos0 = cliente._pendientes[1001][1]
+        cliente._on_disconnect(cliente.client, None, 1)
+        with pytest.raises(ConnectionError):
+            await futuro_qos0
+        # Se liberó el lugar del QoS 0: cabe otra publicación sin esperar
+        await asyncio.wait_for(cliente._ventana.acquire(), 0.5)
+        cliente._ventana.release()
+        resultado = (cliente.perdidos, list(cliente._pendientes), cliente.metricas()['perdidos'])
+        cliente._pendientes.clear()
+        await cliente.desconectar()
+        return resultado
+
+    assert asyncio.run(prueba()) == (1, [1002], 1)
+
+
+def test_topic_invalido_no_consume_la_ventana(broker):
+    async def prueba():
+        cliente = await ClienteAsync('127.0.0.1', broker.puerto, en_vuelo=1).conectar()
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(cliente.publicar('prueba/#', 'x'), 0.5)
+        await asyncio.wait_for(cliente.publicar_confirmado('prueba/ok', 'x'), 2)
+        await cliente.desconectar()
+        return cliente.publicados
+
+    assert asyncio.run(prueba()) == 1
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_QUEUE_SIZE, MQTT_ERR_SUCCESS
+
+from colaPersistente import ColaPersistente, DrenadorCola, importar_offline, nombre_segmento
+
+
+def mensajes(registros):
+    return [mensaje for _, _, mensaje in registros]
+
+
+def test_conserva_lo_no_confirmado_al_reabrir(tmp_path):
+    cola = ColaPersistente(str(tmp_path))
+    for i in range(5):
+        cola.agregar('t', f'm{i}')
+    registros = cola.leer(2)
+    cola.confirmar(registros[-1][0], len(registros))
+    cola.cerrar()
+
+    cola = ColaPersistente(str(tmp_path))
+    assert cola.pendientes == 3
+    assert mensajes(cola.leer(10)) == ['m2', 'm3', 'm4']
+
+
+def test_descarta_registro_cortado_al_final(tmp_path):
+    cola = ColaPersistente(str(tmp_path))
+    cola.agregar('t', 'completo')
+    cola.agregar('t', 'cortado')
+    cola.cerrar()
+    ruta = tmp_path / nombre_segmento(0)
+    ruta.write_bytes(ruta.read_bytes()[:-3])
+
+    cola = ColaPersistente(str(tmp_path))
+    assert cola.pendientes == 1
+    assert mensajes(cola.leer(10)) == ['completo']
+
+
+def test_borra_segmentos_confirmados(tmp_path):
+    cola = ColaPersistente(str(tmp_path), tamano_segmento=64)
+    for i in range(20):
+        cola.agregar('topic', f'mensaje {i}')
+    assert len(cola.segmentos()) > 1
+    registros = cola.leer(20)
+    cola.confirmar(registros[-1][0], len(registros))
+    assert cola.segmentos() == [cola.activo]
+    assert cola.pendientes == 0
+
+
+def test_rebobinar_a_una_posicion(tmp_path):
+    cola = ColaPersistente(str(tmp_path))
+    for i in range(4):
+        cola.agregar('t', f'm{i}')
+    registros = cola.leer(4)
+    cola.rebobinar(registros[1][0])
+    assert mensajes(cola.leer(10)) == ['m2', 'm3']
+    cola.rebobinar()
+    assert mensajes(cola.leer(10)) == ['m0', 'm1', 'm2', 'm3']
+
+
+class ClienteFalso:
+    """publish() devuelve los rc indicados en orden; los mensajes quedan sin PUBACK"""
+
+    def __init__(self, codigos):
+        self.codigos = list(codigos)
+        self.enviados = []
+        self.conectado = True
+
+    def is_connected(self):
+        return self.conectado
+
+    def publish(self, topic, mensaje, qos):
+        rc = self.codigos.pop(0) if self.codigos else MQTT_ERR_SUCCESS
+        info = SimpleNamespace(rc=rc, publicado=False)
+        info.is_published = lambda: info.publicado
+        self.enviados.append((mensaje, info))
+        return info
+
+
+def cola_con(tmp_path, cantidad):
+    cola = ColaPersistente(str(tmp_path))
+    for i in range(cantidad):
+        cola.agregar('t', f'm{i}')
+    return cola
+
+
+def test_drenador_no_reenvia_lo_que_paho_acepto(tmp_path):
+    cola = cola_con(tmp_path, 5)
+    cliente = ClienteFalso([MQTT_ERR_SUCCESS, MQTT_ERR_QUEUE_SIZE])
+    drenador = DrenadorCola(cola, cliente, tasa=10)
+    drenador.paso(1)
+    drenador.paso(1)
+    assert [m for m, _ in cliente.enviados] == ['m0', 'm1', 'm1', 'm2', 'm3', 'm4']
+
+
+def test_drenador_mantiene_en_vuelo_el_qos1_sin_conexion(tmp_path):
+    cola = cola_con(tmp_path, 3)
+    cliente = ClienteFalso([MQTT_ERR_SUCCESS, MQTT_ERR_NO_CONN])
+    drenador = DrenadorCola(cola, cliente, tasa=10)
+    drenador.paso(1)
+    drenador.paso(1)
+    # paho guardó m1 y lo reenviará al reconectar: el drenador no lo vuelve a publicar
+    assert [m for m, _ in cliente.enviados] == ['m0', 'm1', 'm2']
+
+
+def test_drenador_confirma_en_orden(tmp_path):
+    cola = cola_con(tmp_path, 3)
+    cliente = ClienteFalso([])
+    drenador = DrenadorCola(cola, cliente, tasa=10)
+    drenador.paso(1)
+    cliente.enviados[1][1].publicado = True
+    drenador.paso(1)
+    assert cola.confirmados == 0  # m0 sigue sin PUBACK
+    cliente.enviados[0][1].publicado = True
+    drenador.paso(1)
+    assert cola.confirmados == 2
+    assert drenador.drenados == 2
+
+
+def test_importar_offline_acepta_ambos_formatos(tmp_path):
+    cola = ColaPersistente(str(tmp_path / 'cola'))
+    publisher = tmp_path / 'offline_20250101_120000.txt'
+    publisher.write_text("TEMP:24.5 -> amerike/sensor/temp\nbasura\n", encoding='utf-8')
+    puente = tmp_path / 'offline_1700000000000.txt'
+    puente.write_text("2025-01-01T00:00:00.000Z | HUM:45 → amerikeCDMX/P1/hum\n", encoding='utf-8')
+    assert importar_offline(cola, str(publisher)) == 1
+    assert importar_offline(cola, str(puente)) == 1
+    assert [(topic, mensaje) for _, topic, mensaje in cola.leer(10)] == [
+        ('amerike/sensor/temp', 'TEMP:24.5'), ('amerikeCDMX/P1/hum', 'HUM:45')]
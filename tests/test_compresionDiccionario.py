@@ -0,0 +1,62 @@
+import struct
+
+import pytest
+
+import compresionDiccionario as cd
+
+MUESTRAS = [f'{{"t":1700000000000,"d":{{"amerikeCDMX/P1/temp":[[0,"TEMP:2{i % 10}.50"]],'
+            f'"amerikeCDMX/P1/hum":[[0,"HUM:4{i % 7}.00"]]}}}}'.encode() for i in range(200)]
+
+
+@pytest.fixture
+def compresor(tmp_path):
+    return cd.entrenar(MUESTRAS, cd.ZLIB, tamano=2048, directorio=str(tmp_path))
+
+
+def test_ida_y_vuelta_con_diccionario(compresor, tmp_path):
+    payload = compresor.comprimir(MUESTRAS[3])
+    assert cd.es_comprimido(payload)
+    assert cd.descomprimir(payload, str(tmp_path)) == MUESTRAS[3]
+
+
+def test_diccionario_mejora_la_razon(compresor):
+    sin = cd.Compresor()
+    assert len(compresor.comprimir(MUESTRAS[5])) < len(sin.comprimir(MUESTRAS[5]))
+
+
+def test_versiones_se_incrementan(compresor, tmp_path):
+    siguiente = cd.entrenar(MUESTRAS, cd.ZLIB, tamano=2048, directorio=str(tmp_path))
+    assert siguiente.version == compresor.version + 1
+    assert cd.versiones(cd.ZLIB, str(tmp_path)) == [1, 2]
+
+
+def test_version_desconocida_es_valueerror(compresor, tmp_path):
+    payload = struct.pack('<BBH', cd.MAGICO, cd.ZLIB, 99) + b'x'
+    with pytest.raises(ValueError):
+        cd.descomprimir(payload, str(tmp_path))
+
+
+def test_algoritmo_desconocido_es_valueerror(tmp_path):
+    with pytest.raises(ValueError):
+        cd.descomprimir(struct.pack('<BBH', cd.MAGICO, 9, 0) + b'x', str(tmp_path))
+
+
+def test_limite_de_descompresion(tmp_path):
+    bomba = cd.Compresor().comprimir(b' ' * (cd.MAXIMO_DESCOMPRIMIDO + 1))
+    with pytest.raises(ValueError):
+        cd.descomprimir(bomba, str(tmp_path))
+    justo = cd.Compresor().comprimir(b' ' * cd.MAXIMO_DESCOMPRIMIDO)
+    assert len(cd.descomprimir(justo, str(tmp_path))) == cd.MAXIMO_DESCOMPRIMIDO
+
+
+def test_datos_corruptos(tmp_path):
+    with pytest.raises(cd.ERRORES):
+        cd.descomprimir(struct.pack('<BBH', cd.MAGICO, cd.ZLIB, 0) + b'\xff\xff\xff', str(tmp_path))
+
+
+def test_archivo_sin_limite(tmp_path):
+    ruta = tmp_path / 'log.txt'
+    ruta.write_bytes(b'linea de log\n' * 200000)
+    antes, despues = cd.comprimir_archivo(str(ruta), cd.Compresor())
+    assert antes > cd.MAXIMO_DESCOMPRIMIDO > despues
+    assert cd.descomprimir_archivo(str(ruta) + '.zd') == ruta.read_bytes()
@@ -0,0 +1,47 @@
+from DecodificadorTramas import DecodificadorTramas, texto_trama
+
+TRAMA = b"0,1,22.50,45.00,0,1000000000,0,ID0001ABC"
+
+
+def textos(tramas):
+    resultado = [texto_trama(t) for t in tramas]
+    for t in tramas:
+        t.release()
+    return resultado
+
+
+def test_trama_partida_entre_bloques():
+    d = DecodificadorTramas()
+    assert textos(d.alimentar(TRAMA[:10])) == []
+    assert textos(d.alimentar(TRAMA[10:] + b"\r\n" + TRAMA + b"\n")) == [TRAMA.decode()] * 2
+    assert d.tramas_validas == 2
+
+
+def test_descarta_malformadas_y_lineas_vacias():
+    d = DecodificadorTramas()
+    assert textos(d.alimentar(b"basura\n\n\r\n" + TRAMA + b"\n")) == [TRAMA.decode()]
+    assert d.tramas_malformadas == 1
+    assert d.bytes_descartados == len(b"basura\n")
+
+
+def test_resincroniza_tras_linea_demasiado_larga():
+    d = DecodificadorTramas(longitud_maxima=64)
+    assert textos(d.alimentar(b"x" * 100)) == []
+    assert textos(d.alimentar(b"y" * 10 + b"\n" + TRAMA + b"\n")) == [TRAMA.decode()]
+    assert d.resincronizaciones == 1
+    assert d.tramas_malformadas == 1
+
+
+def test_reutiliza_el_buffer_si_se_liberan_las_vistas():
+    d = DecodificadorTramas()
+    textos(d.alimentar(TRAMA + b"\n"))
+    buffer = d.buffer
+    textos(d.alimentar(TRAMA + b"\n"))
+    assert d.buffer is buffer
+
+
+def test_vistas_conservadas_siguen_validas():
+    d = DecodificadorTramas()
+    primera = d.alimentar(TRAMA + b"\n")
+    d.alimentar(b"1,0,20.00,40.00,1,0000000001,1,ABC\n")
+    assert texto_trama(primera[0]) == TRAMA.decode()
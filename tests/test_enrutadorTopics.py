@@ -0,0 +1,41 @@
+import json
+
+from enrutadorTopics import EnrutadorTopics, TablaTopics
+
+
+def test_topics_por_tipo():
+    e = EnrutadorTopics('amerikeCDMX', 'P1')
+    assert e.topic('TEMP:24.5') == 'amerikeCDMX/P1/temp'
+    assert e.topic('HUM:60') == 'amerikeCDMX/P1/hum'
+    assert e.topic('LUZ:1') == 'amerikeCDMX/P1/otros'
+    assert e.topic('sin separador') == 'amerikeCDMX/P1/otros'
+
+
+def test_rfid_autorizado_y_denegado():
+    e = EnrutadorTopics('amerikeCDMX', 'P1')
+    assert e.topic('RFID:12345') == 'amerikeCDMX/P1/rfid'
+    assert e.topic('RFID:99999') == 'amerikeCDMX/P1/rfid/denegado'
+    assert EnrutadorTopics(autorizados=None).topic('RFID:99999').endswith('/rfid')
+
+
+def test_valores_variados_no_se_acumulan():
+    e = EnrutadorTopics()
+    for i in range(10000):
+        assert e.topic(f"TEMP:{20 + i / 100:.2f}") == 'amerikeCDMX/P1/temp'
+    assert not hasattr(e, '_cache')
+
+
+def test_topics_internados():
+    a, b = EnrutadorTopics(), EnrutadorTopics()
+    assert a.topic('TEMP:1') is b.topic('TEMP:2')
+
+
+def test_tabla_desde_archivo(tmp_path):
+    ruta = tmp_path / 'topics.json'
+    ruta.write_text(json.dumps({'plantilla': '{sede}-{piso}-{sufijo}', 'tipos': {'CO2': 'co2'},
+                                'autorizados': [], 'denegados': {}}))
+    tabla = TablaTopics.desde_archivo(str(ruta))
+    assert tabla.topic('s', 'p', 'CO2:400') == 's-p-co2'
+    assert tabla.topic('s', 'p', 'TEMP:20') == 's-p-otros'
+    assert tabla.para('s', 'p') is tabla.para('s', 'p')
+    assert 's-p-lote' in tabla.para('s', 'p').todos()
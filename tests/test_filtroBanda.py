@@ -0,0 +1,40 @@
+from filtroBanda import FiltroBanda, leer_configuracion
+
+
+def test_banda_muerta_y_latido():
+    filtro = FiltroBanda({'TEMP': 0.5}, latido=10)
+    assert filtro.debe_publicar('d', 'TEMP:20.0', ahora=0)
+    assert not filtro.debe_publicar('d', 'TEMP:20.4', ahora=1)
+    assert filtro.debe_publicar('d', 'TEMP:20.6', ahora=2)
+    assert not filtro.debe_publicar('d', 'TEMP:20.6', ahora=11)
+    assert filtro.debe_publicar('d', 'TEMP:20.6', ahora=12)
+    m = filtro.metricas()
+    assert (m['evaluados'], m['publicados'], m['por_latido']) == (5, 3, 1)
+
+
+def test_tipos_sin_banda_publican_cualquier_cambio():
+    filtro = FiltroBanda({}, latido=60)
+    assert filtro.debe_publicar('d', 'RFID:12345', ahora=0)
+    assert not filtro.debe_publicar('d', 'RFID:12345', ahora=1)
+    assert filtro.debe_publicar('d', 'RFID:67890', ahora=2)
+
+
+def test_claves_independientes():
+    filtro = FiltroBanda({'TEMP': 1.0})
+    assert filtro.debe_publicar('a', 'TEMP:20', ahora=0)
+    assert filtro.debe_publicar('b', 'TEMP:20', ahora=0)
+
+
+def test_registrar_solo_tras_un_envio_exitoso():
+    filtro = FiltroBanda({'TEMP': 0.5}, latido=60)
+    lecturas = {'TEMP': '20.0', 'HUM': '40'}
+    assert filtro.debe_publicar_lecturas('trama', lecturas, ahora=0, registrar=False)
+    # El envío falló: sin registrar, la trama se vuelve a proponer
+    assert filtro.debe_publicar_lecturas('trama', lecturas, ahora=1, registrar=False)
+    filtro.registrar('trama', lecturas, ahora=1)
+    assert not filtro.debe_publicar_lecturas('trama', lecturas, ahora=2, registrar=False)
+    assert filtro.metricas()['publicados'] == 1
+
+
+def test_leer_configuracion():
+    assert leer_configuracion("TEMP=0.2@30, HUM=1,") == ({'TEMP': 0.2, 'HUM': 1.0}, {'TEMP': 30.0})
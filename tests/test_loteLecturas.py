@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+from loteLecturas import AcumuladorLote, codecs_disponibles, codificar_lote, decodificar_lote, es_lote, expandir
+
+LECTURAS = [('a/temp', 'TEMP:24.50', 1000.000), ('a/hum', 'HUM:45.00', 1000.250), ('a/temp', 'TEMP:24.60', 1001.5)]
+
+
+@pytest.mark.parametrize('codec', codecs_disponibles())
+def test_ida_y_vuelta(codec):
+    payload = codificar_lote(LECTURAS, codec)
+    assert es_lote(payload)
+    assert sorted(decodificar_lote(payload)) == sorted(LECTURAS)
+
+
+def test_expandir_conserva_ts():
+    msg = SimpleNamespace(topic='a/lote', payload=codificar_lote(LECTURAS))
+    assert sorted(expandir(msg)) == sorted((t, m.encode(), ts) for t, m, ts in LECTURAS)
+
+
+def test_expandir_mensaje_suelto():
+    msg = SimpleNamespace(topic='a/temp', payload=b'TEMP:24.5')
+    assert expandir(msg) == [('a/temp', b'TEMP:24.5', None)]
+
+
+@pytest.mark.parametrize('payload', [
+    b'\xb1\x09{}',                                 # Codec desconocido
+    b'\xb1\x01[1,2]',                              # Cuerpo que no es objeto
+    b'\xb1\x01{"t":0,"d":{"a":[[0,5]]}}',         # Lectura que no es texto
+    b'\xb1\x01{"t":0',                             # JSON cortado
+])
+def test_expandir_descarta_lotes_danados(payload, capsys):
+    assert expandir(SimpleNamespace(topic='a/lote', payload=payload)) == []
+    assert '⚠️' in capsys.readouterr().out
+
+
+def test_acumulador_por_tamano():
+    acumulador = AcumuladorLote(maximo=2, intervalo=60)
+    assert acumulador.agregar('a/temp', 'TEMP:1', 1.0) is None
+    payload = acumulador.agregar('a/temp', 'TEMP:2', 2.0)
+    assert [m for _, m, _ in decodificar_lote(payload)] == ['TEMP:1', 'TEMP:2']
+    assert acumulador.vaciar() is None
+    assert acumulador.metricas()['lecturas_por_lote'] == 2
+
+
+def test_acumulador_por_intervalo(monkeypatch):
+    ahora = [100.0]
+    monkeypatch.setattr('loteLecturas.time.monotonic', lambda: ahora[0])
+    acumulador = AcumuladorLote(maximo=100, intervalo=1.0)
+    assert acumulador.vence_en() is None
+    acumulador.agregar('a/temp', 'TEMP:1', 1.0)
+    assert acumulador.vence_en() == 1.0
+    ahora[0] = 100.5
+    assert acumulador.vencido() is None
+    assert acumulador.vence_en() == 0.5
+    ahora[0] = 101.0
+    assert acumulador.vencido() is not None
+    assert acumulador.vence_en() is None
+
+
+def test_codec_no_disponible():
+    with pytest.raises(ValueError):
+        AcumuladorLote('inexistente')
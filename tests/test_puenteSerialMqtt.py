@@ -0,0 +1,57 @@
+import time
+from types import SimpleNamespace
+
+from paho.mqtt.client import MQTT_ERR_SUCCESS
+
+from loteLecturas import AcumuladorLote, decodificar_lote
+from puenteSerialMqtt import PuenteSerialMqtt
+
+TRAMA = b"0,1,22.50,45.00,0,1000000000,0,12345\n"
+
+
+class ClienteFalso:
+    """Cliente paho mínimo que confirma cada publish al instante"""
+
+    def __init__(self):
+        self.on_publish = None
+        self.on_disconnect = None
+        self.publicados = []
+        self._mid = 0
+
+    def max_inflight_messages_set(self, maximo):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def publish(self, topic, payload, qos=0):
+        self._mid += 1
+        self.publicados.append((topic, payload))
+        self.on_publish(self, None, self._mid)
+        return SimpleNamespace(rc=MQTT_ERR_SUCCESS, mid=self._mid)
+
+
+def test_mensajes_de_una_trama():
+    puente = PuenteSerialMqtt(ClienteFalso(), 'sede', 'P1', verbose=False)
+    assert puente.mensajes("0,1,22.50,45.00,0,1000000000,0,99999") == [
+        ('sede/P1/temp', 'TEMP:22.50'), ('sede/P1/hum', 'HUM:45.00'), ('sede/P1/rfid/denegado', 'RFID:99999')]
+    assert puente.mensajes("hola") == [('sede/P1/otros', 'hola')]
+
+
+def test_lote_sale_por_tiempo_sin_mas_bytes_seriales():
+    cliente = ClienteFalso()
+    puente = PuenteSerialMqtt(cliente, 'sede', 'P1', verbose=False,
+                              lote=AcumuladorLote('json', intervalo=0.2))
+    puente.iniciar_vaciado()
+    try:
+        puente.procesar(TRAMA)
+        assert cliente.publicados == []
+        limite = time.monotonic() + 2
+        while not cliente.publicados and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        puente.detener_vaciado()
+    assert len(cliente.publicados) == 1
+    topic, payload = cliente.publicados[0]
+    assert topic == 'sede/P1/lote'
+    assert [m for _, m, _ in decodificar_lote(payload)] == ['TEMP:22.50', 'HUM:45.00', 'RFID:12345']
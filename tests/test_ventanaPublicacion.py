@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_QUEUE_SIZE, MQTT_ERR_SUCCESS
+
+from ventanaPublicacion import VentanaPublicacion, percentil
+
+
+class ClienteFalso:
+    """Cliente paho mínimo: publish devuelve rc y las confirmaciones se disparan a mano"""
+
+    def __init__(self, rc=MQTT_ERR_SUCCESS, inmediato=False):
+        self.on_publish = None
+        self.on_disconnect = None
+        self.rc = rc
+        self.inmediato = inmediato  # Confirmar dentro de publish(), como paho sin hilo de red
+        self._mid = 0
+
+    def max_inflight_messages_set(self, maximo):
+        pass
+
+    def publish(self, topic, payload, qos=0):
+        self._mid += 1
+        if self.inmediato:
+            self.on_publish(self, None, self._mid)
+        return SimpleNamespace(rc=self.rc, mid=self._mid)
+
+    def confirmar(self, mid):
+        self.on_publish(self, None, mid)
+
+    def desconectar(self):
+        self.on_disconnect(self, None, 1)
+
+
+def test_confirmar_libera_lugar():
+    cliente = ClienteFalso()
+    confirmados = []
+    ventana = VentanaPublicacion(cliente, maximo=2, on_confirmado=lambda mid, t, lat: confirmados.append((mid, t)))
+    info = ventana.publicar('a/temp', b'1')
+    assert ventana.en_vuelo == 1
+    cliente.confirmar(info.mid)
+    assert ventana.en_vuelo == 0
+    assert confirmados == [(info.mid, 'a/temp')]
+    assert ventana.metricas()['confirmados'] == 1
+
+
+def test_ventana_llena_vence_timeout():
+    cliente = ClienteFalso()
+    ventana = VentanaPublicacion(cliente, maximo=2)
+    ventana.publicar('a', b'1')
+    ventana.publicar('a', b'2')
+    assert ventana.publicar('a', b'3', timeout=0.05) is None
+    assert ventana.esperas == 1
+    assert ventana.en_vuelo == 2
+
+
+def test_confirmacion_adelantada():
+    ventana = VentanaPublicacion(ClienteFalso(inmediato=True), maximo=1)
+    for i in range(5):
+        assert ventana.publicar('a', b'x', timeout=0.05) is not None
+    assert ventana.en_vuelo == 0
+    assert ventana.confirmados == 5
+
+
+def test_error_de_publish_libera_lugar():
+    ventana = VentanaPublicacion(ClienteFalso(rc=MQTT_ERR_QUEUE_SIZE), maximo=1)
+    ventana.publicar('a', b'1', qos=1)
+    assert ventana.en_vuelo == 0
+    assert ventana.errores == 1
+
+
+def test_sin_conexion_qos0_libera_y_qos1_sigue_en_vuelo():
+    cliente = ClienteFalso(rc=MQTT_ERR_NO_CONN)
+    ventana = VentanaPublicacion(cliente, maximo=2)
+    ventana.publicar('a', b'0', qos=0)
+    assert ventana.en_vuelo == 0
+    info = ventana.publicar('a', b'1', qos=1)
+    assert ventana.en_vuelo == 1
+    cliente.confirmar(info.mid)  # paho lo reenvió al reconectar
+    assert ventana.en_vuelo == 0
+
+
+def test_desconexion_descarta_solo_qos0():
+    cliente = ClienteFalso()
+    anteriores = []
+    cliente.on_disconnect = lambda c, u, rc: anteriores.append(rc)
+    ventana = VentanaPublicacion(cliente, maximo=3)
+    ventana.publicar('a', b'0', qos=0)
+    ventana.publicar('a', b'0', qos=0)
+    ventana.publicar('a', b'1', qos=1)
+    cliente.desconectar()
+    assert ventana.en_vuelo == 1
+    assert ventana.errores == 2
+    assert anteriores == [1]  # El callback previo del cliente se sigue llamando
+    assert ventana.publicar('a', b'2', timeout=0.05) is not None
+
+
+def test_percentil():
+    assert percentil([], 50) is None
+    assert percentil([1, 2, 3, 4, 5], 50) == 3
+    assert percentil([1, 2, 3], 100) == 3